@@ -0,0 +1,87 @@
+"""Times bulk re-scoring of a synthetic catalog under changed rubric weights.
+
+Usage:
+    python -m benchmarks.bulk_rescoring --courses=100000
+"""
+import json
+import sys
+import time
+
+import numpy as np
+from absl import app as absl_app, flags
+
+from reviewer.utils.rescoring import GradeTable, rescore, rescore_report
+from reviewer.utils.scoring import calculate_score
+from reviewer.utils.weights import COURSE_CLUSTERS, EVALUATION_ELEMENTS, PASS_MARK, RUBRIC_WEIGHTS
+
+FLAGS = flags.FLAGS
+flags.DEFINE_integer("courses", 100000, "Number of stored evaluations to re-score.")
+flags.DEFINE_integer("repeats", 5, "Timed re-scoring runs.")
+flags.DEFINE_integer("seed", 0, "Random seed for the synthetic grades.")
+flags.DEFINE_string("output", None, "Optional path to write the results as JSON.")
+
+
+def _catalog(courses: int, seed: int) -> GradeTable:
+    rng = np.random.default_rng(seed)
+    categories = rng.integers(0, len(COURSE_CLUSTERS), courses)
+    grades = rng.integers(50, 101, (courses, len(EVALUATION_ELEMENTS))).astype(np.float64)
+    table = GradeTable([f"course-{i}" for i in range(courses)], categories, grades,
+                       np.zeros(courses), np.zeros(courses, dtype=bool))
+    table.scores, table.passed = rescore(table)
+    return table
+
+
+def _changed_weights() -> dict:
+    # Shift 3 points from Learner Support to Critical Thinking in every category
+    weights = {category: dict(category_weights) for category, category_weights in RUBRIC_WEIGHTS.items()}
+    for category_weights in weights.values():
+        moved = min(3, category_weights["Learner Support"])
+        category_weights["Learner Support"] -= moved
+        category_weights["Critical Thinking"] += moved
+    return weights
+
+
+def main(argv=None):
+    if argv is None:
+        argv = flags.FLAGS(sys.argv)
+    else:
+        argv = flags.FLAGS(argv)
+
+    table = _catalog(FLAGS.courses, FLAGS.seed)
+    weights = _changed_weights()
+
+    # The vectorized scores must match the scalar calculator exactly
+    scores, _ = rescore(table, weights, PASS_MARK)
+    for i in range(min(len(table), 1000)):
+        category = COURSE_CLUSTERS[table.categories[i]]
+        grades = dict(zip(EVALUATION_ELEMENTS, table.grades[i]))
+        expected = sum(grades[e] * weights[category][e] for e in EVALUATION_ELEMENTS) / 100
+        assert abs(scores[i] - round(expected, 2)) < 1e-9, (i, scores[i], expected)
+    assert calculate_score(COURSE_CLUSTERS[table.categories[0]], dict(zip(EVALUATION_ELEMENTS, table.grades[0])))[
+        "final_score"] == table.scores[0]
+
+    timings = []
+    for _ in range(FLAGS.repeats):
+        start = time.perf_counter()
+        report = rescore_report(table, weights, PASS_MARK, max_listed=0)
+        timings.append(time.perf_counter() - start)
+
+    results = {
+        "courses": len(table),
+        "best_s": round(min(timings), 4),
+        "mean_s": round(sum(timings) / len(timings), 4),
+        "newly_failed": report["newly_failed"],
+        "newly_passed": report["newly_passed"],
+        "mean_delta": report["mean_delta"],
+    }
+    print(f"Re-scored {results['courses']} courses: best {results['best_s']}s, mean {results['mean_s']}s")
+    print(f"Pass -> fail: {results['newly_failed']}  Fail -> pass: {results['newly_passed']}  "
+          f"mean delta: {results['mean_delta']:+.2f}")
+
+    if FLAGS.output:
+        with open(FLAGS.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    absl_app.run(main)
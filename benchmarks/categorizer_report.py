@@ -0,0 +1,122 @@
+"""Offline accuracy and latency report for the local fast-path categorizer.
+
+The labeled set is a JSONL file with one {"content": ..., "category": ...}
+object per line, e.g. exported from past evaluations. With --folds > 1 a
+model is trained and scored with k-fold cross-validation; otherwise the
+seed-keyword model (or --model) is scored on the whole set.
+
+Usage:
+    python -m benchmarks.categorizer_report --labeled=labeled.jsonl --threshold=0.5
+    python -m benchmarks.categorizer_report --labeled=labeled.jsonl --folds=5 --save_model=categorizer.json
+"""
+import json
+import statistics
+import sys
+import time
+from collections import Counter, defaultdict
+
+from absl import app as absl_app, flags
+
+from reviewer.course_categorizer.local import LocalCategorizer
+from reviewer.utils.scoring import resolve_category
+
+FLAGS = flags.FLAGS
+flags.DEFINE_string("labeled", None, "JSONL file of {content, category} examples.")
+flags.DEFINE_string("model", None, "Trained model to evaluate (defaults to the seed keywords).")
+flags.DEFINE_float("threshold", 0.5, "Confidence above which the LLM fallback is skipped.")
+flags.DEFINE_integer("folds", 0, "Train and evaluate with k-fold cross-validation when > 1.")
+flags.DEFINE_string("save_model", None, "Train on the whole labeled set and save the model here.")
+flags.DEFINE_string("output", None, "Optional path to write the report as JSON.")
+flags.mark_flag_as_required("labeled")
+
+
+def _load_examples(path: str) -> list:
+    examples = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                examples.append((record["content"], resolve_category(record["category"])))
+    return examples
+
+
+def _percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _predict_all(classifier: LocalCategorizer, examples: list) -> list:
+    """Returns (expected, predicted, confidence, latency_us) per example."""
+    rows = []
+    for content, expected in examples:
+        start = time.perf_counter()
+        predicted, confidence = classifier.predict(content)
+        rows.append((expected, predicted, confidence, (time.perf_counter() - start) * 1e6))
+    return rows
+
+
+def build_report(rows: list, threshold: float) -> dict:
+    confident = [row for row in rows if row[2] >= threshold]
+    confusion = defaultdict(Counter)
+    for expected, predicted, _, _ in rows:
+        confusion[expected][predicted] += 1
+    latencies = [row[3] for row in rows]
+
+    def accuracy(subset):
+        return round(sum(e == p for e, p, _, _ in subset) / len(subset), 4) if subset else None
+
+    return {
+        "examples": len(rows),
+        "threshold": threshold,
+        "accuracy": accuracy(rows),
+        # Share of courses that skip the LLM, and how often those are right
+        "fast_path_coverage": round(len(confident) / len(rows), 4),
+        "fast_path_accuracy": accuracy(confident),
+        "confusion": {expected: dict(predicted) for expected, predicted in confusion.items()},
+        "latency_us": {
+            "mean": round(statistics.mean(latencies), 1),
+            "p50": round(_percentile(latencies, 50), 1),
+            "p99": round(_percentile(latencies, 99), 1),
+        },
+    }
+
+
+def main(argv=None):
+    if argv is None:
+        argv = flags.FLAGS(sys.argv)
+    else:
+        argv = flags.FLAGS(argv)
+
+    examples = _load_examples(FLAGS.labeled)
+
+    if FLAGS.folds > 1:
+        rows = []
+        for fold in range(FLAGS.folds):
+            train = [ex for i, ex in enumerate(examples) if i % FLAGS.folds != fold]
+            test = [ex for i, ex in enumerate(examples) if i % FLAGS.folds == fold]
+            rows.extend(_predict_all(LocalCategorizer.fit(train), test))
+    else:
+        classifier = LocalCategorizer.load(FLAGS.model) if FLAGS.model else LocalCategorizer.from_keywords()
+        rows = _predict_all(classifier, examples)
+
+    report = build_report(rows, FLAGS.threshold)
+    print(f"examples:            {report['examples']}")
+    print(f"accuracy:            {report['accuracy']}")
+    print(f"fast-path coverage:  {report['fast_path_coverage']} (confidence >= {FLAGS.threshold})")
+    print(f"fast-path accuracy:  {report['fast_path_accuracy']}")
+    latency = report["latency_us"]
+    print(f"latency (us):        mean {latency['mean']}  p50 {latency['p50']}  p99 {latency['p99']}")
+    for expected, predicted in sorted(report["confusion"].items()):
+        print(f"  {expected}: {predicted}")
+
+    if FLAGS.save_model:
+        LocalCategorizer.fit(examples).save(FLAGS.save_model)
+        print(f"Saved model trained on {len(examples)} examples to {FLAGS.save_model}")
+
+    if FLAGS.output:
+        with open(FLAGS.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    absl_app.run(main)
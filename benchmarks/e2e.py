@@ -0,0 +1,333 @@
+"""End-to-end benchmark of the evaluation pipeline and web server against a fake model.
+
+Runs root_agent (CourseEvaluationPipeline) and the web-ui/server.py
+/api/analyze endpoint with every LLM call answered by FakeGemini, and
+reports per-stage overhead (wall time not spent in the model), p50/p95/p99
+latency and throughput at each concurrency level, failure rate and peak
+memory. Results are written as JSON; pass a previous run as --baseline to
+flag regressions.
+
+Usage:
+    python -m benchmarks.e2e --concurrency=1,4,16 --requests=32 --output=bench.json
+    python -m benchmarks.e2e --baseline=bench.json --tolerance=0.2
+    python -m benchmarks.e2e --evaluation_mode=fused
+"""
+import asyncio
+import importlib
+import json
+import logging
+import os
+import platform
+import resource
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+from absl import app as absl_app, flags
+
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from benchmarks.fake_model import FakeGemini, use_model
+from reviewer.utils.rate_limit import limiter_stats
+
+FLAGS = flags.FLAGS
+flags.DEFINE_list("concurrency", ["1", "4", "16"], "Concurrency levels to measure throughput at.")
+flags.DEFINE_integer("requests", 32, "Requests per concurrency level.")
+flags.DEFINE_integer("course_kb", 8, "Size of the synthetic course content in KB.")
+flags.DEFINE_float("base_latency", 0.3, "Fake model latency per call in seconds.")
+flags.DEFINE_float("output_token_latency", 0.02, "Fake model latency per output token in seconds.")
+flags.DEFINE_integer("output_padding_tokens", 0, "Extra output tokens per fake model response.")
+flags.DEFINE_float("failure_rate", 0.0, "Share of fake model calls that fail.")
+flags.DEFINE_float("malformed_rate", 0.0, "Share of fake grading/summary responses that fail schema validation.")
+flags.DEFINE_integer("quota_concurrency", 0, "Fake model calls in flight before it answers 429 (0 = no quota).")
+flags.DEFINE_float("quota_retry_after", None, "Retry-After seconds sent with the fake 429s.")
+flags.DEFINE_integer("seed", 0, "Seed for fake model failures.")
+flags.DEFINE_integer("duplicates", 1, "Concurrent identical copies of each server request, to measure request coalescing.")
+flags.DEFINE_enum("evaluation_mode", None, ["staged", "fused"],
+                  "Pipeline evaluation mode (REVIEWER_EVALUATION_MODE); defaults to the environment's.")
+flags.DEFINE_bool("server", True, "Also benchmark the web server's /api/analyze endpoint.")
+flags.DEFINE_string("output", None, "Path to write the results as JSON.")
+flags.DEFINE_string("baseline", None, "Previous results JSON to compare against.")
+flags.DEFINE_float("tolerance", 0.2, "Relative change that counts as a regression.")
+
+# Which pipeline stage (index into root_agent.sub_agents) each fake request kind belongs to
+_KIND_STAGE = {'categorize': 0, 'grade': 0, 'evidence': 0, 'fused': 0, 'summary': 1}
+
+
+def _course(size_kb: int, index: int) -> str:
+    module = "Module: Smart contract development with Solidity, peer code review, reflection journals. "
+    # A unique header per request keeps the server's result cache out of the measurement
+    return f"Course {index}\n" + module * (size_kb * 1024 // len(module) + 1)
+
+
+def _percentiles(values: list) -> dict:
+    if not values:
+        return {"p50_ms": None, "p95_ms": None, "p99_ms": None}
+    ordered = sorted(values)
+
+    def pick(pct):
+        return round(ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))] * 1000, 2)
+
+    return {"p50_ms": pick(50), "p95_ms": pick(95), "p99_ms": pick(99)}
+
+
+def _memory_mb() -> dict:
+    _, peak = tracemalloc.get_traced_memory()
+    # ru_maxrss is in KB on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    rss_mb = rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+    return {"peak_traced_mb": round(peak / (1024 * 1024), 2), "max_rss_mb": round(rss_mb, 2)}
+
+
+async def _run_once(runner, stage_of: dict, content: str) -> dict:
+    """Runs the pipeline on one course and returns its latency and per-stage wall time."""
+    session = runner.session_service.create_session(app_name=runner.app_name, user_id="bench")
+    message = types.Content(role="user", parts=[types.Part(text=content)])
+    start = last = time.perf_counter()
+    stages = {}
+    try:
+        async for event in runner.run_async(user_id="bench", session_id=session.id, new_message=message):
+            now = time.perf_counter()
+            stage = stage_of.get(event.author)
+            if stage is not None:
+                stages[stage] = stages.get(stage, 0.0) + now - last
+            last = now
+        state = runner.session_service.get_session(
+            app_name=runner.app_name, user_id="bench", session_id=session.id
+        ).state
+        ok = "final_score" in (state.get("course_evaluation") or {})
+    except Exception:
+        ok = False
+    return {"latency": time.perf_counter() - start, "stages": stages, "ok": ok}
+
+
+async def _pipeline_benchmark(agent, model: FakeGemini, levels: list, requests: int, course_kb: int) -> dict:
+    runner = InMemoryRunner(agent, app_name="benchmark")
+    stage_names = [stage.name for stage in agent.sub_agents]
+    stage_of = {}
+    for index, stage in enumerate(agent.sub_agents):
+        pending = [stage]
+        while pending:
+            current = pending.pop()
+            stage_of[current.name] = index
+            pending.extend(current.sub_agents)
+
+    # Per-stage overhead, measured one request at a time so model time can be attributed
+    overhead = {name: [] for name in stage_names}
+    total_overhead = []
+    for i in range(min(requests, 16)):
+        before = dict(model.busy_seconds)
+        result = await _run_once(runner, stage_of, _course(course_kb, i))
+        if not result["ok"]:
+            continue
+        model_time = [0.0] * len(stage_names)
+        for kind, seconds in model.busy_seconds.items():
+            model_time[_KIND_STAGE[kind]] += seconds - before.get(kind, 0.0)
+        for index, name in enumerate(stage_names):
+            overhead[name].append(result["stages"].get(index, 0.0) - model_time[index])
+        total_overhead.append(result["latency"] - sum(model_time))
+
+    results = {
+        "stage_overhead_ms": {
+            name: round(statistics.mean(v) * 1000, 3) if v else None for name, v in overhead.items()
+        },
+        "total_overhead_ms": round(statistics.mean(total_overhead) * 1000, 3) if total_overhead else None,
+        "levels": {},
+    }
+
+    for level in levels:
+        semaphore = asyncio.Semaphore(level)
+        calls_before, quota_errors_before = model.calls, model.quota_errors
+
+        async def bounded(i):
+            async with semaphore:
+                return await _run_once(runner, stage_of, _course(course_kb, i))
+
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        runs = await asyncio.gather(*(bounded(i) for i in range(requests)))
+        elapsed = time.perf_counter() - start
+        latencies = [run["latency"] for run in runs if run["ok"]]
+        results["levels"][str(level)] = {
+            **_percentiles(latencies),
+            "throughput_rps": round(len(latencies) / elapsed, 3),
+            "failure_rate": round(sum(not run["ok"] for run in runs) / len(runs), 4),
+            "model_calls": model.calls - calls_before,
+            "quota_errors": model.quota_errors - quota_errors_before,
+            **_memory_mb(),
+        }
+    return results
+
+
+def _server_benchmark(agent, model: FakeGemini, levels: list, requests: int, course_kb: int,
+                      duplicates: int = 1) -> dict:
+    data_dir = tempfile.mkdtemp(prefix="reviewer-bench-")
+    os.environ.update({
+        "COURSE_REVIEWER_DB": os.path.join(data_dir, "reviewer.db"),
+        "COURSE_REVIEWER_CACHE_DIR": "",
+    })
+    os.environ.pop("COURSE_REVIEWER_FAKE_ENGINE", None)
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "web-ui"))
+
+    from deployment.client import get_client
+    from deployment.local_engine import LocalAgentEngine
+
+    # Register the in-process engine before the server creates its shared client
+    get_client(os.getenv("COURSE_REVIEWER_RESOURCE_ID", "benchmark"), engine=LocalAgentEngine(agent, app_name="benchmark"))
+    os.environ.setdefault("COURSE_REVIEWER_RESOURCE_ID", "benchmark")
+    server = importlib.import_module("server")
+    # Failures are counted in the results rather than logged per request
+    server.logger.setLevel(logging.CRITICAL)
+    if server.session_pool is not None:
+        server.session_pool.wait_until_ready(timeout=30)
+
+    session_id = server.app.test_client().post("/api/create-session").get_json()["session_id"]
+    local = threading.local()
+
+    def analyze(i):
+        client = getattr(local, "client", None) or server.app.test_client()
+        local.client = client
+        start = time.perf_counter()
+        # Consecutive requests share content, so duplicates arrive while the first is in flight
+        content = _course(course_kb, i // duplicates)
+        response = client.post("/api/analyze", json={"session_id": session_id, "content": content})
+        return time.perf_counter() - start, response.status_code == 200 and response.get_json().get("success")
+
+    results = {"levels": {}}
+    offset = 0
+    for level in levels:
+        calls_before = model.calls
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=level) as executor:
+            runs = list(executor.map(analyze, range(offset, offset + requests)))
+        elapsed = time.perf_counter() - start
+        # Round up so the next level starts on fresh content rather than a cached duplicate
+        offset += -(-requests // duplicates) * duplicates
+        latencies = [latency for latency, ok in runs if ok]
+        results["levels"][str(level)] = {
+            **_percentiles(latencies),
+            "throughput_rps": round(len(latencies) / elapsed, 3),
+            "failure_rate": round(sum(not ok for _, ok in runs) / len(runs), 4),
+            "model_calls": model.calls - calls_before,
+            **_memory_mb(),
+        }
+    server.evaluation_store.flush()
+    results["coalescing"] = server.inflight_evaluations.stats()
+    return results
+
+
+def _flatten(results: dict, prefix: str = "") -> dict:
+    flat = {}
+    for key, value in results.items():
+        path = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(_flatten(value, path))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = value
+    return flat
+
+
+def find_regressions(results: dict, baseline: dict, tolerance: float) -> list:
+    """Lists metrics that got worse than the baseline by more than ``tolerance``."""
+    current, previous = _flatten(results), _flatten(baseline)
+    regressions = []
+    for key, old in previous.items():
+        new = current.get(key)
+        if new is None or not old or key.startswith("meta."):
+            continue
+        if key.endswith(("_ms", "_mb", "failure_rate")) and new > old * (1 + tolerance):
+            regressions.append(f"{key}: {old} -> {new}")
+        elif key.endswith("throughput_rps") and new < old * (1 - tolerance):
+            regressions.append(f"{key}: {old} -> {new}")
+    return regressions
+
+
+def main(argv=None):
+    if argv is None:
+        argv = flags.FLAGS(sys.argv)
+    else:
+        argv = flags.FLAGS(argv)
+
+    if FLAGS.evaluation_mode:
+        os.environ["REVIEWER_EVALUATION_MODE"] = FLAGS.evaluation_mode
+    from reviewer.agent import root_agent
+
+    model = FakeGemini(
+        base_latency=FLAGS.base_latency,
+        output_token_latency=FLAGS.output_token_latency,
+        output_padding_tokens=FLAGS.output_padding_tokens,
+        failure_rate=FLAGS.failure_rate,
+        malformed_rate=FLAGS.malformed_rate,
+        quota_concurrency=FLAGS.quota_concurrency,
+        quota_retry_after=FLAGS.quota_retry_after,
+        seed=FLAGS.seed,
+    )
+    use_model(root_agent, model)
+    levels = [int(level) for level in FLAGS.concurrency]
+
+    tracemalloc.start()
+    results = {
+        "meta": {
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "config": {
+                "requests": FLAGS.requests,
+                "course_kb": FLAGS.course_kb,
+                "base_latency": FLAGS.base_latency,
+                "output_token_latency": FLAGS.output_token_latency,
+                "output_padding_tokens": FLAGS.output_padding_tokens,
+                "failure_rate": FLAGS.failure_rate,
+                "malformed_rate": FLAGS.malformed_rate,
+                "quota_concurrency": FLAGS.quota_concurrency,
+                "quota_retry_after": FLAGS.quota_retry_after,
+                "duplicates": FLAGS.duplicates,
+                "evaluation_mode": os.getenv("REVIEWER_EVALUATION_MODE", "staged"),
+            },
+        },
+        "pipeline": asyncio.run(_pipeline_benchmark(root_agent, model, levels, FLAGS.requests, FLAGS.course_kb)),
+    }
+    if FLAGS.server:
+        results["server"] = _server_benchmark(
+            root_agent, model, levels, FLAGS.requests, FLAGS.course_kb, FLAGS.duplicates
+        )
+    tracemalloc.stop()
+    # Client-side limiter state after the run (empty with REVIEWER_RATE_LIMIT=false)
+    results["rate_limit"] = {name: {key: value for key, value in stats.items() if key != "name"}
+                             for name, stats in limiter_stats().items()}
+
+    print("Per-stage overhead (ms, excluding model time):")
+    for stage, value in results["pipeline"]["stage_overhead_ms"].items():
+        print(f"  {stage:<28}{value!s:>10}")
+    print(f"  {'total':<28}{results['pipeline']['total_overhead_ms']!s:>10}")
+    print(f"{'target':<10}{'conc':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>9}{'fail':>7}{'peak MB':>9}")
+    for target in ("pipeline", "server"):
+        for level, r in results.get(target, {}).get("levels", {}).items():
+            print(f"{target:<10}{level:>6}{r['p50_ms']!s:>10}{r['p95_ms']!s:>10}{r['p99_ms']!s:>10}"
+                  f"{r['throughput_rps']:>9}{r['failure_rate']:>7}{r['peak_traced_mb']:>9}")
+
+    for name, stats in results["rate_limit"].items():
+        print(f"limiter {name}: limit {stats['limit']}, {stats['retries']} retries, "
+              f"{stats['overloaded']} overloaded, {stats['gave_up']} gave up, {stats['wait_seconds']}s waiting")
+
+    if FLAGS.output:
+        with open(FLAGS.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if FLAGS.baseline:
+        with open(FLAGS.baseline) as f:
+            regressions = find_regressions(results, json.load(f), FLAGS.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    absl_app.run(main)
@@ -0,0 +1,180 @@
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+from collections import defaultdict
+from typing import AsyncGenerator, Optional
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+from pydantic import PrivateAttr
+
+from reviewer.utils.chunking import estimate_tokens
+from reviewer.utils.rate_limited_llm import RateLimitedLlm
+from reviewer.utils.weights import COURSE_CLUSTERS, EVALUATION_ELEMENTS
+
+
+def _request_text(llm_request: LlmRequest) -> tuple:
+    instruction = str(llm_request.config.system_instruction or '') if llm_request.config else ''
+    contents = ''.join(
+        part.text or ''
+        for content in llm_request.contents
+        for part in (content.parts or [])
+    )
+    return instruction, contents
+
+
+def request_kind(instruction: str) -> str:
+    """Names the pipeline prompt: 'evidence', 'fused', 'grade', 'categorize' or 'summary'."""
+    if 'Extract evidence' in instruction:
+        return 'evidence'
+    if '"category"' in instruction and '"grades"' in instruction:
+        return 'fused'
+    if any(f"**{e} (0-100):**" in instruction for e in EVALUATION_ELEMENTS):
+        return 'grade'
+    if re.search(r'categori[sz]e', instruction, re.IGNORECASE):
+        return 'categorize'
+    return 'summary'
+
+
+class FakeModelError(RuntimeError):
+    """Raised by FakeGemini for the share of calls set by failure_rate."""
+
+
+class FakeQuotaError(FakeModelError):
+    """Raised by FakeGemini when more than quota_concurrency calls are in flight."""
+
+    code = 429
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def fake_response(instruction: str, contents: str) -> str:
+    """Answers a pipeline prompt with deterministic, content-derived output."""
+    digest = hashlib.sha256(contents.encode('utf-8')).digest()
+    kind = request_kind(instruction)
+    elements = [e for e in EVALUATION_ELEMENTS if f"**{e} (0-100):**" in instruction]
+    if kind == 'evidence':
+        return json.dumps({
+            e: [f"Section {digest[0]} covers {e.lower()}."] if digest[i + 1] % 2 else []
+            for i, e in enumerate(EVALUATION_ELEMENTS)
+        })
+    if kind == 'grade':
+        return json.dumps({e: 60 + digest[EVALUATION_ELEMENTS.index(e) + 1] % 41 for e in elements})
+    if kind == 'fused':
+        return json.dumps({
+            "category": COURSE_CLUSTERS[digest[0] % len(COURSE_CLUSTERS)],
+            "grades": {e: 60 + digest[EVALUATION_ELEMENTS.index(e) + 1] % 41 for e in elements},
+        })
+    if kind == 'categorize':
+        return COURSE_CLUSTERS[digest[0] % len(COURSE_CLUSTERS)]
+    return json.dumps({
+        "summary": "The course is well structured with clear practical outcomes.",
+        "recommendation": "Add more collaborative and reflective activities.",
+    })
+
+
+class FakeGemini(BaseLlm):
+    """Stand-in for Gemini that answers pipeline prompts after a simulated delay.
+
+    Latency is modelled as a fixed per-call cost plus time per input token
+    (prefill) and per output token (decode), so shorter outputs and
+    concurrent calls behave like they do against the real model.
+    ``output_padding_tokens`` pads every response with trailing whitespace
+    to simulate longer outputs, and ``failure_rate`` makes that share of
+    calls raise FakeModelError. ``malformed_rate`` makes that share of
+    grading and summary responses drop a key, so they fail schema
+    validation. ``quota_concurrency`` makes calls beyond that many in
+    flight fail at once with a 429 FakeQuotaError, carrying
+    ``quota_retry_after`` as its Retry-After hint, like an exhausted Vertex
+    AI quota. ``busy_seconds`` accumulates simulated model
+    time and ``input_tokens`` estimated prompt tokens per request kind
+    (see request_kind).
+    """
+
+    model: str = 'fake-gemini'
+    base_latency: float = 0.3
+    input_token_latency: float = 0.00002
+    output_token_latency: float = 0.02
+    output_padding_tokens: int = 0
+    failure_rate: float = 0.0
+    malformed_rate: float = 0.0
+    quota_concurrency: int = 0
+    quota_retry_after: Optional[float] = None
+    seed: Optional[int] = None
+    calls: int = 0
+    failures: int = 0
+    malformed: int = 0
+    quota_errors: int = 0
+    in_flight: int = 0
+    busy_seconds: dict = {}
+    input_tokens: dict = {}
+    _rng: random.Random = PrivateAttr(default=None)
+
+    def model_post_init(self, __context) -> None:
+        self._rng = random.Random(self.seed)
+        self.busy_seconds = defaultdict(float)
+        self.input_tokens = defaultdict(int)
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        instruction, contents = _request_text(llm_request)
+        kind = request_kind(instruction)
+        text = fake_response(instruction, contents)
+        if kind in ('grade', 'fused', 'summary') and self.malformed_rate and self._rng.random() < self.malformed_rate:
+            self.malformed += 1
+            text = json.dumps(dict(list(json.loads(text).items())[1:]))
+        if self.output_padding_tokens:
+            text += '\n' + ' ' * (self.output_padding_tokens * 4)
+        self.calls += 1
+        if self.quota_concurrency and self.in_flight >= self.quota_concurrency:
+            self.quota_errors += 1
+            await asyncio.sleep(0.005)  # a rejected request still costs a round-trip
+            raise FakeQuotaError(f"429 RESOURCE_EXHAUSTED: {kind} quota exceeded", self.quota_retry_after)
+        self.in_flight += 1
+        input_tokens = estimate_tokens(instruction + contents)
+        self.input_tokens[kind] += input_tokens
+        start = time.perf_counter()
+        try:
+            await asyncio.sleep(
+                self.base_latency
+                + self.input_token_latency * input_tokens
+                + self.output_token_latency * estimate_tokens(text)
+            )
+        finally:
+            self.in_flight -= 1
+        self.busy_seconds[kind] += time.perf_counter() - start
+        if self.failure_rate and self._rng.random() < self.failure_rate:
+            self.failures += 1
+            raise FakeModelError(f"Simulated {kind} failure")
+        yield LlmResponse(content=types.Content(role='model', parts=[types.Part(text=text)]))
+
+
+def use_model(agent: BaseAgent, model: BaseLlm) -> BaseAgent:
+    """Points every LlmAgent in the tree at the given model, keeping any rate limiter in front of it."""
+    if isinstance(agent, LlmAgent):
+        agent.model = RateLimitedLlm(model=model.model, llm=model) if isinstance(agent.model, RateLimitedLlm) else model
+    for sub_agent in agent.sub_agents:
+        use_model(sub_agent, model)
+    return agent
+
+
+async def run_agent(agent: BaseAgent, content: str, state: dict = None) -> dict:
+    """Runs an agent on one message in a fresh in-memory session and returns the final state."""
+    runner = InMemoryRunner(agent, app_name='benchmark')
+    session = runner.session_service.create_session(app_name='benchmark', user_id='bench', state=state)
+    message = types.Content(role='user', parts=[types.Part(text=content)])
+    async for _ in runner.run_async(user_id='bench', session_id=session.id, new_message=message):
+        pass
+    return runner.session_service.get_session(
+        app_name='benchmark', user_id='bench', session_id=session.id
+    ).state
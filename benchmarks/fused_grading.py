@@ -0,0 +1,158 @@
+"""Compares the staged and fused categorize-and-grade modes.
+
+Runs the same courses through the staged pipeline (categorizer, then the
+grader, map-reduce over sections for courses past --chunk_tokens) and
+the fused one (a single call returns the category and the grades), and
+reports per course size the latency, model calls and prompt tokens of each
+mode, plus how far the fused results agree with the staged ones: category
+match rate, mean absolute grade difference, mean absolute final score
+difference and pass/fail agreement. Scoring is deterministic and the same
+in both modes, so the LLM summary is left out.
+
+The fake model answers from a hash of what it is sent, so its agreement
+figures only exercise the comparison. Run with --live (Vertex AI
+credentials required) to measure agreement on the real model.
+
+Usage:
+    python -m benchmarks.fused_grading --course_kb=8,64,400 --courses=8
+    python -m benchmarks.fused_grading --live --courses=20 --output=fused.json
+"""
+import asyncio
+import json
+import statistics
+import sys
+import time
+
+from absl import app as absl_app, flags
+from google.adk.agents import LlmAgent, SequentialAgent
+
+from benchmarks.fake_model import FakeGemini, run_agent
+from reviewer.course_categorizer.agent import CATEGORIZER_INSTRUCTION
+from reviewer.course_grader.fused import build_categorize_and_grade
+from reviewer.course_grader.map_reduce import build_map_reduce_grader
+from reviewer.score_calculator.agent import ScoreCalculatorAgent
+from reviewer.utils.weights import EVALUATION_ELEMENTS, MODEL_NAME
+
+FLAGS = flags.FLAGS
+flags.DEFINE_list("course_kb", ["8", "64", "400"], "Synthetic course sizes in KB.")
+flags.DEFINE_integer("courses", 8, "Courses per size.")
+flags.DEFINE_integer("chunk_tokens", 32000, "Token budget per chunk for staged map-reduce grading.")
+flags.DEFINE_float("input_token_latency", 0.00002, "Fake model latency per input token in seconds.")
+flags.DEFINE_bool("live", False, "Call the real model instead of the fake one.")
+flags.DEFINE_string("output", None, "Optional path to write the results as JSON.")
+
+_TOPICS = ["Solidity smart contracts", "token economics for founders", "DAO governance operations",
+           "zero-knowledge proof systems", "Web3 front-end design", "AI agents on blockchains"]
+
+
+def _course(size_kb: int, index: int) -> str:
+    topic = _TOPICS[index % len(_TOPICS)]
+    modules, i = [f"Course {index}: {topic.title()}\n\n"], 0
+    while sum(len(m) for m in modules) < size_kb * 1024:
+        i += 1
+        body = (f"In lesson {i} learners study {topic}, complete a hands-on lab, discuss it with peers "
+                f"and write a short reflection. ") * 40
+        modules.append(f"Module {i}: {topic.title()} part {i}\n\n{body}\n\n")
+    return "".join(modules)
+
+
+def _pipeline(model, chunk_tokens: int) -> SequentialAgent:
+    categorizer = LlmAgent(
+        model=model,
+        name='course_categorizer',
+        instruction=CATEGORIZER_INSTRUCTION,
+        output_key="course_category",
+    )
+    grader = build_map_reduce_grader(chunk_tokens=chunk_tokens, model=model)
+    return SequentialAgent(name='CourseEvaluationPipeline', sub_agents=[
+        build_categorize_and_grade(categorizer, grader, model=model),
+        ScoreCalculatorAgent(name='score_calculator'),
+    ])
+
+
+async def _evaluate(agent, model, content: str, mode: str) -> dict:
+    calls = getattr(model, "calls", 0)
+    tokens = sum(getattr(model, "input_tokens", {}).values())
+    start = time.perf_counter()
+    state = await run_agent(agent, content, state={"evaluation_mode": mode})
+    return {
+        "seconds": time.perf_counter() - start,
+        "calls": getattr(model, "calls", 0) - calls,
+        "input_tokens": sum(getattr(model, "input_tokens", {}).values()) - tokens,
+        "mode": state.get("course_evaluation_mode"),
+        "evaluation": state.get("course_evaluation") or {},
+    }
+
+
+def _agreement(pairs: list) -> dict:
+    scored = [(s, f) for s, f in pairs if "final_score" in s and "final_score" in f]
+    if not scored:
+        return {"evaluated": 0}
+    return {
+        "evaluated": len(scored),
+        "category_match": round(sum(s["category"] == f["category"] for s, f in scored) / len(scored), 3),
+        "mean_abs_grade_diff": round(statistics.mean(
+            abs(s["individual_scores"][e] - f["individual_scores"][e]) for s, f in scored for e in EVALUATION_ELEMENTS
+        ), 2),
+        "mean_abs_score_diff": round(statistics.mean(abs(s["final_score"] - f["final_score"]) for s, f in scored), 2),
+        "pass_agreement": round(sum(s["passed"] == f["passed"] for s, f in scored) / len(scored), 3),
+    }
+
+
+def _summary(runs: list) -> dict:
+    return {
+        "mean_seconds": round(statistics.mean(r["seconds"] for r in runs), 3),
+        "calls_per_course": round(statistics.mean(r["calls"] for r in runs), 2),
+        "input_tokens_per_course": round(statistics.mean(r["input_tokens"] for r in runs)),
+    }
+
+
+async def _benchmark(sizes: list, courses: int, chunk_tokens: int, input_token_latency: float, live: bool) -> dict:
+    model = MODEL_NAME if live else FakeGemini(input_token_latency=input_token_latency)
+    agent = _pipeline(model, chunk_tokens)
+    results = {}
+    for size in sizes:
+        staged, fused = [], []
+        for index in range(courses):
+            content = _course(size, index)
+            staged.append(await _evaluate(agent, model, content, "staged"))
+            fused.append(await _evaluate(agent, model, content, "fused"))
+        results[f"{size}kb"] = {
+            "staged": _summary(staged),
+            "fused": {**_summary(fused), "fallbacks": sum(r["mode"] != "fused" for r in fused)},
+            "agreement": _agreement([(s["evaluation"], f["evaluation"]) for s, f in zip(staged, fused)]),
+        }
+    return results
+
+
+def main(argv=None):
+    if argv is None:
+        argv = flags.FLAGS(sys.argv)
+    else:
+        argv = flags.FLAGS(argv)
+
+    results = asyncio.run(_benchmark(
+        [int(size) for size in FLAGS.course_kb], FLAGS.courses, FLAGS.chunk_tokens,
+        FLAGS.input_token_latency, FLAGS.live,
+    ))
+
+    print(f"{'size':<8}{'mode':<8}{'seconds':>9}{'calls':>7}{'tokens':>9}")
+    for size, r in results.items():
+        for mode in ("staged", "fused"):
+            m = r[mode]
+            print(f"{size:<8}{mode:<8}{m['mean_seconds']:>9}{m['calls_per_course']:>7}{m['input_tokens_per_course']:>9}")
+        a = r["agreement"]
+        if a["evaluated"]:
+            print(f"        agreement: category {a['category_match']}, grades ±{a['mean_abs_grade_diff']}, "
+                  f"score ±{a['mean_abs_score_diff']}, pass/fail {a['pass_agreement']}, "
+                  f"{r['fused']['fallbacks']} fallbacks to staged")
+    if not FLAGS.live:
+        print("(fake model: agreement only checks the comparison; use --live for real figures)")
+
+    if FLAGS.output:
+        with open(FLAGS.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    absl_app.run(main)
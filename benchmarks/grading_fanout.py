@@ -0,0 +1,84 @@
+"""Compares sequential and fan-out grading latency against a fake model.
+
+Usage:
+    python -m benchmarks.grading_fanout --widths=2,5,10 --repeats=3
+"""
+import asyncio
+import json
+import statistics
+import sys
+import time
+
+from absl import app as absl_app, flags
+
+from google.adk.agents import LlmAgent
+
+from benchmarks.fake_model import FakeGemini, run_agent
+from reviewer.course_grader.agent import build_grader_instruction
+from reviewer.course_grader.parallel import build_parallel_grader
+from reviewer.utils.scoring import parse_grades
+
+FLAGS = flags.FLAGS
+flags.DEFINE_list("widths", ["2", "5", "10"], "Fan-out widths to compare with sequential grading.")
+flags.DEFINE_integer("repeats", 3, "Runs per configuration.")
+flags.DEFINE_integer("course_kb", 200, "Size of the synthetic course content in KB.")
+flags.DEFINE_string("output", None, "Optional path to write the results as JSON.")
+
+
+def _course(size_kb: int) -> str:
+    module = "Module: Smart contract development with Solidity, testing and deployment. "
+    return module * (size_kb * 1024 // len(module) + 1)
+
+
+async def _time_grader(build, content: str, repeats: int) -> dict:
+    timings = []
+    for _ in range(repeats):
+        model = FakeGemini()
+        agent = build(model)
+        start = time.perf_counter()
+        state = await run_agent(agent, content, state={"course_category": "Blockchain Technology and Development"})
+        timings.append(time.perf_counter() - start)
+        parse_grades(state["course_grades"])  # every configuration must produce all 10 grades
+    return {"mean_s": round(statistics.mean(timings), 3), "min_s": round(min(timings), 3), "calls": model.calls}
+
+
+async def _benchmark(widths, repeats: int, content: str) -> dict:
+    results = {
+        "sequential": await _time_grader(
+            lambda model: LlmAgent(
+                model=model,
+                name='course_grader',
+                instruction=build_grader_instruction(),
+                output_key='course_grades',
+            ),
+            content,
+            repeats,
+        )
+    }
+    for width in widths:
+        results[f"parallel_{width}"] = await _time_grader(
+            lambda model: build_parallel_grader(width=width, model=model), content, repeats
+        )
+    return results
+
+
+def main(argv=None):
+    if argv is None:
+        argv = flags.FLAGS(sys.argv)
+    else:
+        argv = flags.FLAGS(argv)
+
+    results = asyncio.run(_benchmark([int(w) for w in FLAGS.widths], FLAGS.repeats, _course(FLAGS.course_kb)))
+
+    baseline = results["sequential"]["mean_s"]
+    print(f"{'mode':<14}{'mean (s)':>10}{'min (s)':>10}{'calls':>8}{'speedup':>10}")
+    for mode, result in results.items():
+        print(f"{mode:<14}{result['mean_s']:>10}{result['min_s']:>10}{result['calls']:>8}{baseline / result['mean_s']:>9.2f}x")
+
+    if FLAGS.output:
+        with open(FLAGS.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    absl_app.run(main)
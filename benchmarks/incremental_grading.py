@@ -0,0 +1,115 @@
+"""Compares full and incremental re-grading of a long course across revisions.
+
+Grades an original course, then a revision with --changed_modules modules
+rewritten, then a revision with a one-word fix, once with the map-reduce
+grader re-reading every chunk and once with incremental grading (chunk
+evidence cached and reused for sections whose text is unchanged).
+Reports latency, evidence extraction calls and input tokens per version.
+
+Usage:
+    python -m benchmarks.incremental_grading --course_kb=400 --changed_modules=2
+"""
+import asyncio
+import json
+import random
+import sys
+import time
+
+from absl import app as absl_app, flags
+
+from benchmarks.fake_model import FakeGemini, run_agent
+from reviewer.course_grader.map_reduce import build_map_reduce_grader
+from reviewer.utils.scoring import parse_grades
+from reviewer.utils.section_cache import get_section_cache
+
+FLAGS = flags.FLAGS
+flags.DEFINE_integer("course_kb", 400, "Synthetic course size in KB.")
+flags.DEFINE_integer("changed_modules", 2, "Modules rewritten in the revised version.")
+flags.DEFINE_integer("chunk_tokens", 32000, "Token budget per chunk for map-reduce grading.")
+flags.DEFINE_float("input_token_latency", 0.00002, "Fake model latency per input token in seconds.")
+flags.DEFINE_integer("seed", 0, "Seed for choosing the modules to change.")
+flags.DEFINE_string("output", None, "Optional path to write the results as JSON.")
+
+_TOPICS = ["smart contracts", "token standards", "DAO governance", "zero-knowledge proofs", "oracles",
+           "layer-2 rollups", "wallet security", "DeFi lending", "NFT marketplaces", "consensus protocols"]
+
+
+def _modules(size_kb: int) -> list:
+    modules, i = [], 0
+    while sum(len(m) for m in modules) < size_kb * 1024:
+        i += 1
+        topic = _TOPICS[i % len(_TOPICS)]
+        body = " ".join(
+            f"In lesson {i}.{j} learners study {topic}, build a small project, review a peer's work "
+            f"and write a reflection on what they would change."
+            for j in range(1, 60)
+        )
+        modules.append(f"Module {i}: {topic.title()} part {i}\n\n{body}\n\n")
+    return modules
+
+
+def _versions(size_kb: int, changed: int, seed: int) -> dict:
+    modules = _modules(size_kb)
+    revised = list(modules)
+    for index in random.Random(seed).sample(range(len(modules)), min(changed, len(modules))):
+        title = revised[index].split("\n", 1)[0]
+        revised[index] = (f"{title}\n\nThis module was rewritten: learners now run a team hackathon, "
+                          f"present a demo to industry mentors and are assessed with a public rubric. " * 40
+                          + "\n\n")
+    # A one-word fix in one module, as in a typo correction
+    typo = list(revised)
+    typo[0] = typo[0].replace("reflection", "short reflection", 1)
+    return {"original": "".join(modules), "revised": "".join(revised), "typo_fix": "".join(typo)}
+
+
+async def _grade(agent, model: FakeGemini, content: str) -> dict:
+    calls_before = model.calls
+    evidence_before = model.busy_seconds.get("evidence", 0.0)
+    start = time.perf_counter()
+    state = await run_agent(agent, content, state={"course_category": "Blockchain Technology and Development"})
+    elapsed = time.perf_counter() - start
+    parse_grades(state["course_grades"])
+    return {
+        "seconds": round(elapsed, 3),
+        "model_calls": model.calls - calls_before,
+        "evidence_model_seconds": round(model.busy_seconds.get("evidence", 0.0) - evidence_before, 3),
+        "chunks": state.get("course_grader_chunks"),
+        "reused_chunks": state.get("course_grader_reused_chunks", 0),
+    }
+
+
+async def _benchmark(size_kb: int, changed: int, chunk_tokens: int, input_token_latency: float, seed: int) -> dict:
+    versions = _versions(size_kb, changed, seed)
+    results = {}
+    for mode, incremental in (("full", False), ("incremental", True)):
+        model = FakeGemini(input_token_latency=input_token_latency)
+        agent = build_map_reduce_grader(chunk_tokens=chunk_tokens, model=model, incremental=incremental)
+        results[mode] = {name: await _grade(agent, model, content) for name, content in versions.items()}
+    results["section_cache"] = get_section_cache().stats()
+    return results
+
+
+def main(argv=None):
+    if argv is None:
+        argv = flags.FLAGS(sys.argv)
+    else:
+        argv = flags.FLAGS(argv)
+
+    results = asyncio.run(_benchmark(
+        FLAGS.course_kb, FLAGS.changed_modules, FLAGS.chunk_tokens, FLAGS.input_token_latency, FLAGS.seed
+    ))
+
+    print(f"{'mode':<13}{'version':<11}{'seconds':>9}{'calls':>7}{'chunks':>8}{'reused':>8}{'evidence s':>12}")
+    for mode in ("full", "incremental"):
+        for version, r in results[mode].items():
+            print(f"{mode:<13}{version:<11}{r['seconds']:>9}{r['model_calls']:>7}{r['chunks']!s:>8}"
+                  f"{r['reused_chunks']:>8}{r['evidence_model_seconds']:>12}")
+    print(f"section cache: {results['section_cache']}")
+
+    if FLAGS.output:
+        with open(FLAGS.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    absl_app.run(main)
@@ -0,0 +1,163 @@
+"""Measures the prompt tokens each pipeline stage sends per request.
+
+Compares the prompts as they were before category-specific rendering
+(one template per stage, category filled in from session state, example
+output in every grading prompt, the summary given the whole evaluation as
+indented JSON) with the prompts now rendered once per category. For each
+category the report gives estimated instruction tokens per stage, the
+tokens saved per evaluation, and the cost of producing a prompt on a
+cached and an uncached call.
+
+Usage:
+    python -m benchmarks.prompt_tokens
+    python -m benchmarks.prompt_tokens --grader=parallel --output=prompt_tokens.json
+"""
+import json
+import sys
+import time
+from types import SimpleNamespace
+
+from absl import app as absl_app, flags
+
+from reviewer.course_grader.agent import build_grader_instruction, grader_instruction
+from reviewer.course_grader.map_reduce import build_evidence_instruction
+from reviewer.course_grader.parallel import split_elements
+from reviewer.score_calculator import agent as score_calculator
+from reviewer.utils.chunking import estimate_tokens
+from reviewer.utils.prompts import CategoryInstruction
+from reviewer.utils.scoring import calculate_score, parse_grades
+from reviewer.utils.weights import COURSE_CLUSTERS, EVALUATION_ELEMENTS
+
+FLAGS = flags.FLAGS
+flags.DEFINE_enum("grader", "single", ["single", "parallel", "map_reduce"], "Grading mode whose prompts are counted.")
+flags.DEFINE_integer("width", 5, "Parallel grading branches (with --grader=parallel).")
+flags.DEFINE_integer("chunks", 8, "Evidence chunks per course (with --grader=map_reduce).")
+flags.DEFINE_integer("repeat", 2000, "Prompt renders timed per measurement.")
+flags.DEFINE_string("output", None, "Optional path to write the report as JSON.")
+
+_GRADES = json.dumps({element: 70 + i * 3 for i, element in enumerate(EVALUATION_ELEMENTS)})
+
+
+def _legacy_summary(context) -> str:
+    state = context.state
+    evaluation = calculate_score(state["course_category"], json.loads(state["course_grades"]))
+    return f"""You are a course quality reviewer for the ABYA University course evaluation system.
+
+The course content provided by the course provider has already been graded and scored.
+The scores below are final and must not be recalculated or changed.
+
+**Evaluation (JSON):**
+{json.dumps(evaluation, indent=2)}
+
+**Your Task:**
+Write feedback for the course provider based on the evaluation above.
+
+**Output Format:**
+Provide a JSON object with exactly these keys:
+
+{{
+    "summary": "[2-3 sentence evaluation summary highlighting the course's strengths and areas for improvement from the course provider's perspective]",
+    "recommendation": "[brief recommendation for the course provider on how to improve the course content and delivery]"
+}}
+
+**Important:**
+- Focus on course design, content quality, and instructional effectiveness
+- Output ONLY the JSON object with no additional text or formatting
+"""
+
+
+def _stages(grader: str, width: int, chunks: int) -> dict:
+    """Maps each stage to (calls per evaluation, legacy prompt fn, current prompt fn) over a context."""
+    def template(text):
+        # The legacy templates had {course_category} filled in by ADK
+        return lambda context: text.replace("{course_category}", context.state["course_category"])
+
+    if grader == "parallel":
+        groups = split_elements(width)
+        stages = {
+            f"grade_group_{i}": (1, template(build_grader_instruction(elements)), grader_instruction(elements))
+            for i, elements in enumerate(groups, start=1)
+        }
+    elif grader == "map_reduce":
+        source = "the course from the section-by-section evidence provided by the user"
+        stages = {
+            "evidence": (chunks, template(build_evidence_instruction()), CategoryInstruction(build_evidence_instruction)),
+            "grade_reduce": (1, template(build_grader_instruction(source=source)), grader_instruction(source=source)),
+        }
+    else:
+        stages = {"grade": (1, template(build_grader_instruction()), grader_instruction())}
+    stages["summary"] = (1, _legacy_summary, score_calculator._score_summary_instruction)
+    return stages
+
+
+def _render_us(provider, context, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        provider(context)
+    return round((time.perf_counter() - start) / repeat * 1e6, 2)
+
+
+def main(argv=None):
+    if argv is None:
+        argv = flags.FLAGS(sys.argv)
+    else:
+        argv = flags.FLAGS(argv)
+
+    stages = _stages(FLAGS.grader, FLAGS.width, FLAGS.chunks)
+    report = {"grader": FLAGS.grader, "categories": {}}
+    for category in COURSE_CLUSTERS:
+        context = SimpleNamespace(state={
+            "course_category": category,
+            "course_grades": _GRADES,
+            "course_score": calculate_score(category, parse_grades(_GRADES)),
+        })
+        per_stage = {}
+        for stage, (calls, legacy, current) in stages.items():
+            per_stage[stage] = {
+                "calls": calls,
+                "legacy_tokens": estimate_tokens(legacy(context)),
+                "tokens": estimate_tokens(current(context)),
+            }
+        legacy_total = sum(s["calls"] * s["legacy_tokens"] for s in per_stage.values())
+        total = sum(s["calls"] * s["tokens"] for s in per_stage.values())
+        report["categories"][category] = {
+            "stages": per_stage,
+            "legacy_tokens_per_evaluation": legacy_total,
+            "tokens_per_evaluation": total,
+            "saved_per_evaluation": legacy_total - total,
+            "saved_pct": round((legacy_total - total) / legacy_total * 100, 1),
+        }
+
+    # Render cost: a fresh provider renders on every call, a warm one returns the cached prompt
+    context = SimpleNamespace(state={
+        "course_category": COURSE_CLUSTERS[0],
+        "course_grades": _GRADES,
+        "course_score": calculate_score(COURSE_CLUSTERS[0], parse_grades(_GRADES)),
+    })
+    warm = grader_instruction()
+    report["render_us"] = {
+        "uncached": _render_us(lambda c: grader_instruction()(c), context, FLAGS.repeat),
+        "cached": _render_us(warm, context, FLAGS.repeat),
+        "summary": _render_us(score_calculator._score_summary_instruction, context, FLAGS.repeat),
+    }
+
+    first = next(iter(report["categories"].values()))
+    print(f"grader: {FLAGS.grader}")
+    print(f"{'stage':<16}{'calls':>6}{'legacy tokens':>15}{'tokens':>8}")
+    for stage, s in first["stages"].items():
+        print(f"{stage:<16}{s['calls']:>6}{s['legacy_tokens']:>15}{s['tokens']:>8}")
+    print(f"\n{'category':<50}{'legacy':>8}{'now':>6}{'saved':>7}{'saved %':>9}")
+    for category, c in report["categories"].items():
+        print(f"{category:<50}{c['legacy_tokens_per_evaluation']:>8}{c['tokens_per_evaluation']:>6}"
+              f"{c['saved_per_evaluation']:>7}{c['saved_pct']:>9}")
+    render = report["render_us"]
+    print(f"\nprompt render: {render['uncached']} us uncached, {render['cached']} us cached, "
+          f"{render['summary']} us summary")
+
+    if FLAGS.output:
+        with open(FLAGS.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    absl_app.run(main)
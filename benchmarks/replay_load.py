@@ -0,0 +1,283 @@
+"""Load-tests our own code with model calls replayed from a cassette.
+
+First record a cassette: every model call the pipeline makes is saved,
+keyed by a hash of its request, to a gzip JSONL file. Recording uses the
+fake model by default, or the real one with --live (Vertex AI credentials
+required):
+
+    python -m benchmarks.replay_load --record --cassette=/tmp/reviewer.jsonl.gz --courses=20
+    python -m benchmarks.replay_load --record --live --cassette=recorded.jsonl.gz --courses=20
+
+Then replay it at --latency seconds per model call (the recorded duration
+with --latency=-1) through the pipeline, the web server's /api/analyze or
+the deployment CLI's --batch, with no network calls:
+
+    python -m benchmarks.replay_load --cassette=/tmp/reviewer.jsonl.gz --target=server --concurrency=1,16,64
+    python -m benchmarks.replay_load --cassette=/tmp/reviewer.jsonl.gz --requests=500 --profile=25
+
+Requests cycle through the recorded courses, so model calls hit their exact
+recording; the cassette stats show any that had to fall back to another
+recording of the same stage. The server still coalesces identical requests
+in flight, so it makes fewer model calls than it serves. The batch target
+runs ``python -m deployment.remote --batch --local`` in a child process, so
+its cassette stats are not reported. --profile prints the functions of this repo
+that took the most time (pipeline target only: cProfile follows one thread).
+"""
+import asyncio
+import cProfile
+import json
+import logging
+import os
+import pstats
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from absl import app as absl_app, flags
+
+FLAGS = flags.FLAGS
+flags.DEFINE_string("cassette", None, "Cassette file to record to or replay from.", required=True)
+flags.DEFINE_bool("record", False, "Record the cassette instead of replaying it.")
+flags.DEFINE_bool("live", False, "Record from the real model instead of the fake one.")
+flags.DEFINE_integer("courses", 20, "Distinct synthetic courses to record and replay.")
+flags.DEFINE_integer("course_kb", 8, "Size of the synthetic courses in KB.")
+flags.DEFINE_enum("target", "pipeline", ["pipeline", "server", "batch"], "What to drive with the replayed model.")
+flags.DEFINE_list("concurrency", ["1", "16", "64"], "Concurrency levels to measure throughput at.")
+flags.DEFINE_integer("requests", 200, "Requests per concurrency level.")
+flags.DEFINE_float("latency", 0.05, "Replayed model latency per call in seconds (-1 = as recorded).")
+flags.DEFINE_integer("profile", 0, "Print the N functions of this repo with the most cumulative time.")
+flags.DEFINE_string("output", None, "Optional path to write the results as JSON.")
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_TOPICS = ["Solidity smart contracts", "token economics for founders", "DAO governance operations",
+           "zero-knowledge proof systems", "Web3 front-end design", "AI agents on blockchains"]
+
+
+def _course(size_kb: int, index: int) -> str:
+    topic = _TOPICS[index % len(_TOPICS)]
+    modules, i = [f"Course {index}: {topic.title()}\n\n"], 0
+    while sum(len(m) for m in modules) < size_kb * 1024:
+        i += 1
+        body = (f"In lesson {i} learners study {topic}, complete a hands-on lab, discuss it with peers "
+                f"and write a short reflection. ") * 40
+        modules.append(f"Module {i}: {topic.title()} part {i}\n\n{body}\n\n")
+    return "".join(modules)
+
+
+def _summary(latencies: list, failed: int, elapsed: float) -> dict:
+    ordered = sorted(latencies)
+    return {
+        "requests": len(latencies) + failed,
+        "failed": failed,
+        "requests_per_min": round(len(latencies) / elapsed * 60, 1),
+        "p50_ms": round(statistics.median(ordered) * 1000, 2) if ordered else None,
+        "p95_ms": round(ordered[int(0.95 * (len(ordered) - 1))] * 1000, 2) if ordered else None,
+    }
+
+
+async def _evaluate(runner, content: str) -> bool:
+    from google.genai import types
+
+    session = runner.session_service.create_session(app_name=runner.app_name, user_id="bench")
+    message = types.Content(role="user", parts=[types.Part(text=content)])
+    async for _ in runner.run_async(user_id="bench", session_id=session.id, new_message=message):
+        pass
+    state = runner.session_service.get_session(
+        app_name=runner.app_name, user_id="bench", session_id=session.id
+    ).state
+    # Sessions are not reused, so drop them to keep memory flat over long runs
+    runner.session_service.delete_session(app_name=runner.app_name, user_id="bench", session_id=session.id)
+    return "final_score" in (state.get("course_evaluation") or {})
+
+
+async def _pipeline_level(runner, level: int, requests: int, course_kb: int, courses: int) -> dict:
+    semaphore = asyncio.Semaphore(level)
+
+    async def bounded(i):
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                ok = await _evaluate(runner, _course(course_kb, i % courses))
+            except Exception:
+                ok = False
+            return time.perf_counter() - start, ok
+
+    start = time.perf_counter()
+    runs = await asyncio.gather(*(bounded(i) for i in range(requests)))
+    elapsed = time.perf_counter() - start
+    return _summary([latency for latency, ok in runs if ok], sum(not ok for _, ok in runs), elapsed)
+
+
+def _record(agent, courses: int, course_kb: int) -> int:
+    from google.adk.runners import InMemoryRunner
+
+    runner = InMemoryRunner(agent, app_name="benchmark")
+
+    async def record_all():
+        return [await _evaluate(runner, _course(course_kb, i)) for i in range(courses)]
+
+    return sum(asyncio.run(record_all()))
+
+
+def _pipeline_benchmark(agent, levels: list, requests: int, course_kb: int, courses: int, profile: int) -> dict:
+    from google.adk.runners import InMemoryRunner
+
+    runner = InMemoryRunner(agent, app_name="benchmark")
+    profiler = cProfile.Profile() if profile else None
+    results = {}
+    for level in levels:
+        if profiler:
+            profiler.enable()
+        results[str(level)] = asyncio.run(_pipeline_level(runner, level, requests, course_kb, courses))
+        if profiler:
+            profiler.disable()
+    if profiler:
+        stats = pstats.Stats(profiler).sort_stats("cumulative")
+        own = [(func, row) for func, row in stats.stats.items() if func[0].startswith(_ROOT)]
+        own.sort(key=lambda item: item[1][3], reverse=True)
+        print(f"{'cumulative s':>13}{'own s':>9}{'calls':>9}  function")
+        for (path, line, name), (_, calls, own_time, cumulative, _) in own[:profile]:
+            print(f"{cumulative:>13.3f}{own_time:>9.3f}{calls:>9}  {os.path.relpath(path, _ROOT)}:{line}({name})")
+    return results
+
+
+def _server_benchmark(levels: list, requests: int, course_kb: int, courses: int) -> dict:
+    data_dir = tempfile.mkdtemp(prefix="reviewer-replay-")
+    os.environ.update({
+        "COURSE_REVIEWER_LOCAL_ENGINE": "true",
+        "COURSE_REVIEWER_DB": os.path.join(data_dir, "reviewer.db"),
+        # Requests repeat the recorded courses; without this they would be answered from the cache
+        "COURSE_REVIEWER_CACHE_MAX_ENTRIES": "0",
+        "COURSE_REVIEWER_CACHE_DIR": "",
+    })
+    os.environ.pop("COURSE_REVIEWER_FAKE_ENGINE", None)
+    sys.path.insert(0, os.path.join(_ROOT, "web-ui"))
+    import server
+
+    # Failures are counted in the results rather than logged per request
+    server.logger.setLevel(logging.CRITICAL)
+    if server.session_pool is not None:
+        server.session_pool.wait_until_ready(timeout=30)
+    session_id = server.app.test_client().post("/api/create-session").get_json()["session_id"]
+    local = threading.local()
+
+    def analyze(i):
+        client = getattr(local, "client", None) or server.app.test_client()
+        local.client = client
+        start = time.perf_counter()
+        response = client.post("/api/analyze", json={"session_id": session_id, "content": _course(course_kb, i % courses)})
+        return time.perf_counter() - start, response.status_code == 200 and response.get_json().get("success")
+
+    results = {}
+    for level in levels:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=level) as executor:
+            runs = list(executor.map(analyze, range(requests)))
+        elapsed = time.perf_counter() - start
+        results[str(level)] = _summary([latency for latency, ok in runs if ok], sum(not ok for _, ok in runs), elapsed)
+    server.evaluation_store.flush()
+    return results
+
+
+def _batch_benchmark(levels: list, requests: int, course_kb: int, courses: int) -> dict:
+    data_dir = tempfile.mkdtemp(prefix="reviewer-replay-")
+    input_path = os.path.join(data_dir, "courses.jsonl")
+    with open(input_path, "w") as f:
+        for i in range(requests):
+            f.write(json.dumps({"id": i, "content": _course(course_kb, i % courses)}) + "\n")
+
+    results = {}
+    for level in levels:
+        # The real CLI, which inherits the REVIEWER_CASSETTE settings; its own
+        # progress line times the batch, leaving out interpreter start-up
+        process = subprocess.run(
+            [sys.executable, "-m", "deployment.remote", "--batch", "--local", f"--input={input_path}",
+             f"--output={os.path.join(data_dir, f'results-{level}.jsonl')}", f"--concurrency={level}",
+             f"--progress_every={requests}"],
+            cwd=_ROOT, capture_output=True, text=True,
+        )
+        progress = re.findall(r"Progress: (\d+) evaluated, (\d+) failed, .*?, ([\d.]+) courses/min", process.stdout)
+        if not progress:
+            raise RuntimeError(f"deployment.remote --batch failed:\n{process.stdout}{process.stderr}")
+        evaluated, failed, rate = progress[-1]
+        # The CLI reports throughput, not per-course latency
+        results[str(level)] = {"requests": int(evaluated) + int(failed), "failed": int(failed),
+                               "requests_per_min": float(rate)}
+    return results
+
+
+def main(argv=None):
+    if argv is None:
+        argv = flags.FLAGS(sys.argv)
+    else:
+        argv = flags.FLAGS(argv)
+
+    cassette_path = os.path.abspath(FLAGS.cassette)
+    if FLAGS.record and not FLAGS.live:
+        # The fake model is put in place after import, so the cassette wraps it below
+        os.environ.pop("REVIEWER_CASSETTE", None)
+    else:
+        os.environ.update({
+            "REVIEWER_CASSETTE": cassette_path,
+            "REVIEWER_CASSETTE_MODE": "record" if FLAGS.record else "replay",
+        })
+        if FLAGS.latency >= 0:
+            os.environ["REVIEWER_CASSETTE_LATENCY"] = str(FLAGS.latency)
+        else:
+            os.environ.pop("REVIEWER_CASSETTE_LATENCY", None)
+
+    from reviewer.agent import root_agent
+    from reviewer.utils.cassette import cassette_stats, get_cassette
+
+    if FLAGS.record:
+        if not FLAGS.live:
+            from benchmarks.fake_model import FakeGemini, use_model
+            from reviewer.utils.cassette_llm import use_cassette
+
+            use_cassette(use_model(root_agent, FakeGemini()), cassette_path, record=True)
+        evaluated = _record(root_agent, FLAGS.courses, FLAGS.course_kb)
+        get_cassette(cassette_path).close()
+        stats = get_cassette(cassette_path).stats()
+        print(f"Recorded {stats['recorded']} model calls from {evaluated}/{FLAGS.courses} courses "
+              f"({stats['entries']} in {FLAGS.cassette}, {os.path.getsize(cassette_path) // 1024} KB)")
+        return
+
+    if not os.path.exists(cassette_path):
+        print(f"No cassette at {FLAGS.cassette}; record one with --record")
+        return
+
+    levels = [int(level) for level in FLAGS.concurrency]
+    if FLAGS.target == "pipeline":
+        levels_results = _pipeline_benchmark(root_agent, levels, FLAGS.requests, FLAGS.course_kb,
+                                             FLAGS.courses, FLAGS.profile)
+    elif FLAGS.target == "server":
+        levels_results = _server_benchmark(levels, FLAGS.requests, FLAGS.course_kb, FLAGS.courses)
+    else:
+        levels_results = _batch_benchmark(levels, FLAGS.requests, FLAGS.course_kb, FLAGS.courses)
+    results = {
+        "target": FLAGS.target,
+        "latency": FLAGS.latency,
+        "levels": levels_results,
+        "cassette": cassette_stats().get(cassette_path),
+    }
+
+    print(f"{'concurrency':<13}{'req/min':>10}{'p50 ms':>10}{'p95 ms':>10}{'failed':>8}")
+    for level, r in levels_results.items():
+        print(f"{level:<13}{r['requests_per_min']:>10}{r.get('p50_ms', '-'):>10}{r.get('p95_ms', '-'):>10}{r['failed']:>8}")
+    c = results["cassette"]
+    if c:
+        print(f"cassette: {c['exact']} exact, {c['fallback']} fallback, {c['misses']} missed model calls "
+              f"({c['entries']} recordings)")
+
+    if FLAGS.output:
+        with open(FLAGS.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    absl_app.run(main)
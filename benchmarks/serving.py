@@ -0,0 +1,216 @@
+"""Load-tests the web server under the Flask dev server and under gunicorn.
+
+Each mode starts web-ui/server.py in a subprocess against the local fake
+Agent Engine (COURSE_REVIEWER_FAKE_LATENCY seconds per pipeline stage).
+--clients threads then post unique courses to /api/analyze while one
+more thread polls /api/health. That shows whether slow evaluations hold
+up quick requests. The report gives evaluation throughput, p50/p95/p99
+latency and errors per mode, plus health-check latency under load.
+
+It then checks graceful shutdown. It queues --drain_jobs jobs, sends
+SIGTERM and counts how many results still reach the store.
+
+Usage:
+    python -m benchmarks.serving --clients=32 --requests=256 --latency=0.5
+    python -m benchmarks.serving --modes=gunicorn --workers=2 --threads=64 --output=serving.json
+"""
+import json
+import os
+import shutil
+import signal
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from absl import app as absl_app, flags
+
+FLAGS = flags.FLAGS
+flags.DEFINE_list("modes", ["dev", "gunicorn"], "Servers to compare: dev (python server.py) and/or gunicorn.")
+flags.DEFINE_integer("clients", 32, "Concurrent clients posting evaluations.")
+flags.DEFINE_integer("requests", 256, "Evaluations per mode.")
+flags.DEFINE_float("latency", 0.5, "Fake Agent Engine latency per pipeline stage in seconds.")
+flags.DEFINE_integer("workers", 2, "gunicorn worker processes (COURSE_REVIEWER_WORKERS).")
+flags.DEFINE_integer("threads", 64, "gunicorn threads per worker (COURSE_REVIEWER_THREADS).")
+flags.DEFINE_integer("drain_jobs", 8, "Jobs in flight when the server is sent SIGTERM (0 skips the drain check).")
+flags.DEFINE_integer("port", 5055, "Port to serve on.")
+flags.DEFINE_string("output", None, "Optional path to write the report as JSON.")
+
+WEB_UI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "web-ui")
+
+
+def _percentiles(values: list) -> dict:
+    if not values:
+        return {"p50_ms": None, "p95_ms": None, "p99_ms": None}
+    ordered = sorted(values)
+
+    def pick(pct):
+        return round(ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))] * 1000, 1)
+
+    return {"p50_ms": pick(50), "p95_ms": pick(95), "p99_ms": pick(99)}
+
+
+def _request(url: str, payload: dict = None, method: str = None, timeout: float = 120) -> tuple:
+    data = json.dumps(payload).encode("utf-8") if payload is not None else None
+    request = urllib.request.Request(url, data=data, method=method or ("POST" if data else "GET"),
+                                     headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, json.loads(response.read() or b"{}")
+    except urllib.error.HTTPError as e:
+        return e.code, {}
+    except (urllib.error.URLError, ConnectionError, TimeoutError):
+        return None, {}
+
+
+def _start(mode: str, port: int, data_dir: str) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        PORT=str(port),
+        COURSE_REVIEWER_FAKE_ENGINE="true",
+        COURSE_REVIEWER_FAKE_LATENCY=str(FLAGS.latency),
+        COURSE_REVIEWER_CACHE_DIR="",
+        COURSE_REVIEWER_DB=os.path.join(data_dir, f"{mode}.db"),
+        COURSE_REVIEWER_WORKERS=str(FLAGS.workers),
+        COURSE_REVIEWER_THREADS=str(FLAGS.threads),
+        COURSE_REVIEWER_JOB_WORKERS=str(max(FLAGS.drain_jobs, 4)),
+        COURSE_REVIEWER_DRAIN_TIMEOUT="60",
+    )
+    if mode == "dev":
+        command = [sys.executable, "server.py"]
+    else:
+        command = [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py"]
+    log_path = os.path.join(data_dir, f"{mode}.log")
+    with open(log_path, "w") as log:
+        process = subprocess.Popen(command, cwd=WEB_UI, env=env, start_new_session=True,
+                                   stdout=log, stderr=subprocess.STDOUT)
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            with open(log_path) as log:
+                raise RuntimeError(f"{mode} server exited:\n{log.read()[-2000:]}")
+        if _request(f"http://127.0.0.1:{port}/api/health", timeout=1)[0] == 200:
+            return process
+        time.sleep(0.2)
+    _stop(process)
+    raise RuntimeError(f"{mode} server did not become healthy")
+
+
+def _stop(process: subprocess.Popen, timeout: float = 90) -> float:
+    """SIGTERMs the server's process group and returns how long it took to exit"""
+    start = time.perf_counter()
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+    except ProcessLookupError:
+        pass
+    return time.perf_counter() - start
+
+
+def _load_test(base: str) -> dict:
+    session_id = _request(f"{base}/api/create-session", {})[1]["session_id"]
+    stop = threading.Event()
+    health = []
+
+    def poll_health():
+        while not stop.is_set():
+            start = time.perf_counter()
+            if _request(f"{base}/api/health", timeout=30)[0] == 200:
+                health.append(time.perf_counter() - start)
+            time.sleep(0.05)
+
+    def analyze(i):
+        start = time.perf_counter()
+        status, body = _request(f"{base}/api/analyze", {"session_id": session_id, "content": f"Course {i}\nModule 1: Solidity"})
+        return time.perf_counter() - start, status == 200 and body.get("success")
+
+    poller = threading.Thread(target=poll_health, daemon=True)
+    poller.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=FLAGS.clients) as executor:
+        runs = list(executor.map(analyze, range(FLAGS.requests)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    poller.join()
+
+    latencies = [latency for latency, ok in runs if ok]
+    return {
+        "analyze": {
+            **_percentiles(latencies),
+            "throughput_rps": round(len(latencies) / elapsed, 2),
+            "errors": sum(not ok for _, ok in runs),
+        },
+        "health_under_load": {**_percentiles(health), "mean_ms": round(statistics.mean(health) * 1000, 1) if health else None},
+    }
+
+
+def _drain_test(base: str, process: subprocess.Popen, db_path: str) -> dict:
+    """Queues jobs, SIGTERMs the server and counts the jobs whose results were still stored"""
+    session_id = _request(f"{base}/api/create-session", {})[1]["session_id"]
+    queued = sum(
+        _request(f"{base}/api/jobs", {"session_id": session_id, "content": f"Drain course {i}"})[0] == 202
+        for i in range(FLAGS.drain_jobs)
+    )
+    time.sleep(FLAGS.latency)  # let the jobs start
+    shutdown_seconds = _stop(process)
+    # Jobs live in whichever worker accepted them, but every worker writes to the same store
+    with sqlite3.connect(db_path) as conn:
+        stored = conn.execute("SELECT COUNT(*) FROM evaluations WHERE session_id = ?", (session_id,)).fetchone()[0]
+    return {
+        "jobs": queued,
+        "finished": stored,
+        "lost": queued - stored,
+        "shutdown_seconds": round(shutdown_seconds, 2),
+    }
+
+
+def main(argv=None):
+    if argv is None:
+        argv = flags.FLAGS(sys.argv)
+    else:
+        argv = flags.FLAGS(argv)
+
+    data_dir = tempfile.mkdtemp(prefix="reviewer-serving-")
+    base = f"http://127.0.0.1:{FLAGS.port}"
+    report = {"config": {key: FLAGS[key].value for key in
+                         ("clients", "requests", "latency", "workers", "threads", "drain_jobs")}, "modes": {}}
+    try:
+        for mode in FLAGS.modes:
+            process = _start(mode, FLAGS.port, data_dir)
+            try:
+                result = _load_test(base)
+                if FLAGS.drain_jobs:
+                    result["drain"] = _drain_test(base, process, os.path.join(data_dir, f"{mode}.db"))
+            finally:
+                if process.poll() is None:
+                    _stop(process)
+            report["modes"][mode] = result
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    print(f"{'mode':<10}{'req/s':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}{'health p95 ms':>15}")
+    for mode, result in report["modes"].items():
+        analyze, health = result["analyze"], result["health_under_load"]
+        print(f"{mode:<10}{analyze['throughput_rps']:>8}{analyze['p50_ms']!s:>9}{analyze['p95_ms']!s:>9}"
+              f"{analyze['p99_ms']!s:>9}{analyze['errors']:>8}{health['p95_ms']!s:>15}")
+        if "drain" in result:
+            drain = result["drain"]
+            print(f"  drain: {drain['finished']}/{drain['jobs']} in-flight jobs finished after SIGTERM, "
+                  f"exit took {drain['shutdown_seconds']}s")
+
+    if FLAGS.output:
+        with open(FLAGS.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    absl_app.run(main)
@@ -0,0 +1,143 @@
+"""Measures import time of the package and CLIs and checks it against a startup budget.
+
+Each target is imported in a fresh interpreter with ``-X importtime``. The
+report shows the median import time and the slowest modules. It exits
+non-zero when a target goes over its budget or loads a module it should
+leave for later, such as Vertex AI or ADK for a CLI that has only parsed
+its flags.
+
+Usage:
+    python -m benchmarks.startup --repeats=5 --output=startup.json
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from absl import app as absl_app, flags
+
+FLAGS = flags.FLAGS
+flags.DEFINE_multi_string("target", None, "Targets to measure (default: all).")
+flags.DEFINE_integer("repeats", 5, "Fresh interpreters per target; the median is reported.")
+flags.DEFINE_integer("top", 8, "Slowest modules to list per target.")
+flags.DEFINE_float("budget_scale", 1.0, "Multiplier for every budget, for slower machines.")
+flags.DEFINE_string("output", None, "Optional path to write the report as JSON.")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# target: (statement, import budget in ms, modules that must not be loaded)
+TARGETS = {
+    "reviewer": ("import reviewer", 50, ("google.adk", "vertexai")),
+    "reviewer.utils": (
+        "import reviewer.utils.scoring, reviewer.utils.fingerprint, reviewer.utils.metrics",
+        100, ("google.adk", "vertexai"),
+    ),
+    "deployment.client": ("import deployment.client", 300, ("google.adk", "vertexai")),
+    "deployment.remote": ("import deployment.remote", 500, ("google.adk", "vertexai")),
+    # The pipeline itself needs ADK (which loads Vertex AI); measured for reference
+    "reviewer.agent": ("import reviewer.agent", 15000, ()),
+}
+
+
+def _parse_importtime(stderr: str) -> list:
+    """Returns (module, self_us, cumulative_us, depth) for each line of -X importtime output."""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        modules.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return modules
+
+
+def _measure_once(statement: str) -> tuple:
+    start = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - start
+    if process.returncode != 0:
+        raise RuntimeError(f"'{statement}' failed:\n{process.stderr[-2000:]}")
+    return wall, _parse_importtime(process.stderr)
+
+
+def _interpreter_baseline(repeats: int) -> tuple:
+    """Wall time of an interpreter that imports nothing, and the modules it loads anyway."""
+    runs = [_measure_once("pass") for _ in range(repeats)]
+    return statistics.median(wall for wall, _ in runs), {module for module, *_ in runs[0][1]}
+
+
+def measure(name: str, repeats: int, top: int, baseline: tuple, budget_scale: float) -> dict:
+    statement, budget_ms, forbidden = TARGETS[name]
+    interpreter_wall, startup_modules = baseline
+    runs = [_measure_once(statement) for _ in range(repeats)]
+    # Only count the modules the statement pulled in, not interpreter startup (encodings, site, ...)
+    import_ms = [
+        sum(cumulative for module, _, cumulative, depth in modules if depth == 0 and module not in startup_modules) / 1000
+        for _, modules in runs
+    ]
+    wall = statistics.median(wall for wall, _ in runs)
+    modules = [m for m in runs[len(runs) // 2][1] if m[0] not in startup_modules]
+    violations = sorted(module for module, *_ in modules
+                        if any(module == f or module.startswith(f + ".") for f in forbidden))
+
+    result = {
+        "statement": statement,
+        "import_ms": round(statistics.median(import_ms), 1),
+        "wall_ms": round(wall * 1000, 1),
+        "startup_overhead_ms": round((wall - interpreter_wall) * 1000, 1),
+        "budget_ms": round(budget_ms * budget_scale, 1),
+        "modules_loaded": len(modules),
+        "slowest": [
+            {"module": module, "self_ms": round(self_us / 1000, 1), "cumulative_ms": round(cumulative_us / 1000, 1)}
+            for module, self_us, cumulative_us, _ in sorted(modules, key=lambda m: -m[1])[:top]
+        ],
+        "forbidden_loaded": violations[:20],
+    }
+    result["over_budget"] = result["import_ms"] > result["budget_ms"]
+    return result
+
+
+def main(argv=None):
+    if argv is None:
+        argv = flags.FLAGS(sys.argv)
+    else:
+        argv = flags.FLAGS(argv)
+
+    names = FLAGS.target or list(TARGETS)
+    unknown = [name for name in names if name not in TARGETS]
+    if unknown:
+        raise SystemExit(f"Unknown targets: {', '.join(unknown)} (choose from {', '.join(TARGETS)})")
+
+    baseline = _interpreter_baseline(FLAGS.repeats)
+    report = {"python": sys.version.split()[0], "interpreter_ms": round(baseline[0] * 1000, 1), "targets": {}}
+    failed = []
+    for name in names:
+        result = measure(name, FLAGS.repeats, FLAGS.top, baseline, FLAGS.budget_scale)
+        report["targets"][name] = result
+        status = "OK"
+        if result["forbidden_loaded"]:
+            status = f"LOADS {result['forbidden_loaded'][0]}"
+        elif result["over_budget"]:
+            status = "OVER BUDGET"
+        if status != "OK":
+            failed.append(name)
+        print(f"{name:<20}{result['import_ms']:>9.1f} ms  (budget {result['budget_ms']:.0f} ms, "
+              f"{result['modules_loaded']} modules)  {status}")
+        for module in result["slowest"]:
+            print(f"    {module['module']:<48}{module['self_ms']:>8.1f} ms self{module['cumulative_ms']:>9.1f} ms total")
+
+    if FLAGS.output:
+        with open(FLAGS.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if failed:
+        print(f"Startup check failed for: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    absl_app.run(main)
@@ -0,0 +1,106 @@
+import os
+import threading
+from typing import Iterable, Iterator, Optional
+
+from dotenv import load_dotenv
+
+from deployment.events import read_events
+
+_vertexai_lock = threading.Lock()
+_vertexai_initialized = False
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def init_vertexai(project_id: Optional[str] = None, location: Optional[str] = None,
+                  bucket: Optional[str] = None) -> None:
+    """Initializes Vertex AI once per process."""
+    global _vertexai_initialized
+    if _vertexai_initialized:
+        return
+    with _vertexai_lock:
+        if _vertexai_initialized:
+            return
+        import vertexai
+
+        load_dotenv()
+        vertexai.init(
+            project=project_id or os.getenv("GOOGLE_CLOUD_PROJECT"),
+            location=location or os.getenv("GOOGLE_CLOUD_LOCATION"),
+            staging_bucket=bucket or os.getenv("GOOGLE_CLOUD_STAGING_BUCKET"),
+        )
+        _vertexai_initialized = True
+
+
+class AgentEngineClient:
+    """Long-lived, thread-safe handle on one deployed Agent Engine.
+
+    The remote engine is resolved once and then shared by every caller, so
+    requests reuse the same API client and its pooled connections instead
+    of re-initializing Vertex AI for each evaluation. Pass ``engine`` to use
+    a local stand-in (see deployment/fake_engine.py).
+    """
+
+    def __init__(self, resource_id: str, engine=None):
+        self.resource_id = resource_id
+        self._engine = engine
+        self._lock = threading.Lock()
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            with self._lock:
+                if self._engine is None:
+                    from vertexai import agent_engines
+
+                    init_vertexai()
+                    self._engine = agent_engines.get(self.resource_id)
+        return self._engine
+
+    def warm_up(self) -> None:
+        """Resolves the remote engine ahead of the first request."""
+        self.engine
+
+    def create_session(self, user_id: str, **kwargs) -> dict:
+        """Creates a remote session and returns it as a dict."""
+        return self.engine.create_session(user_id=user_id, **kwargs)
+
+    def list_sessions(self, user_id: str) -> list:
+        """Lists a user's remote sessions as dicts."""
+        sessions = self.engine.list_sessions(user_id=user_id)
+        if isinstance(sessions, dict):
+            # Agent Engine answers {"sessions": [...]}
+            sessions = sessions.get("sessions") or []
+        return list(sessions)
+
+    def delete_session(self, user_id: str, session_id: str) -> None:
+        """Deletes a remote session."""
+        self.engine.delete_session(user_id=user_id, session_id=session_id)
+
+    def stream_query(self, user_id: str, session_id: str, message: str) -> Iterator[dict]:
+        """Sends a message and yields the pipeline events as they arrive."""
+        yield from self.engine.stream_query(
+            user_id=user_id,
+            session_id=session_id,
+            message=message,
+        )
+
+
+def final_evaluation(events: Iterable[dict]) -> Optional[dict]:
+    """Returns the score calculator's evaluation from a stream of events.
+
+    Stops reading as soon as the evaluation arrives. Raises ValueError when
+    the pipeline reported an error instead of a score.
+    """
+    return read_events(events).result()
+
+
+def get_client(resource_id: str, engine=None) -> AgentEngineClient:
+    """Returns the shared client for a resource ID, creating it on first use."""
+    with _clients_lock:
+        client = _clients.get(resource_id)
+        if client is None:
+            client = AgentEngineClient(resource_id, engine=engine)
+            _clients[resource_id] = client
+        return client
@@ -0,0 +1,147 @@
+import json
+from typing import Iterable, Optional
+
+from reviewer.utils.scoring import strip_fences
+
+FINAL_AUTHOR = "score_calculator"
+
+
+class WorkflowEventError(ValueError):
+    """Raised when a workflow event does not have the expected structure."""
+
+
+class WorkflowEvent:
+    """The fields of an Agent Engine event that the pipeline's consumers read."""
+
+    __slots__ = ("author", "invocation_id", "text", "state_delta")
+
+    def __init__(self, author: str, invocation_id: Optional[str], text: Optional[str], state_delta: dict):
+        self.author = author
+        self.invocation_id = invocation_id
+        self.text = text
+        self.state_delta = state_delta
+
+    @classmethod
+    def from_dict(cls, event) -> "WorkflowEvent":
+        """Builds an event from the dict yielded by ``stream_query``."""
+        if isinstance(event, cls):
+            return event
+        if not isinstance(event, dict):
+            raise WorkflowEventError(f"Workflow event must be a dict, got {type(event).__name__}")
+
+        actions = event.get("actions") or {}
+        if not isinstance(actions, dict):
+            raise WorkflowEventError("Workflow event actions must be a dict")
+        state_delta = actions.get("state_delta") or {}
+        if not isinstance(state_delta, dict):
+            raise WorkflowEventError("Workflow event state_delta must be a dict")
+
+        text = None
+        content = event.get("content")
+        if content:
+            parts = content.get("parts") if isinstance(content, dict) else None
+            if not isinstance(parts, list):
+                raise WorkflowEventError("Workflow event content has no parts list")
+            texts = [part["text"] for part in parts if isinstance(part, dict) and isinstance(part.get("text"), str)]
+            text = "".join(texts) if texts else None
+
+        return cls(str(event.get("author", "")), event.get("invocation_id"), text, state_delta)
+
+
+def _decode_json(value, what: str):
+    if isinstance(value, str):
+        try:
+            return json.loads(strip_fences(value))
+        except ValueError as e:
+            raise WorkflowEventError(f"{what} is not valid JSON: {e}") from e
+    return value
+
+
+class WorkflowEventParser:
+    """Consumes workflow events one at a time as ``stream_query`` yields them.
+
+    The category, grades and evaluation are read from the events'
+    ``state_delta`` as they arrive, so nothing is buffered. ``done`` turns
+    true as soon as the score calculator's evaluation has been seen; the
+    caller can stop reading the stream there. Malformed events and
+    unparsable stage outputs are collected in ``errors`` instead of being
+    silently skipped.
+    """
+
+    def __init__(self):
+        self.category: Optional[str] = None
+        self.grades: Optional[dict] = None
+        self.evaluation: Optional[dict] = None
+        self.errors: list = []
+        self.events = 0
+
+    @property
+    def done(self) -> bool:
+        return self.evaluation is not None
+
+    def feed(self, event) -> Optional[dict]:
+        """Reads one event and returns a progress update when it completes a stage, else None."""
+        self.events += 1
+        try:
+            event = WorkflowEvent.from_dict(event)
+            return self._read(event)
+        except WorkflowEventError as e:
+            self.errors.append(str(e))
+            return None
+
+    def _read(self, event: WorkflowEvent) -> Optional[dict]:
+        state_delta = event.state_delta
+        if "course_category" in state_delta:
+            self.category = str(state_delta["course_category"]).strip()
+            return {"stage": "categorized", "category": self.category}
+        if "course_grades" in state_delta and state_delta["course_grades"] is None:
+            # Cleared by a grader that gave up; the score calculator reports why
+            return None
+        if "course_grades" in state_delta:
+            # The stage still completed; the score calculator reports what it could not grade
+            try:
+                grades = _decode_json(state_delta["course_grades"], "Course grades")
+                if not isinstance(grades, dict):
+                    raise WorkflowEventError(f"Course grades must be a JSON object, got {type(grades).__name__}")
+                self.grades = grades
+            except WorkflowEventError as e:
+                self.errors.append(str(e))
+            return {"stage": "graded", "grades": self.grades}
+        if event.author != FINAL_AUTHOR:
+            return None
+
+        evaluation = state_delta.get("course_evaluation")
+        if evaluation is None and event.text:
+            # Older deployments only put the evaluation in the event text
+            evaluation = _decode_json(event.text, "Evaluation")
+        if evaluation is None:
+            return None
+        if not isinstance(evaluation, dict):
+            raise WorkflowEventError(f"Evaluation must be a JSON object, got {type(evaluation).__name__}")
+        self.evaluation = evaluation
+        return {"stage": "calculated"}
+
+    def result(self) -> Optional[dict]:
+        """Returns the evaluation, or None when the stream ended without one.
+
+        Raises ValueError when the pipeline reported an error instead of a score.
+        """
+        if self.evaluation is not None and "final_score" not in self.evaluation:
+            raise ValueError(self.evaluation.get("error", "evaluation has no final_score"))
+        return self.evaluation
+
+
+def read_events(events: Iterable[dict], parser: Optional[WorkflowEventParser] = None) -> WorkflowEventParser:
+    """Feeds events to a parser until the evaluation arrives, then closes the stream."""
+    parser = parser or WorkflowEventParser()
+    iterator = iter(events)
+    try:
+        for event in iterator:
+            parser.feed(event)
+            if parser.done:
+                break
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            close()
+    return parser
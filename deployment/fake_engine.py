@@ -0,0 +1,96 @@
+import hashlib
+import itertools
+import json
+import threading
+import time
+import uuid
+
+
+def _event(author: str, text: str, state_delta: dict, invocation_id: str) -> dict:
+    """Builds an event dict in the shape returned by a deployed Agent Engine."""
+    return {
+        'content': {'parts': [{'text': text}], 'role': 'model'},
+        'invocation_id': invocation_id,
+        'author': author,
+        'actions': {'state_delta': state_delta, 'artifact_delta': {}, 'requested_auth_configs': {}},
+        'id': uuid.uuid4().hex[:8],
+        'timestamp': time.time(),
+    }
+
+
+class FakeAgentEngine:
+    """In-process stand-in for a deployed Agent Engine.
+
+    Implements the session and stream_query methods the web UI and CLIs use,
+    and answers every message with deterministic, content-derived results
+    after ``latency`` seconds per pipeline stage (one fewer stage in
+    sessions created in fused evaluation mode). ``session_latency``
+    simulates the round-trip of creating or deleting a session. Useful for
+    local development and load testing without a Google Cloud project.
+    """
+
+    def __init__(self, latency: float = 0.0, resource_name: str = 'fake-agent-engine',
+                 session_latency: float = 0.0):
+        self.latency = latency
+        self.session_latency = session_latency
+        self.resource_name = resource_name
+        self._sessions = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def create_session(self, user_id: str, state: dict = None, **kwargs) -> dict:
+        time.sleep(self.session_latency)
+        with self._lock:
+            session_id = str(next(self._ids))
+            session = {
+                'id': session_id,
+                'user_id': user_id,
+                'app_name': self.resource_name,
+                'state': dict(state or {}),
+                'last_update_time': time.time(),
+            }
+            self._sessions[session_id] = session
+        return dict(session)
+
+    def get_session(self, user_id: str, session_id: str) -> dict:
+        with self._lock:
+            session = self._sessions.get(session_id)
+        if session is None or session['user_id'] != user_id:
+            raise KeyError(f"Session not found: {session_id}")
+        return dict(session)
+
+    def list_sessions(self, user_id: str) -> list:
+        with self._lock:
+            return [dict(s) for s in self._sessions.values() if s['user_id'] == user_id]
+
+    def delete_session(self, user_id: str, session_id: str) -> None:
+        time.sleep(self.session_latency)
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def stream_query(self, user_id: str, session_id: str, message: str):
+        from reviewer.utils.scoring import calculate_score, default_feedback
+        from reviewer.utils.weights import COURSE_CLUSTERS, EVALUATION_ELEMENTS, EVALUATION_MODE_KEY
+
+        session = self.get_session(user_id, session_id)
+        # Fused mode categorizes and grades in one stage, as the deployed pipeline does
+        fused = session['state'].get(EVALUATION_MODE_KEY) == 'fused'
+        invocation_id = f"e-{uuid.uuid4()}"
+        digest = hashlib.sha256(message.encode('utf-8')).digest()
+
+        time.sleep(self.latency)
+        category = COURSE_CLUSTERS[digest[0] % len(COURSE_CLUSTERS)]
+        author = 'course_categorize_and_grade' if fused else 'course_categorizer'
+        yield _event(author, category, {'course_category': category}, invocation_id)
+
+        if not fused:
+            time.sleep(self.latency)
+            author = 'course_grader'
+        grades = {element: 60 + digest[i + 1] % 41 for i, element in enumerate(EVALUATION_ELEMENTS)}
+        grades_text = json.dumps(grades)
+        yield _event(author, grades_text, {'course_grades': grades_text}, invocation_id)
+
+        time.sleep(self.latency)
+        evaluation = calculate_score(category, grades)
+        evaluation.update(default_feedback(evaluation))
+        yield _event('score_calculator', json.dumps(evaluation), {'course_evaluation': evaluation}, invocation_id)
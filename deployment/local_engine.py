@@ -0,0 +1,79 @@
+import asyncio
+import queue
+import threading
+
+
+class LocalAgentEngine:
+    """Runs the agent pipeline in-process behind the Agent Engine interface.
+
+    Implements the session and stream_query methods the web UI and CLIs
+    use, backed by an ADK InMemoryRunner on a background event loop, so
+    they can drive the real pipeline without a deployment. Combined with a
+    replayed model cassette (REVIEWER_CASSETTE) nothing leaves the process.
+    ``agent`` defaults to reviewer.agent.root_agent.
+    """
+
+    def __init__(self, agent=None, app_name: str = 'course-reviewer'):
+        # Imported here so choosing another engine does not load ADK
+        from google.adk.runners import InMemoryRunner
+
+        if agent is None:
+            from reviewer.agent import root_agent as agent
+        self.app_name = app_name
+        self.resource_name = app_name
+        self.runner = InMemoryRunner(agent, app_name=app_name)
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, name='local-agent-engine', daemon=True).start()
+
+    def _session_dict(self, session) -> dict:
+        return {
+            'id': session.id,
+            'user_id': session.user_id,
+            'app_name': session.app_name,
+            'state': dict(session.state),
+            'last_update_time': session.last_update_time,
+        }
+
+    def create_session(self, user_id: str, state: dict = None, **kwargs) -> dict:
+        session = self.runner.session_service.create_session(app_name=self.app_name, user_id=user_id, state=state)
+        return self._session_dict(session)
+
+    def get_session(self, user_id: str, session_id: str) -> dict:
+        session = self.runner.session_service.get_session(
+            app_name=self.app_name, user_id=user_id, session_id=session_id
+        )
+        if session is None:
+            raise KeyError(f"Session not found: {session_id}")
+        return self._session_dict(session)
+
+    def list_sessions(self, user_id: str) -> list:
+        response = self.runner.session_service.list_sessions(app_name=self.app_name, user_id=user_id)
+        return [self._session_dict(session) for session in response.sessions]
+
+    def delete_session(self, user_id: str, session_id: str) -> None:
+        self.runner.session_service.delete_session(app_name=self.app_name, user_id=user_id, session_id=session_id)
+
+    def stream_query(self, user_id: str, session_id: str, message: str):
+        from google.genai import types
+
+        events = queue.Queue()
+        done = object()
+
+        async def run():
+            try:
+                async for event in self.runner.run_async(
+                    user_id=user_id,
+                    session_id=session_id,
+                    new_message=types.Content(role='user', parts=[types.Part(text=message)]),
+                ):
+                    events.put(event.model_dump(mode='json', exclude_none=True))
+            except Exception as e:
+                events.put(e)
+            finally:
+                events.put(done)
+
+        asyncio.run_coroutine_threadsafe(run(), self.loop)
+        while (item := events.get()) is not done:
+            if isinstance(item, Exception):
+                raise item
+            yield item
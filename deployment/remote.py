@@ -1,6 +1,9 @@
+import json
 import os
 import sys
-import toml
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 # Force UTF-8 encoding for console output
 os.environ['PYTHONIOENCODING'] = 'utf-8'
@@ -11,13 +14,16 @@ if sys.platform == "win32":
     sys.stdout = codecs.getwriter('utf-8')(sys.stdout.detach())
     sys.stderr = codecs.getwriter('utf-8')(sys.stderr.detach())
 
-import vertexai
 from absl import app as absl_app, flags
 from dotenv import load_dotenv
-from vertexai import agent_engines
-from vertexai.preview import reasoning_engines
 
-from reviewer import app
+# Vertex AI, the agent pipeline and toml are imported by the commands that use
+# them, so parsing flags and light commands do not pay for loading them
+from deployment.client import AgentEngineClient, final_evaluation, init_vertexai
+from deployment.session_pool import SessionPool
+from deployment.session_sweeper import SessionSweeper
+from reviewer.utils.rate_limit import AdaptiveLimiter
+from reviewer.utils.weights import EVALUATION_MODE_KEY, EVALUATION_MODES
 
 FLAGS = flags.FLAGS
 flags.DEFINE_string("project_id", None, "GCP project ID.")
@@ -33,6 +39,21 @@ flags.DEFINE_bool("create_session", False, "Creates a new session.")
 flags.DEFINE_bool("list_sessions", False, "Lists all sessions for a user.")
 flags.DEFINE_bool("get_session", False, "Gets a specific session.")
 flags.DEFINE_bool("send", False, "Sends a message to the deployed agent.")
+flags.DEFINE_bool("batch", False, "Evaluates every course in a JSONL file.")
+flags.DEFINE_bool("sweep_sessions", False, "Deletes a user's remote sessions idle for --max_idle seconds.")
+flags.DEFINE_float("max_idle", 3600.0, "Seconds without an update after which --sweep_sessions deletes a session.")
+flags.DEFINE_integer("max_sessions", 0, "Sessions --sweep_sessions keeps at most, deleting the least recently "
+                     "updated (0 = no limit).")
+flags.DEFINE_string("input", None, "JSONL file of courses for --batch, one {\"id\", \"content\"} object per line.")
+flags.DEFINE_string("output", None, "JSONL file --batch appends results to; also used to resume.")
+flags.DEFINE_integer("concurrency", 4, "Number of courses --batch evaluates at once.")
+flags.DEFINE_float("rps", 0.0, "Maximum courses --batch starts per second (0 = no limit).")
+flags.DEFINE_enum("evaluation_mode", None, list(EVALUATION_MODES),
+                  "Evaluation mode for sessions made by --create_session and --batch; "
+                  "fused categorizes and grades in one model call (default: the deployment's).")
+flags.DEFINE_bool("local", False, "Runs --batch through the agent pipeline in this process instead of a "
+                  "deployment; with REVIEWER_CASSETTE=<file> set, model calls are replayed from it.")
+flags.DEFINE_integer("progress_every", 10, "Report --batch throughput every N courses.")
 flags.DEFINE_string(
     "message",
     "Shorten this message: Hello, how are you doing today?",
@@ -47,20 +68,33 @@ flags.mark_bool_flags_as_mutual_exclusive(
         "list_sessions",
         "get_session",
         "send",
+        "batch",
+        "sweep_sessions",
     ]
 )
 
 
 
+def _agent_engines():
+    """Imports vertexai.agent_engines on first use."""
+    from vertexai import agent_engines
+
+    return agent_engines
+
+
 def create() -> None:
     """Creates a new deployment."""
+    import toml
+
+    from reviewer import app
+
     # Dynamically read dependencies from pyproject.toml
     with open("pyproject.toml", "r") as f:
         pyproject_data = toml.load(f)
     dependencies = pyproject_data["project"]["dependencies"]
 
     # Now deploy to Agent Engine
-    remote_app = agent_engines.create(
+    remote_app = _agent_engines().create(
         agent_engine=app,
         requirements=dependencies,
         extra_packages=["./reviewer"],
@@ -71,7 +105,7 @@ def create() -> None:
 def delete(resource_id: str) -> None:
     """Deletes an existing deployment."""
     try:
-        remote_app = agent_engines.get(resource_id)
+        remote_app = _agent_engines().get(resource_id)
         remote_app.delete(force=True)
         print(f"Deleted remote app: {resource_id}")
     except Exception as e:
@@ -80,7 +114,7 @@ def delete(resource_id: str) -> None:
 
 def list_deployments() -> None:
     """Lists all deployments."""
-    deployments = agent_engines.list()
+    deployments = _agent_engines().list()
     if not deployments:
         print("No deployments found.")
         return
@@ -89,11 +123,14 @@ def list_deployments() -> None:
         print(f"- {deployment.resource_name}")
 
 
-def create_session(resource_id: str, user_id: str) -> None:
+def create_session(resource_id: str, user_id: str, evaluation_mode: str = None) -> None:
     """Creates a new session for the specified user."""
     try:
-        remote_app = agent_engines.get(resource_id)
-        remote_session = remote_app.create_session(user_id=user_id)
+        remote_app = _agent_engines().get(resource_id)
+        if evaluation_mode:
+            remote_session = remote_app.create_session(user_id=user_id, state={EVALUATION_MODE_KEY: evaluation_mode})
+        else:
+            remote_session = remote_app.create_session(user_id=user_id)
         print("Created session:")
         print(f"  Session ID: {remote_session.get('id')}")
         print(f"  User ID: {remote_session.get('user_id', 'N/A')}")
@@ -107,7 +144,7 @@ def create_session(resource_id: str, user_id: str) -> None:
 def list_sessions(resource_id: str, user_id: str) -> None:
     """Lists all sessions for the specified user."""
     try:
-        remote_app = agent_engines.get(resource_id)
+        remote_app = _agent_engines().get(resource_id)
         sessions = remote_app.list_sessions(user_id=user_id)
         print(f"Sessions for user '{user_id}':")
         for session in sessions:
@@ -119,7 +156,7 @@ def list_sessions(resource_id: str, user_id: str) -> None:
 def get_session(resource_id: str, user_id: str, session_id: str) -> None:
     """Gets a specific session."""
     try:
-        remote_app = agent_engines.get(resource_id)
+        remote_app = _agent_engines().get(resource_id)
         session = remote_app.get_session(user_id=user_id, session_id=session_id)
         print("Session details:")
         print(f"  ID: {session.get('id')}")
@@ -130,10 +167,21 @@ def get_session(resource_id: str, user_id: str, session_id: str) -> None:
         print(f"Error getting session: {e}")
 
 
+def sweep_sessions(resource_id: str, user_id: str, max_idle: float, max_sessions: int = 0) -> None:
+    """Deletes a user's stale remote sessions, several at a time."""
+    sweeper = SessionSweeper(AgentEngineClient(resource_id), user_id, max_idle=max_idle, max_sessions=max_sessions)
+    try:
+        result = sweeper.sweep()
+    finally:
+        sweeper.close()
+    print(f"Sessions for user '{user_id}': {result['listed']} listed, {result['deleted']} deleted, "
+          f"{result['failed']} failed to delete")
+
+
 def send_message(resource_id: str, user_id: str, session_id: str, message: str) -> None:
     """Sends a message to the deployed agent."""
     try:
-        remote_app = agent_engines.get(resource_id)
+        remote_app = _agent_engines().get(resource_id)
 
         print(f"Sending message to session {session_id}:")
         # Handle Unicode characters safely
@@ -159,6 +207,142 @@ def send_message(resource_id: str, user_id: str, session_id: str, message: str)
         print(f"Error sending message: {e}")
 
 
+def _completed_ids(output_path: str) -> set:
+    """Returns the IDs already evaluated successfully in an output file."""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A crash can leave a truncated last line behind
+                continue
+            if "evaluation" in record:
+                done.add(str(record["id"]))
+    with open(output_path, "rb+") as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell():
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                # Terminate the truncated line so new records start cleanly
+                f.write(b"\n")
+    return done
+
+
+def _read_courses(input_path: str):
+    """Yields (id, content, error) triples from a JSONL file without loading it all.
+
+    A line that is not a JSON object yields its line number as the ID, no
+    content and the parse error, so one bad line does not stop the batch.
+    """
+    with open(input_path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError("expected a JSON object")
+            except ValueError as e:
+                print(f"Skipping line {line_number}: invalid JSON")
+                yield str(line_number), None, f"Invalid JSON on line {line_number}: {e}"
+                continue
+            content = record.get("content") or record.get("message")
+            if not content:
+                print(f"Skipping line {line_number}: no content")
+                continue
+            yield str(record.get("id", line_number)), content, None
+
+
+def run_batch(resource_id: str, user_id: str, input_path: str, output_path: str,
+              concurrency: int = 4, progress_every: int = 10, client=None, rps: float = 0.0,
+              evaluation_mode: str = None) -> dict:
+    """Evaluates every course in a JSONL file with bounded concurrency.
+
+    Requests go through an AdaptiveLimiter: at most ``rps`` courses start
+    per second, and the number in flight halves when the engine answers
+    with quota errors (429/503) and grows back up to ``concurrency`` while
+    it succeeds. Quota errors are retried with jittered backoff, honouring
+    Retry-After. Results are appended to output_path as each course finishes, so an
+    interrupted run resumes where it stopped: courses that already have an
+    evaluation in the output file are skipped, failed ones are retried.
+    ``evaluation_mode`` sets the pipeline's mode for every course.
+    """
+    client = client or AgentEngineClient(resource_id)
+    # A fresh session per course (max_uses=1): ADK sessions keep the
+    # conversation history, which would leak earlier courses into later
+    # prompts. The pool creates and deletes them off the critical path.
+    pool = SessionPool(client, user_id, size=concurrency, max_uses=1,
+                       state={EVALUATION_MODE_KEY: evaluation_mode} if evaluation_mode else None)
+    done = _completed_ids(output_path)
+    if done:
+        print(f"Resuming: {len(done)} courses already evaluated")
+
+    write_lock = threading.Lock()
+    # Bound queued work so a large input file is streamed, not loaded
+    slots = threading.BoundedSemaphore(concurrency * 2)
+    stats = {"evaluated": 0, "failed": 0, "skipped": len(done)}
+    limiter = AdaptiveLimiter(name=resource_id, rate=rps, initial_concurrency=concurrency,
+                              max_concurrency=concurrency)
+    started = time.perf_counter()
+
+    def report():
+        elapsed = time.perf_counter() - started
+        finished = stats["evaluated"] + stats["failed"]
+        rate = finished / elapsed * 60 if elapsed else 0.0
+        limits = limiter.stats()
+        print(f"Progress: {stats['evaluated']} evaluated, {stats['failed']} failed, "
+              f"{elapsed:.1f}s elapsed, {rate:.1f} courses/min, "
+              f"concurrency {limits['limit']:g}, {limits['retries']} quota retries")
+
+    def query(content):
+        with pool.session() as session_id:
+            return final_evaluation(client.stream_query(user_id, session_id, content))
+
+    def write(record):
+        with write_lock:
+            with open(output_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            stats["evaluated" if "evaluation" in record else "failed"] += 1
+            if (stats["evaluated"] + stats["failed"]) % progress_every == 0:
+                report()
+
+    def evaluate(course_id, content):
+        course_started = time.perf_counter()
+        try:
+            evaluation = limiter.call(lambda: query(content))
+            if evaluation is None:
+                raise ValueError("no evaluation in workflow output")
+            record = {"id": course_id, "evaluation": evaluation}
+        except Exception as e:
+            record = {"id": course_id, "error": str(e)}
+        finally:
+            slots.release()
+        record["elapsed_s"] = round(time.perf_counter() - course_started, 3)
+        write(record)
+
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for course_id, content, error in _read_courses(input_path):
+                if course_id in done:
+                    continue
+                if error is not None:
+                    write({"id": course_id, "error": error, "elapsed_s": 0.0})
+                    continue
+                slots.acquire()
+                executor.submit(evaluate, course_id, content)
+        report()
+    finally:
+        # Also on an interrupted or failed batch, so no remote sessions are left behind
+        pool.close()
+    stats["rate_limit"] = limiter.stats()
+    return stats
+
+
 def main(argv=None):
     """Main function that can be called directly or through app.run()."""
     # Parse flags first
@@ -169,6 +353,25 @@ def main(argv=None):
 
     load_dotenv()
 
+    if FLAGS.batch and FLAGS.local:
+        if not FLAGS.input or not FLAGS.output:
+            print("input and output are required for batch")
+            return
+        from deployment.local_engine import LocalAgentEngine
+
+        run_batch(
+            "local",
+            FLAGS.user_id,
+            FLAGS.input,
+            FLAGS.output,
+            concurrency=FLAGS.concurrency,
+            rps=FLAGS.rps,
+            progress_every=FLAGS.progress_every,
+            client=AgentEngineClient("local", engine=LocalAgentEngine()),
+            evaluation_mode=FLAGS.evaluation_mode,
+        )
+        return
+
     # Now we can safely access the flags
     project_id = (
         FLAGS.project_id if FLAGS.project_id else os.getenv("GOOGLE_CLOUD_PROJECT")
@@ -187,11 +390,7 @@ def main(argv=None):
         print("Missing required environment variable: GOOGLE_CLOUD_STAGING_BUCKET")
         return
 
-    vertexai.init(
-        project=project_id,
-        location=location,
-        staging_bucket=bucket,
-    )
+    init_vertexai(project_id, location, bucket)
 
     if FLAGS.create:
         create()
@@ -206,7 +405,7 @@ def main(argv=None):
         if not FLAGS.resource_id:
             print("resource_id is required for create_session")
             return
-        create_session(FLAGS.resource_id, user_id)
+        create_session(FLAGS.resource_id, user_id, FLAGS.evaluation_mode)
     elif FLAGS.list_sessions:
         if not FLAGS.resource_id:
             print("resource_id is required for list_sessions")
@@ -236,9 +435,32 @@ def main(argv=None):
                 message_to_send = stdin_message
 
         send_message(FLAGS.resource_id, user_id, FLAGS.session_id, message_to_send)
+    elif FLAGS.batch:
+        if not FLAGS.resource_id:
+            print("resource_id is required for batch")
+            return
+        if not FLAGS.input or not FLAGS.output:
+            print("input and output are required for batch")
+            return
+        run_batch(
+            FLAGS.resource_id,
+            user_id,
+            FLAGS.input,
+            FLAGS.output,
+            concurrency=FLAGS.concurrency,
+            rps=FLAGS.rps,
+            progress_every=FLAGS.progress_every,
+            evaluation_mode=FLAGS.evaluation_mode,
+        )
+    elif FLAGS.sweep_sessions:
+        if not FLAGS.resource_id:
+            print("resource_id is required for sweep_sessions")
+            return
+        sweep_sessions(FLAGS.resource_id, user_id, FLAGS.max_idle, FLAGS.max_sessions)
     else:
         print(
-            "Please specify one of: --create, --delete, --list, --create_session, --list_sessions, --get_session, or --send"
+            "Please specify one of: --create, --delete, --list, --create_session, --list_sessions, --get_session, "
+            "--send, --batch, or --sweep_sessions"
         )
 
 
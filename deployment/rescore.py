@@ -0,0 +1,93 @@
+"""Re-scores stored evaluations under new rubric weights without calling the model.
+
+Reads the JSONL results written by `deploy-remote --batch` and scores each
+stored grade vector under RUBRIC_WEIGHTS and PASS_MARK from
+reviewer/utils/weights.py (or --weights / --pass_mark), then reports
+pass/fail flips and score deltas against the stored scores.
+
+Usage:
+    poetry run rescore --input=results.jsonl --report=rescore.json
+"""
+import json
+import sys
+import time
+
+from absl import app as absl_app, flags
+
+from reviewer.utils.rescoring import GradeTable, rescore, rescore_report
+from reviewer.utils.weights import EVALUATION_ELEMENTS, PASS_MARK, RUBRIC_WEIGHTS
+
+FLAGS = flags.FLAGS
+flags.DEFINE_list("input", None, "JSONL result files with one {\"id\", \"evaluation\"} object per line.")
+flags.DEFINE_string("weights", None, "JSON file of {category: {element: weight}} to use instead of RUBRIC_WEIGHTS.")
+flags.DEFINE_float("pass_mark", PASS_MARK, "Pass mark to apply.")
+flags.DEFINE_string("report", None, "Optional path to write the report as JSON.")
+flags.DEFINE_string("output", None, "Optional JSONL path for per-course {id, old_score, new_score, passed}.")
+flags.DEFINE_integer("max_listed", 20, "Flipped courses to print per direction.")
+flags.mark_flag_as_required("input")
+
+
+def _read_evaluations(paths):
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if isinstance(record.get("evaluation"), dict):
+                    yield record.get("id"), record["evaluation"]
+
+
+def _load_weights(path):
+    if not path:
+        return RUBRIC_WEIGHTS
+    with open(path, "r", encoding="utf-8") as f:
+        weights = json.load(f)
+    for category, category_weights in weights.items():
+        missing = [e for e in EVALUATION_ELEMENTS if e not in category_weights]
+        if missing:
+            raise ValueError(f"Weights for {category} are missing: {', '.join(missing)}")
+    return {**RUBRIC_WEIGHTS, **weights}
+
+
+def main(argv=None):
+    if argv is None:
+        argv = flags.FLAGS(sys.argv)
+    else:
+        argv = flags.FLAGS(argv)
+
+    weights = _load_weights(FLAGS.weights)
+
+    started = time.perf_counter()
+    table = GradeTable.from_evaluations(_read_evaluations(FLAGS.input))
+    loaded = time.perf_counter()
+    report = rescore_report(table, weights, FLAGS.pass_mark)
+    rescored = time.perf_counter()
+    report["load_s"] = round(loaded - started, 3)
+    report["rescore_s"] = round(rescored - loaded, 4)
+
+    print(f"Re-scored {report['courses']} courses in {report['rescore_s']}s (loaded in {report['load_s']}s), 0 model calls")
+    print(f"Changed scores: {report['changed_scores']}  mean delta: {report['mean_delta']:+.2f}  "
+          f"range: {report['max_decrease']:+.2f} to {report['max_increase']:+.2f}")
+    print(f"Pass -> fail: {report['newly_failed']}  Fail -> pass: {report['newly_passed']}")
+    for category, summary in report["by_category"].items():
+        print(f"  {category}: {summary['courses']} courses, mean delta {summary['mean_delta']:+.2f}, "
+              f"passed {summary['passed_before']} -> {summary['passed_after']}")
+    for label, key in (("Newly failed", "newly_failed_courses"), ("Newly passed", "newly_passed_courses")):
+        for course in report[key][:FLAGS.max_listed]:
+            print(f"  {label}: {course['id']} {course['old_score']} -> {course['new_score']}")
+
+    if FLAGS.report:
+        with open(FLAGS.report, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if FLAGS.output:
+        scores, passed = rescore(table, weights, FLAGS.pass_mark)
+        with open(FLAGS.output, "w", encoding="utf-8") as f:
+            for course_id, old, new, ok in zip(table.ids, table.scores, scores, passed):
+                f.write(json.dumps({"id": course_id, "old_score": float(old), "new_score": float(new),
+                                    "passed": bool(ok)}) + "\n")
+
+
+if __name__ == "__main__":
+    absl_app.run(main)
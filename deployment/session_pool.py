@@ -0,0 +1,197 @@
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PooledSession:
+    """A remote session handed out by a SessionPool."""
+
+    __slots__ = ("id", "created_at", "uses")
+
+    def __init__(self, session_id: str, created_at: float):
+        self.id = session_id
+        self.created_at = created_at
+        self.uses = 0
+
+
+class SessionPool:
+    """Keeps ``size`` remote sessions pre-created so requests skip the create round-trip.
+
+    Sessions are handed out by ``acquire`` and returned with ``release``.
+    A session is retired (deleted in the background) after ``max_uses``
+    uses, once it is older than ``max_age`` seconds, or when the caller
+    reports it unhealthy. A background thread keeps the pool topped up.
+    When the pool is empty, ``acquire`` creates a session inline, so a
+    burst of requests degrades to the unpooled latency instead of waiting.
+
+    ADK sessions keep their conversation history, and every stage sees
+    the earlier messages. Keep ``max_uses=1`` (the default) unless
+    consecutive evaluations on one session are acceptable. Sessions are
+    created with ``state`` as their initial state, e.g. an evaluation mode.
+    """
+
+    def __init__(self, client, user_id: str, size: int = 4, max_uses: int = 1,
+                 max_age: float = 1800.0, workers: int = 2, state: Optional[dict] = None):
+        self.client = client
+        self.user_id = user_id
+        self.state = state
+        self.size = size
+        self.max_uses = max_uses
+        self.max_age = max_age
+        self._idle = deque()
+        self._leased = set()
+        self._retired = []
+        self._creating = 0
+        self._failures = 0
+        self._retry_at = 0.0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._counters = {"hits": 0, "misses": 0, "created": 0, "retired": 0, "create_errors": 0}
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="session-pool")
+        self._thread = threading.Thread(target=self._maintain, name="session-pool", daemon=True)
+        self._thread.start()
+
+    def acquire(self) -> PooledSession:
+        """Returns a ready session, creating one inline if none is available."""
+        now = time.time()
+        with self._cond:
+            while self._idle:
+                session = self._idle.popleft()
+                if now - session.created_at < self.max_age:
+                    self._leased.add(session.id)
+                    self._counters["hits"] += 1
+                    self._cond.notify_all()  # wake the refill thread
+                    return session
+                self._retire(session)
+            self._counters["misses"] += 1
+            self._cond.notify_all()
+        session = self._new_session()
+        with self._cond:
+            self._leased.add(session.id)
+        return session
+
+    def release(self, session: PooledSession, healthy: bool = True) -> None:
+        """Returns a session to the pool, or retires it when it is used up."""
+        session.uses += 1
+        with self._cond:
+            self._leased.discard(session.id)
+            if (self._closed or not healthy or session.uses >= self.max_uses
+                    or time.time() - session.created_at >= self.max_age or len(self._idle) >= self.size):
+                self._retire(session)
+            else:
+                self._idle.append(session)
+            self._cond.notify_all()
+
+    @contextmanager
+    def session(self) -> Iterator[str]:
+        """Yields a session ID; the session is retired if the block raises."""
+        session = self.acquire()
+        healthy = False
+        try:
+            yield session.id
+            healthy = True
+        finally:
+            self.release(session, healthy=healthy)
+
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until the pool is full, e.g. before accepting traffic."""
+        with self._cond:
+            return self._cond.wait_for(lambda: len(self._idle) >= self.size or self._closed, timeout)
+
+    def session_ids(self) -> set:
+        """Returns the IDs of the sessions the pool holds or has handed out."""
+        with self._cond:
+            return {session.id for session in self._idle} | self._leased
+
+    def stats(self) -> dict:
+        with self._cond:
+            stats = dict(self._counters)
+            stats.update(size=self.size, idle=len(self._idle), in_use=len(self._leased), creating=self._creating)
+        acquired = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / acquired, 4) if acquired else 0.0
+        return stats
+
+    def close(self) -> None:
+        """Stops refilling and deletes every idle session."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout=5)
+        self._executor.shutdown(wait=True)
+        with self._cond:
+            while self._idle:
+                self._retire(self._idle.popleft())
+            retired, self._retired = self._retired, []
+        for session in retired:
+            self._delete(session)
+
+    def _new_session(self) -> PooledSession:
+        if self.state:
+            session = self.client.create_session(user_id=self.user_id, state=self.state)
+        else:
+            session = self.client.create_session(user_id=self.user_id)
+        with self._cond:
+            self._counters["created"] += 1
+        return PooledSession(session["id"], time.time())
+
+    def _retire(self, session: PooledSession) -> None:
+        # Caller holds self._cond
+        self._retired.append(session)
+        self._counters["retired"] += 1
+
+    def _deficit(self) -> int:
+        if self._closed or time.time() < self._retry_at:
+            return 0
+        return self.size - len(self._idle) - self._creating
+
+    def _maintain(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._closed or self._retired or self._deficit() > 0, timeout=1.0)
+                if self._closed:
+                    return
+                # Age out idle sessions so refills replace them before they are needed
+                now = time.time()
+                for session in [s for s in self._idle if now - s.created_at >= self.max_age]:
+                    self._idle.remove(session)
+                    self._retire(session)
+                missing = max(self._deficit(), 0)
+                self._creating += missing
+                retired, self._retired = self._retired, []
+            for _ in range(missing):
+                self._executor.submit(self._refill)
+            for session in retired:
+                self._executor.submit(self._delete, session)
+
+    def _refill(self):
+        try:
+            session = self._new_session()
+        except Exception as e:
+            with self._cond:
+                self._creating -= 1
+                self._counters["create_errors"] += 1
+                self._failures += 1
+                # Back off so an unavailable engine is not hammered
+                self._retry_at = time.time() + min(30.0, 0.5 * 2 ** self._failures)
+            logger.warning(f"Could not pre-create session: {e}")
+            return
+        with self._cond:
+            self._creating -= 1
+            self._failures = 0
+            if self._closed:
+                self._retire(session)
+            else:
+                self._idle.append(session)
+            self._cond.notify_all()
+
+    def _delete(self, session: PooledSession):
+        try:
+            self.client.delete_session(user_id=self.user_id, session_id=session.id)
+        except Exception as e:
+            logger.warning(f"Could not delete session {session.id}: {e}")
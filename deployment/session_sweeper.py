@@ -0,0 +1,123 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def session_updated_at(session: dict) -> Optional[float]:
+    """Returns a remote session's last update as a Unix timestamp, or None when it has none."""
+    value = session.get("last_update_time", session.get("lastUpdateTime"))
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            pass
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            return None
+    return None
+
+
+class SessionSweeper:
+    """Deletes remote sessions that are no longer needed, several at a time.
+
+    ``retire`` deletes one session in the background, e.g. right after the
+    evaluation that used it. ``sweep`` lists the user's remote sessions and
+    deletes the ones nobody cleaned up: those not updated for ``max_idle``
+    seconds and, when more than ``max_sessions`` (0 = no limit) are left,
+    the least recently updated beyond that. Sessions updated in the last
+    ``grace`` seconds may be mid-evaluation and are never swept, nor are
+    the IDs ``keep()`` returns (a SessionPool's, say). Deletes run
+    ``workers`` at a time.
+    """
+
+    def __init__(self, client, user_id: str, max_idle: float = 3600.0, max_sessions: int = 0,
+                 grace: float = 300.0, keep: Optional[Callable[[], Iterable[str]]] = None, workers: int = 4):
+        self.client = client
+        self.user_id = user_id
+        self.max_idle = max_idle
+        self.max_sessions = max_sessions
+        self.grace = grace
+        self.keep = keep
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._counters = {"sweeps": 0, "deleted": 0, "delete_errors": 0, "sweep_errors": 0}
+        self._remote_sessions = None
+        self._last_sweep_at = None
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="session-sweeper")
+
+    def retire(self, session_id: str) -> None:
+        """Deletes a session in the background."""
+        with self._lock:
+            self._pending += 1
+        self._executor.submit(self._delete, session_id)
+
+    def stale_sessions(self, sessions: list, now: Optional[float] = None) -> list:
+        """Returns the IDs ``sweep`` would delete from a list of remote sessions."""
+        now = time.time() if now is None else now
+        keep = set(self.keep()) if self.keep is not None else set()
+        candidates = []
+        for session in sessions:
+            updated_at = session_updated_at(session)
+            if session.get("id") in keep or updated_at is None or now - updated_at < self.grace:
+                continue
+            candidates.append((updated_at, session["id"]))
+        candidates.sort()
+        stale = [session_id for updated_at, session_id in candidates if now - updated_at >= self.max_idle]
+        if self.max_sessions and len(sessions) - len(stale) > self.max_sessions:
+            # Oldest first, until the rest fits in max_sessions
+            excess = len(sessions) - len(stale) - self.max_sessions
+            stale.extend([session_id for _, session_id in candidates[len(stale):]][:excess])
+        return stale
+
+    def sweep(self) -> dict:
+        """Deletes stale remote sessions and returns how many were listed, deleted and failed."""
+        try:
+            sessions = self.client.list_sessions(user_id=self.user_id)
+        except Exception as e:
+            with self._lock:
+                self._counters["sweep_errors"] += 1
+            logger.warning(f"Could not list remote sessions: {e}")
+            return {"listed": 0, "deleted": 0, "failed": 0}
+
+        stale = self.stale_sessions(sessions)
+        with self._lock:
+            self._pending += len(stale)
+        deleted = sum(self._executor.map(self._delete, stale))
+        with self._lock:
+            self._counters["sweeps"] += 1
+            self._remote_sessions = len(sessions) - deleted
+            self._last_sweep_at = time.time()
+        if stale:
+            logger.info(f"Swept {deleted} of {len(sessions)} remote sessions ({len(stale) - deleted} failed)")
+        return {"listed": len(sessions), "deleted": deleted, "failed": len(stale) - deleted}
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._counters)
+            stats.update(pending_deletes=self._pending, remote_sessions=self._remote_sessions,
+                         last_sweep_at=self._last_sweep_at)
+        return stats
+
+    def close(self, wait: bool = True) -> None:
+        """Finishes (or with ``wait=False``, abandons) the deletes still queued."""
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    def _delete(self, session_id: str) -> bool:
+        try:
+            self.client.delete_session(user_id=self.user_id, session_id=session_id)
+            deleted = True
+        except Exception as e:
+            logger.warning(f"Could not delete session {session_id}: {e}")
+            deleted = False
+        with self._lock:
+            self._pending -= 1
+            self._counters["deleted" if deleted else "delete_errors"] += 1
+        return deleted
@@ -1,8 +1,34 @@
-from vertexai.preview import reasoning_engines
-from .agent import root_agent
+import importlib
+import threading
 
+_app = None
+_app_lock = threading.Lock()
 
-# Define the app for the ADK
-app = reasoning_engines.AdkApp(agent=root_agent, enable_tracing=True)
 
-__all__ = ["app"]
\ No newline at end of file
+def _build_app():
+    from vertexai.preview import reasoning_engines
+    from .agent import root_agent
+
+    # Define the app for the ADK
+    return reasoning_engines.AdkApp(agent=root_agent, enable_tracing=True)
+
+
+def __getattr__(name):
+    # The app, the agent pipeline and Vertex AI are only imported on first use,
+    # so importing reviewer.utils (e.g. from the web server) stays cheap
+    global _app
+    if name == "app":
+        if _app is None:
+            with _app_lock:
+                if _app is None:
+                    _app = _build_app()
+        return _app
+    if name == "root_agent":
+        return importlib.import_module(".agent", __name__).root_agent
+    if name == "agent":
+        # ADK's CLI and web server read <package>.agent.root_agent
+        return importlib.import_module(".agent", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ["app"]
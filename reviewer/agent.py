@@ -1,18 +1,95 @@
+import os
+
 from google.adk.agents import SequentialAgent, LlmAgent
 from .course_categorizer.agent import course_categorizer_agent
+from .course_categorizer.local import build_fast_path_categorizer
 from .course_grader.agent import course_grader_agent
+from .course_grader.fused import build_categorize_and_grade
+from .course_grader.map_reduce import build_map_reduce_grader
+from .course_grader.parallel import build_parallel_grader
 from .score_calculator.agent import score_calculator_agent
+from .utils.cassette_llm import use_cassette
+from .utils.metrics import instrument
+from .utils.rate_limited_llm import rate_limit
+
+# Local fast-path categorization: the LLM categorizer only runs when the local
+# classifier's confidence is below REVIEWER_LOCAL_CATEGORIZER_THRESHOLD, or the
+# course matches fewer than REVIEWER_LOCAL_CATEGORIZER_MIN_TERMS of its terms
+if os.getenv('REVIEWER_LOCAL_CATEGORIZER', 'false').lower() in ('1', 'true', 'yes'):
+    categorizer_agent = build_fast_path_categorizer(
+        threshold=float(os.getenv('REVIEWER_LOCAL_CATEGORIZER_THRESHOLD', '0.5')),
+        model_path=os.getenv('REVIEWER_LOCAL_CATEGORIZER_MODEL') or None,
+        min_terms=int(os.getenv('REVIEWER_LOCAL_CATEGORIZER_MIN_TERMS', '3')),
+    )
+else:
+    categorizer_agent = course_categorizer_agent
+
+# Grading mode: "sequential" (one call scores all elements) or "parallel"
+# (REVIEWER_GRADING_WIDTH concurrent calls, each scoring a group of elements)
+if os.getenv('REVIEWER_GRADING_MODE', 'sequential').lower() == 'parallel':
+    grader_agent = build_parallel_grader(
+        width=int(os.getenv('REVIEWER_GRADING_WIDTH', '5')),
+        branch_timeout=float(os.getenv('REVIEWER_GRADING_BRANCH_TIMEOUT', '120')),
+    )
+else:
+    grader_agent = course_grader_agent
+
+# Courses longer than REVIEWER_CHUNK_TOKENS are graded section by section
+# (map-reduce over chunks); 0 always grades the whole document in one pass.
+# With REVIEWER_INCREMENTAL_GRADING, evidence is cached per chunk so a revised
+# course only has its changed sections re-read
+chunk_tokens = int(os.getenv('REVIEWER_CHUNK_TOKENS', '32000'))
+if chunk_tokens > 0:
+    grader_agent = build_map_reduce_grader(
+        chunk_tokens=chunk_tokens,
+        max_concurrency=int(os.getenv('REVIEWER_CHUNK_CONCURRENCY', '8')),
+        chunk_timeout=float(os.getenv('REVIEWER_CHUNK_TIMEOUT', '120')),
+        min_success_ratio=float(os.getenv('REVIEWER_CHUNK_MIN_SUCCESS', '0.5')),
+        direct_grader=grader_agent,
+        incremental=os.getenv('REVIEWER_INCREMENTAL_GRADING', 'true').lower() not in ('0', 'false', 'no'),
+    )
+
+# Evaluation mode: "staged" (the categorizer, then the grader) or "fused" (one
+# model call returns the category and the grades, so the course is sent once).
+# Sessions created with an "evaluation_mode" state value choose per request;
+# REVIEWER_EVALUATION_MODE is the default for sessions that do not
+categorize_and_grade_agent = build_categorize_and_grade(
+    categorizer_agent,
+    grader_agent,
+    default_mode=os.getenv('REVIEWER_EVALUATION_MODE', 'staged').lower(),
+)
 
 # Create the evaluation pipeline
 course_evaluation_pipeline = SequentialAgent(
     name='CourseEvaluationPipeline',
     description='A comprehensive course evaluation pipeline that categorizes, grades, and calculates scores for educational content.',
     sub_agents=[
-        course_categorizer_agent,
-        course_grader_agent,
+        categorize_and_grade_agent,
         score_calculator_agent
     ]
 )
 
-root_agent = course_evaluation_pipeline
+# Model calls recorded to or replayed from a cassette file: "record" saves every
+# real response under a hash of its request, "replay" answers from the file
+# after REVIEWER_CASSETTE_LATENCY seconds (the recorded duration when unset),
+# so load tests and profiling run without network or quota
+cassette_path = os.getenv('REVIEWER_CASSETTE')
+if cassette_path:
+    cassette_latency = os.getenv('REVIEWER_CASSETTE_LATENCY')
+    use_cassette(
+        course_evaluation_pipeline,
+        cassette_path,
+        record=os.getenv('REVIEWER_CASSETTE_MODE', 'replay').lower() == 'record',
+        latency=float(cassette_latency) if cassette_latency else None,
+    )
+
+# Client-side rate limiting and adaptive concurrency per model, with retry on
+# quota errors (see reviewer/utils/rate_limit.py for the REVIEWER_MODEL_* settings)
+if os.getenv('REVIEWER_RATE_LIMIT', 'true').lower() not in ('0', 'false', 'no'):
+    rate_limit(course_evaluation_pipeline)
 
+# Per-call latency and token metrics on every model response event
+if os.getenv('REVIEWER_METRICS', 'true').lower() not in ('0', 'false', 'no'):
+    instrument(course_evaluation_pipeline)
+
+root_agent = course_evaluation_pipeline
@@ -1,15 +1,9 @@
 from google.adk.agents import LlmAgent
-from ..utils.weights import COURSE_CLUSTERS
+from ..utils.weights import COURSE_CLUSTERS, MODEL_NAME
 
 # --- 1. Define Sub-Agents for Each Pipeline Stage ---
 
-# Course Categorization Agent
-# Takes the course content and categorizes it into one of the predefined clusters
-
-course_categorizer_agent = LlmAgent(
-    model='gemini-2.0-flash',
-    name='course_categorizer',
-    description="Categorizes course content into appropriate learning cluster.",    instruction=f"""You are an expert course content analyzer specializing in blockchain and Web3 education.
+CATEGORIZER_INSTRUCTION = f"""You are an expert course content analyzer specializing in blockchain and Web3 education.
 
 Analyze the course content provided by the user and categorize it into ONE of the following clusters:
 {', '.join(COURSE_CLUSTERS)}
@@ -26,6 +20,15 @@ Analyze the course content provided by the user and categorize it into ONE of th
 **Output:**
 Respond with ONLY the exact name of the most appropriate cluster from the list above.
 Do not include any explanation, reasoning, or additional text.
-""",
-output_key="course_category"
+"""
+
+# Course Categorization Agent
+# Takes the course content and categorizes it into one of the predefined clusters
+
+course_categorizer_agent = LlmAgent(
+    model=MODEL_NAME,
+    name='course_categorizer',
+    description="Categorizes course content into appropriate learning cluster.",
+    instruction=CATEGORIZER_INSTRUCTION,
+    output_key="course_category"
 )
@@ -0,0 +1,211 @@
+import json
+import math
+import re
+from collections import Counter
+from typing import AsyncGenerator, Optional
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+from ..utils.weights import COURSE_CLUSTERS, MODEL_NAME
+from .agent import CATEGORIZER_INSTRUCTION
+
+# Hand-picked terms per cluster, used until a model is trained on past evaluations
+SEED_KEYWORDS = {
+    "Blockchain Technology and Development": [
+        "solidity", "smart contract", "smart contracts", "consensus", "cryptography", "cryptographic",
+        "hashing", "evm", "merkle", "proof of work", "proof of stake", "rust", "hardhat", "foundry",
+        "bytecode", "gas optimization", "protocol", "ethereum", "blockchain development", "node",
+    ],
+    "Web3 Development and Design": [
+        "dapp", "dapps", "frontend", "front end", "ui", "ux", "user experience", "design", "react",
+        "ethers", "web3 js", "wallet integration", "metamask", "ipfs", "figma", "interface",
+        "full stack", "typescript", "javascript", "nft marketplace",
+    ],
+    "Blockchain Applications and Business": [
+        "business", "enterprise", "supply chain", "use case", "use cases", "strategy", "regulation",
+        "compliance", "finance", "banking", "adoption", "case study", "case studies", "management",
+        "tokenomics", "market", "investment", "legal", "entrepreneurship", "business model",
+    ],
+    "Web3 Ecosystem and Operations": [
+        "dao", "daos", "governance", "community", "operations", "ecosystem", "validator",
+        "validators", "staking", "treasury", "moderation", "community management", "voting",
+        "proposal", "grants", "node operator", "infrastructure", "onboarding", "partnerships", "devrel",
+    ],
+    "Emerging Technologies and Intersections": [
+        "artificial intelligence", "ai", "machine learning", "iot", "internet of things", "metaverse",
+        "quantum", "virtual reality", "augmented reality", "vr", "ar", "digital twin", "robotics",
+        "zero knowledge", "interoperability", "edge computing", "biotech", "sustainability",
+        "climate", "intersection",
+    ],
+}
+
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were will with "
+    "you your we our they their students learners course module modules lesson lessons week".split()
+)
+
+
+def _words(text: str) -> list:
+    return [w for w in re.findall(r"[a-z0-9]+", text.lower()) if w not in _STOPWORDS]
+
+
+def tokenize(text: str) -> list:
+    """Lowercased unigrams and bigrams, with stopwords removed."""
+    words = _words(text)
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def _normalize(vector: dict) -> dict:
+    norm = math.sqrt(sum(v * v for v in vector.values()))
+    return {k: v / norm for k, v in vector.items()} if norm else {}
+
+
+class LocalCategorizer:
+    """Nearest-centroid TF-IDF classifier over COURSE_CLUSTERS.
+
+    ``centroids`` maps each cluster to an L2-normalized term vector and
+    ``idf`` holds inverse document frequencies (empty means 1.0 for every
+    term). The default instance is built from SEED_KEYWORDS; ``fit`` trains
+    one from labeled past evaluations. A prediction backed by fewer than
+    ``min_terms`` distinct terms of the winning cluster has no confidence,
+    so a stray keyword in off-topic text does not decide the category.
+    """
+
+    def __init__(self, centroids: dict, idf: Optional[dict] = None, max_chars: int = 20000, min_terms: int = 3):
+        self.centroids = centroids
+        self.idf = idf or {}
+        self.max_chars = max_chars
+        self.min_terms = min_terms
+
+    @classmethod
+    def from_keywords(cls, keywords: dict = SEED_KEYWORDS, **kwargs) -> "LocalCategorizer":
+        # Terms go through the same stopword filter as content, e.g. "proof of work" -> "proof work"
+        return cls({
+            category: _normalize({' '.join(_words(term)): 1.0 for term in terms})
+            for category, terms in keywords.items()
+        }, **kwargs)
+
+    @classmethod
+    def fit(cls, examples, max_terms: int = 2000) -> "LocalCategorizer":
+        """Trains from (content, category) pairs."""
+        documents = [(Counter(tokenize(content)), category) for content, category in examples]
+        df = Counter(term for counts, _ in documents for term in counts)
+        idf = {term: math.log((len(documents) + 1) / (count + 1)) + 1 for term, count in df.items()}
+
+        sums = {category: Counter() for category in COURSE_CLUSTERS}
+        for counts, category in documents:
+            vector = _normalize({t: (1 + math.log(c)) * idf[t] for t, c in counts.items()})
+            sums[category].update(vector)
+
+        centroids = {
+            category: _normalize(dict(total.most_common(max_terms)))
+            for category, total in sums.items()
+        }
+        return cls(centroids, idf)
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "LocalCategorizer":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["centroids"], data.get("idf"), **kwargs)
+
+    def save(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"centroids": self.centroids, "idf": self.idf}, f)
+
+    def _vector(self, content: str) -> dict:
+        counts = Counter(tokenize(content[:self.max_chars]))
+        return _normalize({t: (1 + math.log(c)) * self.idf.get(t, 1.0) for t, c in counts.items()})
+
+    def _scores(self, vector: dict) -> dict:
+        return {
+            category: sum(weight * centroid.get(term, 0.0) for term, weight in vector.items())
+            for category, centroid in self.centroids.items()
+        }
+
+    def scores(self, content: str) -> dict:
+        """Cosine similarity between the content and each cluster centroid."""
+        return self._scores(self._vector(content))
+
+    def predict(self, content: str) -> tuple:
+        """Returns (category, confidence), where confidence is the relative
+        margin between the best and second-best cluster (0 to 1), or 0 when
+        the content shares fewer than ``min_terms`` terms with the best one."""
+        vector = self._vector(content)
+        ranked = sorted(self._scores(vector).items(), key=lambda item: item[1], reverse=True)
+        (best, top), (_, runner_up) = ranked[0], ranked[1]
+        matched = sum(1 for term in vector if self.centroids[best].get(term, 0.0) > 0)
+        if top <= 0 or matched < self.min_terms:
+            return best, 0.0
+        return best, (top - runner_up) / top
+
+
+class FastPathCategorizerAgent(BaseAgent):
+    """Categorizes with the local classifier and falls back to the LLM.
+
+    The model is only called when the local prediction's confidence is
+    below ``threshold``. Either way the category is stored under
+    ``course_category``, and ``course_category_source`` records whether it
+    came from the local classifier or the LLM.
+    """
+
+    classifier: LocalCategorizer
+    threshold: float = 0.5
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        content = ''.join(
+            part.text or '' for part in (ctx.user_content.parts if ctx.user_content else [])
+        )
+        category, confidence = self.classifier.predict(content)
+
+        if confidence >= self.threshold:
+            yield Event(
+                invocation_id=ctx.invocation_id,
+                author=self.name,
+                branch=ctx.branch,
+                content=types.Content(role='model', parts=[types.Part(text=category)]),
+                actions=EventActions(state_delta={
+                    "course_category": category,
+                    "course_category_source": "local",
+                    "course_category_confidence": round(confidence, 4),
+                }),
+            )
+            return
+
+        async for event in self.sub_agents[0].run_async(ctx):
+            yield event
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(state_delta={
+                "course_category_source": "llm",
+                "course_category_confidence": round(confidence, 4),
+            }),
+        )
+
+
+def build_fast_path_categorizer(threshold: float = 0.5, model_path: Optional[str] = None,
+                                model=MODEL_NAME, min_terms: int = 3) -> FastPathCategorizerAgent:
+    """Builds a categorizer that only calls the model for low-confidence courses."""
+    if model_path:
+        classifier = LocalCategorizer.load(model_path, min_terms=min_terms)
+    else:
+        classifier = LocalCategorizer.from_keywords(min_terms=min_terms)
+    fallback = LlmAgent(
+        model=model,
+        name='course_categorizer_llm',
+        description="Categorizes course content the local classifier is unsure about.",
+        instruction=CATEGORIZER_INSTRUCTION,
+        output_key="course_category"
+    )
+    return FastPathCategorizerAgent(
+        name='course_categorizer',
+        description="Categorizes course content into appropriate learning cluster.",
+        sub_agents=[fallback],
+        classifier=classifier,
+        threshold=threshold,
+    )
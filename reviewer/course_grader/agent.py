@@ -1,57 +1,78 @@
-from google.adk.agents import LlmAgent
-
-# Course Grading Agent
-# Takes the course content and category, then evaluates against rubric elements
-course_grader_agent = LlmAgent(
-    model='gemini-2.0-flash',
-    name='course_grader',
-    description="Evaluates course content against ABYA University rubric elements.",    instruction="""You are an expert course evaluator using the ABYA University rubric system.
-
-**Course Category:** {course_category}
-
-**Your Task:**
-Evaluate the course content provided by the user based on the following 10 evaluation elements. For each element, provide a score from 0 to 100 based on how well the course content meets that criterion.
+import functools
+import json
+from typing import Optional
+
+from ..utils.prompts import CategoryInstruction
+from ..utils.schemas import CourseGrades
+from ..utils.structured_output import structured_llm_agent
+from ..utils.weights import EVALUATION_ELEMENTS, MODEL_NAME
+
+# What the grader looks for in each rubric element
+ELEMENT_CRITERIA = {
+    "Learner Agency": "How well does the course empower learners to take control of their learning journey? Look for choice in learning paths, self-directed activities, goal setting opportunities.",
+    "Critical Thinking": "Does the course promote analytical reasoning, problem-solving, and evaluation skills? Look for case studies, analysis tasks, questioning prompts.",
+    "Collaborative Learning": "How effectively does the course facilitate peer learning and group work? Look for team projects, discussion forums, peer reviews.",
+    "Reflective Practice": "Does the course encourage self-reflection and metacognitive awareness? Look for reflection journals, self-assessment, learning portfolios.",
+    "Adaptive Learning": "How well does the course accommodate different learning styles, paces, and needs? Look for multiple content formats, flexible pacing, accessibility features.",
+    "Authentic Learning": "Does the course provide real-world, meaningful learning experiences? Look for industry connections, practical applications, real case studies.",
+    "Technology Integration": "How effectively is technology integrated to enhance learning? Look for interactive tools, digital resources, innovative tech use.",
+    "Learner Support": "What level of support and guidance is provided? Look for instructor feedback, help resources, mentoring opportunities.",
+    "Assessment for Learning": "How well do assessments support learning rather than just measure it? Look for formative assessments, feedback loops, self-assessment tools.",
+    "Engagement and Motivation": "How engaging and motivating is the course content and design? Look for interactive elements, gamification, compelling narratives.",
+}
 
-**Evaluation Elements:**
+_EXAMPLE_SCORES = [85, 90, 78, 82, 88, 92, 86, 79, 84, 87]
 
-1. **Learner Agency (0-100):** How well does the course empower learners to take control of their learning journey? Look for choice in learning paths, self-directed activities, goal setting opportunities.
 
-2. **Critical Thinking (0-100):** Does the course promote analytical reasoning, problem-solving, and evaluation skills? Look for case studies, analysis tasks, questioning prompts.
+def build_grader_instruction(elements=EVALUATION_ELEMENTS, source: str = "the course content provided by the user",
+                             category: Optional[str] = None, example: bool = True) -> str:
+    """Renders the grading prompt for a subset of the evaluation elements.
 
-3. **Collaborative Learning (0-100):** How effectively does the course facilitate peer learning and group work? Look for team projects, discussion forums, peer reviews.
+    Without ``category`` the prompt reads ``{course_category}`` from session
+    state. The example output can be left out for agents whose output schema
+    already fixes the format.
+    """
+    criteria = "\n\n".join(
+        f"{i}. **{element} (0-100):** {ELEMENT_CRITERIA[element]}"
+        for i, element in enumerate(elements, start=1)
+    )
+    example_format = "Example format:\n" + json.dumps(
+        {element: _EXAMPLE_SCORES[EVALUATION_ELEMENTS.index(element)] for element in elements},
+        indent=4,
+    ) + "\n\n" if example else ""
+    return f"""You are an expert course evaluator using the ABYA University rubric system.
 
-4. **Reflective Practice (0-100):** Does the course encourage self-reflection and metacognitive awareness? Look for reflection journals, self-assessment, learning portfolios.
+**Course Category:** {category or '{course_category}'}
 
-5. **Adaptive Learning (0-100):** How well does the course accommodate different learning styles, paces, and needs? Look for multiple content formats, flexible pacing, accessibility features.
+**Your Task:**
+Evaluate {source} based on the following {len(elements)} evaluation elements. For each element, provide a score from 0 to 100 based on how well the course content meets that criterion.
 
-6. **Authentic Learning (0-100):** Does the course provide real-world, meaningful learning experiences? Look for industry connections, practical applications, real case studies.
+**Evaluation Elements:**
 
-7. **Technology Integration (0-100):** How effectively is technology integrated to enhance learning? Look for interactive tools, digital resources, innovative tech use.
+{criteria}
 
-8. **Learner Support (0-100):** What level of support and guidance is provided? Look for instructor feedback, help resources, mentoring opportunities.
+**Output Format:**
+Provide your response as a valid JSON object where keys are the exact element names and values are integer scores (0-100).
 
-9. **Assessment for Learning (0-100):** How well do assessments support learning rather than just measure it? Look for formative assessments, feedback loops, self-assessment tools.
+{example_format}Output ONLY the JSON object with no additional text, explanations, or markdown formatting.
+"""
 
-10. **Engagement and Motivation (0-100):** How engaging and motivating is the course content and design? Look for interactive elements, gamification, compelling narratives.
 
-**Output Format:**
-Provide your response as a valid JSON object where keys are the exact element names and values are integer scores (0-100).
+def grader_instruction(elements=EVALUATION_ELEMENTS, source: str = "the course content provided by the user") -> CategoryInstruction:
+    """Grading prompt rendered once per course category, without the example
+    output the agent's schema makes redundant."""
+    return CategoryInstruction(functools.partial(build_grader_instruction, elements, source, example=False))
 
-Example format:
-{
-    "Learner Agency": 85,
-    "Critical Thinking": 90,
-    "Collaborative Learning": 78,
-    "Reflective Practice": 82,
-    "Adaptive Learning": 88,
-    "Authentic Learning": 92,
-    "Technology Integration": 86,
-    "Learner Support": 79,
-    "Assessment for Learning": 84,
-    "Engagement and Motivation": 87
-}
 
-Output ONLY the JSON object with no additional text, explanations, or markdown formatting.
-""",
-output_key="course_grades"
+# Course Grading Agent
+# Takes the course content and category, then evaluates against rubric elements.
+# The model is constrained to the CourseGrades schema; invalid output re-runs
+# this stage only. The prompt is pre-rendered for each category.
+course_grader_agent = structured_llm_agent(
+    model=MODEL_NAME,
+    name='course_grader',
+    description="Evaluates course content against ABYA University rubric elements.",
+    instruction=grader_instruction(),
+    output_schema=CourseGrades,
+    output_key="course_grades"
 )
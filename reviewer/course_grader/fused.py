@@ -0,0 +1,149 @@
+import json
+import logging
+from typing import AsyncGenerator
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+from ..utils.schemas import CourseCategoryAndGrades
+from ..utils.scoring import strip_fences
+from ..utils.structured_output import structured_llm_agent
+from ..utils.weights import COURSE_CLUSTERS, EVALUATION_ELEMENTS, EVALUATION_MODE_KEY, EVALUATION_MODES, MODEL_NAME
+from .agent import ELEMENT_CRITERIA
+
+logger = logging.getLogger(__name__)
+
+
+def build_fused_instruction(elements=EVALUATION_ELEMENTS) -> str:
+    """Renders the prompt that categorizes and grades a course in one call."""
+    criteria = "\n\n".join(
+        f"{i}. **{element} (0-100):** {ELEMENT_CRITERIA[element]}"
+        for i, element in enumerate(elements, start=1)
+    )
+    return f"""You are an expert course evaluator using the ABYA University rubric system, specializing in blockchain and Web3 education.
+
+**Your Task:**
+Read the course content provided by the user, then do both of the following:
+
+1. Choose the ONE cluster that best matches the course's primary focus, technical depth, target audience and learning outcomes:
+{', '.join(COURSE_CLUSTERS)}
+
+2. Score the course from 0 to 100 on each of the following {len(elements)} evaluation elements, based on how well the course content meets that criterion.
+
+**Evaluation Elements:**
+
+{criteria}
+
+**Output Format:**
+Provide a valid JSON object with two keys: "category", the exact name of the chosen cluster, and "grades", an object whose keys are the exact element names and values are integer scores (0-100).
+
+Output ONLY the JSON object with no additional text, explanations, or markdown formatting.
+"""
+
+
+class CategorizeAndGradeAgent(BaseAgent):
+    """Categorizes and grades a course in two model calls or in one.
+
+    In ``staged`` mode ``categorizer`` and then ``grader`` run as separate
+    stages, so the course content is sent to the model twice. In ``fused``
+    mode ``fused_grader`` returns the category and all grades from a single
+    call, which are written to ``course_category`` and ``course_grades`` in
+    the same format the staged agents use, so scoring is unchanged. Fused
+    mode always grades the whole course in that one call, even a course
+    long enough for the grader to go section by section. If the fused
+    output is unusable, the staged agents run instead.
+
+    The mode is read per request from ``evaluation_mode`` in session
+    state (set when the session is created), falling back to
+    ``default_mode``. ``course_evaluation_mode`` records the mode that
+    produced the grades.
+    """
+
+    categorizer: BaseAgent
+    grader: BaseAgent
+    fused_grader: BaseAgent
+    default_mode: str = "staged"
+
+    def __init__(self, **kwargs):
+        if kwargs.get('default_mode', 'staged') not in EVALUATION_MODES:
+            raise ValueError(f"Unknown evaluation mode {kwargs['default_mode']!r}; use one of {EVALUATION_MODES}")
+        kwargs['sub_agents'] = [kwargs['categorizer'], kwargs['grader'], kwargs['fused_grader']]
+        super().__init__(**kwargs)
+
+    def _mode(self, ctx: InvocationContext) -> str:
+        mode = ctx.session.state.get(EVALUATION_MODE_KEY)
+        if mode is None:
+            return self.default_mode
+        mode = str(mode).strip().lower()
+        if mode not in EVALUATION_MODES:
+            logger.warning(f"Unknown evaluation mode {mode!r}, using {self.default_mode!r}")
+            return self.default_mode
+        return mode
+
+    def _event(self, ctx: InvocationContext, text: str, state_delta: dict) -> Event:
+        return Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(role='model', parts=[types.Part(text=text)]),
+            actions=EventActions(state_delta=state_delta),
+        )
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        if self._mode(ctx) == "fused":
+            # Read from this run's events; session state may hold an earlier request's output
+            output = None
+            async for event in self.fused_grader.run_async(ctx):
+                output = event.actions.state_delta.get(self.fused_grader.output_key, output)
+                yield event
+            try:
+                if isinstance(output, str):
+                    output = json.loads(strip_fences(output))
+                result = CourseCategoryAndGrades.model_validate(output)
+            except ValueError:
+                # A failed attempt was already counted as a parse failure by with_retry
+                logger.warning(f"{self.fused_grader.name} gave no usable output; running the staged agents")
+            else:
+                # One event per key, as the staged agents emit them, so
+                # stream consumers see the same stage sequence
+                yield self._event(ctx, result.category, {
+                    "course_category": result.category,
+                    "course_evaluation_mode": "fused",
+                })
+                grades = json.dumps(result.grades.model_dump())
+                yield self._event(ctx, grades, {"course_grades": grades})
+                return
+
+        async for event in self.categorizer.run_async(ctx):
+            yield event
+        async for event in self.grader.run_async(ctx):
+            yield event
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(state_delta={"course_evaluation_mode": "staged"}),
+        )
+
+
+def build_categorize_and_grade(categorizer: BaseAgent, grader: BaseAgent, default_mode: str = "staged",
+                               model=MODEL_NAME) -> CategorizeAndGradeAgent:
+    """Wraps the staged categorizer and grader with a fused single-call alternative."""
+    fused_grader = structured_llm_agent(
+        model=model,
+        name='course_fused_grader',
+        description="Categorizes and grades course content in a single call.",
+        instruction=build_fused_instruction(),
+        output_schema=CourseCategoryAndGrades,
+        output_key="course_fused_grades"
+    )
+    return CategorizeAndGradeAgent(
+        name='course_categorize_and_grade',
+        description="Categorizes and grades course content, in one model call in fused mode.",
+        categorizer=categorizer,
+        grader=grader,
+        fused_grader=fused_grader,
+        default_mode=default_mode,
+    )
@@ -0,0 +1,312 @@
+import asyncio
+import hashlib
+import json
+import logging
+from typing import AsyncGenerator, Optional
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.adk.models.llm_request import LlmRequest
+from google.genai import types
+
+from ..utils.chunking import CHARS_PER_TOKEN, chunk_content, chunk_content_stable, estimate_tokens
+from ..utils.metrics import LLM_METRICS_KEY, PARSE_FAILURES_KEY
+from ..utils.prompts import CategoryInstruction
+from ..utils.section_cache import get_section_cache
+from ..utils.schemas import CourseGrades
+from ..utils.scoring import strip_fences
+from ..utils.structured_output import structured_llm_agent
+from ..utils.weights import EVALUATION_ELEMENTS, MODEL_NAME
+from .agent import ELEMENT_CRITERIA, grader_instruction
+
+logger = logging.getLogger(__name__)
+
+_MAX_EVIDENCE_CHARS = 300
+
+
+def build_evidence_instruction(elements=EVALUATION_ELEMENTS, max_items: int = 3, category: Optional[str] = None) -> str:
+    """Renders the prompt that extracts rubric evidence from one section of a course.
+
+    Without ``category`` the prompt reads ``{course_category}`` from session state.
+    """
+    criteria = "\n".join(f"- **{element}:** {ELEMENT_CRITERIA[element]}" for element in elements)
+    example = json.dumps({elements[0]: ["Learners choose one of three capstone projects."]}, indent=4)
+    return f"""You are an expert course evaluator using the ABYA University rubric system.
+
+**Course Category:** {category or '{course_category}'}
+
+**Your Task:**
+The user message is one section of a longer course. Extract evidence from this section only for each of the following evaluation elements. Do not score the course.
+
+{criteria}
+
+**Output Format:**
+Provide a valid JSON object where keys are the exact element names and values are lists of at most {max_items} short, factual observations (one sentence each) taken from the section. Use an empty list when the section has no evidence for an element.
+
+Example format:
+{example}
+
+Output ONLY the JSON object with no additional text, explanations, or markdown formatting.
+"""
+
+
+def _user_message(text: str, then=None):
+    """Returns a before_model_callback that sends ``text`` as the only user message,
+    then runs ``then`` (the template agent's own callback, if any)."""
+    def callback(callback_context: CallbackContext, llm_request: LlmRequest):
+        llm_request.contents = [types.Content(role='user', parts=[types.Part(text=text)])]
+        if then is not None:
+            return then(callback_context=callback_context, llm_request=llm_request)
+    return callback
+
+
+def _evidence_from_state(callback_context: CallbackContext, llm_request: LlmRequest):
+    evidence = callback_context.state.get("course_evidence", "")
+    llm_request.contents = [types.Content(role='user', parts=[types.Part(text=evidence)])]
+
+
+def parse_evidence(raw: str) -> dict:
+    """Parses a chunk's evidence JSON into {element: [observations]}, ignoring unknown keys."""
+    data = json.loads(strip_fences(raw))
+    if not isinstance(data, dict):
+        raise ValueError("evidence must be a JSON object")
+    by_name = {str(key).strip().lower(): value for key, value in data.items()}
+    evidence = {}
+    for element in EVALUATION_ELEMENTS:
+        items = by_name.get(element.lower()) or []
+        if isinstance(items, str):
+            items = [items]
+        evidence[element] = [str(item).strip()[:_MAX_EVIDENCE_CHARS] for item in items if str(item).strip()]
+    return evidence
+
+
+def render_evidence(chunk_evidence: list, max_tokens: int) -> str:
+    """Renders per-chunk evidence as the reduce step's input, within ``max_tokens``.
+
+    ``chunk_evidence`` is a list of (title, evidence dict). When everything
+    does not fit, observations are taken round-robin across sections so each
+    part of the course stays represented.
+    """
+    budget = max_tokens * CHARS_PER_TOKEN
+    lines = {element: [] for element in EVALUATION_ELEMENTS}
+    queues = [
+        [(element, f"- [{title}] {item}") for element in EVALUATION_ELEMENTS for item in evidence[element]]
+        for title, evidence in chunk_evidence
+    ]
+    used = 0
+    while any(queues) and used < budget:
+        for queue in queues:
+            if queue and used < budget:
+                element, line = queue.pop(0)
+                lines[element].append(line)
+                used += len(line) + 1
+
+    sections = [
+        f"## {element}\n" + ("\n".join(lines[element]) if lines[element] else "- No evidence found.")
+        for element in EVALUATION_ELEMENTS
+    ]
+    return (
+        f"Evidence extracted from {len(chunk_evidence)} sections of the course, grouped by evaluation element:\n\n"
+        + "\n\n".join(sections)
+    )
+
+
+class MapReduceGraderAgent(BaseAgent):
+    """Grades long courses section by section.
+
+    Content that fits in one ``chunk_tokens`` budget is graded directly by
+    ``direct_grader``. Longer content is split at module/section headings
+    into chunks; ``evidence_agent`` extracts evidence for every rubric
+    element from all chunks concurrently (at most ``max_concurrency`` at a
+    time), and ``reduce_grader`` turns the combined evidence into the 10
+    scores under ``course_grades``. Chunks that fail or miss
+    ``chunk_timeout`` are left out and listed under ``course_grader_errors``.
+    When fewer than ``min_success_ratio`` of the chunks could be read, the
+    course is not graded: ``course_grades`` is cleared so the score
+    calculator reports an error instead of scoring a partial course.
+
+    With ``incremental`` set, chunk boundaries follow the sections
+    themselves (see chunk_content_stable) and each chunk's evidence is kept
+    in the process-wide section evidence cache. When a revised course is
+    resubmitted, chunks whose normalized text is unchanged reuse their
+    cached evidence and every changed chunk is sent to ``evidence_agent``.
+    The reduce step always grades the merged evidence. How many chunks were
+    reused is saved under ``course_grader_reused_chunks``.
+    """
+
+    direct_grader: BaseAgent
+    evidence_agent: LlmAgent
+    reduce_grader: BaseAgent
+    chunk_tokens: int = 32000
+    max_concurrency: int = 8
+    chunk_timeout: float = 120.0
+    incremental: bool = False
+    min_success_ratio: float = 0.5
+
+    def __init__(self, **kwargs):
+        kwargs['sub_agents'] = [kwargs['direct_grader'], kwargs['evidence_agent'], kwargs['reduce_grader']]
+        super().__init__(**kwargs)
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        content = ''.join(
+            part.text or '' for part in (ctx.user_content.parts if ctx.user_content else [])
+        )
+        if estimate_tokens(content) <= self.chunk_tokens:
+            async for event in self.direct_grader.run_async(ctx):
+                yield event
+            return
+
+        if self.incremental:
+            chunks = chunk_content_stable(content, self.chunk_tokens)
+            cache = get_section_cache()
+            scope = self._cache_scope(ctx.session.state.get("course_category", ""))
+            cached = [cache.get(scope, text) for _, text in chunks]
+        else:
+            chunks = chunk_content(content, self.chunk_tokens)
+            cached = [None] * len(chunks)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        call_metrics = []
+
+        async def extract(agent: LlmAgent) -> dict:
+            # Extractors see only their own section and write nothing to the
+            # session; the evidence is read from their final response
+            response = None
+            async for event in agent.run_async(ctx):
+                if LLM_METRICS_KEY in event.actions.state_delta:
+                    call_metrics.append(event.actions.state_delta[LLM_METRICS_KEY])
+                if event.is_final_response() and event.content and event.content.parts:
+                    response = ''.join(part.text or '' for part in event.content.parts)
+            if response is None:
+                raise ValueError("no response")
+            return parse_evidence(response)
+
+        async def extract_chunk(index: int, text: str) -> dict:
+            agent = self.evidence_agent.model_copy(update={
+                'name': f'{self.evidence_agent.name}_{index}',
+                'before_model_callback': _user_message(text, self.evidence_agent.before_model_callback),
+            })
+            async with semaphore:
+                return await asyncio.wait_for(extract(agent), self.chunk_timeout)
+
+        async def reuse(evidence: dict) -> dict:
+            return evidence
+
+        results = await asyncio.gather(
+            *(
+                reuse(evidence) if evidence is not None else extract_chunk(i, text)
+                for i, ((_, text), evidence) in enumerate(zip(chunks, cached), start=1)
+            ),
+            return_exceptions=True,
+        )
+
+        chunk_evidence, errors, parse_failures = [], [], []
+        for (title, _), result in zip(chunks, results):
+            if isinstance(result, BaseException):
+                reason = 'timed out' if isinstance(result, asyncio.TimeoutError) else f'failed: {result}'
+                errors.append(f"Evidence extraction for '{title}' {reason}")
+                if isinstance(result, ValueError):
+                    parse_failures.append(self.evidence_agent.name)
+            else:
+                chunk_evidence.append((title, result))
+        if self.incremental:
+            for (_, text), evidence, result in zip(chunks, cached, results):
+                if evidence is None and not isinstance(result, BaseException):
+                    cache.set(scope, text, result)
+        graded = bool(chunk_evidence) and len(chunk_evidence) >= self.min_success_ratio * len(chunks)
+        if not graded:
+            errors.append(
+                f"Only {len(chunk_evidence)} of {len(chunks)} sections could be read; the course was not graded"
+            )
+        for error in errors:
+            logger.warning(error)
+
+        # The extractors' own events are not passed on, so their evidence stays
+        # out of the conversation; only their model-call metrics are
+        for metrics in call_metrics:
+            yield Event(
+                invocation_id=ctx.invocation_id,
+                author=self.name,
+                branch=ctx.branch,
+                actions=EventActions(state_delta={LLM_METRICS_KEY: metrics}),
+            )
+
+        state_delta = {
+            "course_evidence": render_evidence(chunk_evidence, self.chunk_tokens),
+            "course_grader_chunks": len(chunks),
+        }
+        if self.incremental:
+            state_delta["course_grader_reused_chunks"] = sum(evidence is not None for evidence in cached)
+        if errors:
+            state_delta["course_grader_errors"] = errors
+        if parse_failures:
+            state_delta[PARSE_FAILURES_KEY] = parse_failures
+        if not graded:
+            # Grades left in the session by an earlier run must not be scored either
+            state_delta["course_grades"] = None
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(state_delta=state_delta),
+        )
+        if not graded:
+            return
+
+        async for event in self.reduce_grader.run_async(ctx):
+            yield event
+
+    def _cache_scope(self, category: str) -> str:
+        """Identifies what cached evidence depends on besides the section: prompt, model and category."""
+        model = self.evidence_agent.model
+        model_name = model if isinstance(model, str) else model.model
+        instruction = self.evidence_agent.instruction
+        if not isinstance(instruction, str):
+            instruction = instruction.for_category(category)
+        payload = json.dumps([instruction, model_name, category])
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def build_map_reduce_grader(chunk_tokens: int = 32000, max_concurrency: int = 8, chunk_timeout: float = 120.0,
+                            direct_grader: Optional[BaseAgent] = None, model=MODEL_NAME,
+                            incremental: bool = False, min_success_ratio: float = 0.5) -> MapReduceGraderAgent:
+    """Builds a grader that falls back to map-reduce over sections for long courses."""
+    if direct_grader is None:
+        direct_grader = structured_llm_agent(
+            model=model,
+            name='course_grader',
+            description="Evaluates course content against ABYA University rubric elements.",
+            instruction=grader_instruction(),
+            output_schema=CourseGrades,
+            output_key="course_grades"
+        )
+    evidence_agent = LlmAgent(
+        model=model,
+        name='course_evidence',
+        description="Extracts rubric evidence from one section of a long course.",
+        instruction=CategoryInstruction(build_evidence_instruction),
+        include_contents='none',
+    )
+    reduce_grader = structured_llm_agent(
+        model=model,
+        name='course_grader_reduce',
+        description="Scores a long course from the evidence extracted from each of its sections.",
+        instruction=grader_instruction(source="the course from the section-by-section evidence provided by the user"),
+        include_contents='none',
+        before_model_callback=_evidence_from_state,
+        output_schema=CourseGrades,
+        output_key="course_grades"
+    )
+    return MapReduceGraderAgent(
+        name='course_grader_map_reduce',
+        description="Evaluates course content directly, or section by section when it exceeds the chunk budget.",
+        direct_grader=direct_grader,
+        evidence_agent=evidence_agent,
+        reduce_grader=reduce_grader,
+        chunk_tokens=chunk_tokens,
+        max_concurrency=max_concurrency,
+        chunk_timeout=chunk_timeout,
+        incremental=incremental,
+        min_success_ratio=min_success_ratio,
+    )
@@ -0,0 +1,146 @@
+import asyncio
+import json
+import logging
+from typing import AsyncGenerator
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+from ..utils.metrics import PARSE_FAILURES_KEY
+from ..utils.schemas import grades_schema
+from ..utils.scoring import GradeValidationError, parse_grades
+from ..utils.structured_output import structured_llm_agent
+from ..utils.weights import EVALUATION_ELEMENTS, MODEL_NAME
+from .agent import grader_instruction
+
+logger = logging.getLogger(__name__)
+
+
+def split_elements(width: int, elements=EVALUATION_ELEMENTS) -> list:
+    """Splits the evaluation elements into at most ``width`` contiguous groups."""
+    width = max(1, min(width, len(elements)))
+    size, extra = divmod(len(elements), width)
+    groups, start = [], 0
+    for i in range(width):
+        end = start + size + (1 if i < extra else 0)
+        groups.append(list(elements[start:end]))
+        start = end
+    return groups
+
+
+class ParallelGraderAgent(BaseAgent):
+    """Grades groups of rubric elements concurrently and merges the results.
+
+    Each sub-agent scores one group of elements in an isolated branch. All
+    branches share a deadline of ``branch_timeout`` seconds; branches that
+    miss it or fail are cancelled and their elements are left out, which the
+    score calculator then reports as missing grades. The merged grades are written
+    to ``course_grades`` in the same JSON format as the single grader.
+    """
+
+    groups: list
+    branch_timeout: float = 120.0
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        parent_branch = ctx.branch
+        # Isolate the branches so they do not see each other's output
+        ctx.branch = f"{ctx.branch}.{self.name}" if ctx.branch else self.name
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.branch_timeout
+        queue = asyncio.Queue()
+        # Read from this run's events; session state may hold an earlier request's output
+        outputs = {}
+
+        async def run_branch(agent):
+            # Each branch runs in its own task; the runner must handle an
+            # event before the branch moves on, as with ParallelAgent
+            async for event in agent.run_async(ctx):
+                if agent.output_key in event.actions.state_delta:
+                    outputs[agent.name] = event.actions.state_delta[agent.output_key]
+                processed = loop.create_future()
+                await queue.put((event, processed))
+                await processed
+
+        branches = {asyncio.create_task(run_branch(agent)): agent.name for agent in self.sub_agents}
+        running = set(branches)
+        failed = {}
+
+        while running or not queue.empty():
+            getter = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait(
+                {getter, *running}, timeout=max(deadline - loop.time(), 0), return_when=asyncio.FIRST_COMPLETED
+            )
+            if getter in done:
+                event, processed = getter.result()
+                yield event
+                processed.set_result(None)
+            else:
+                getter.cancel()
+            for task in done - {getter}:
+                running.discard(task)
+                if task.exception():
+                    failed[branches[task]] = f"{branches[task]} failed: {task.exception()}"
+            if not done:
+                for task in running:
+                    task.cancel()
+                    failed[branches[task]] = f"{branches[task]} timed out after {self.branch_timeout}s"
+                await asyncio.gather(*running, return_exceptions=True)
+                break
+
+        grades, errors, parse_failures = {}, [], []
+        for agent, elements in zip(self.sub_agents, self.groups):
+            if agent.name in failed:
+                errors.append(failed[agent.name])
+                continue
+            raw_grades = outputs.get(agent.name)
+            if raw_grades is None:
+                # The branch already reported its rejected output
+                errors.append(f"{agent.name}: no valid output")
+                continue
+            try:
+                grades.update(parse_grades(raw_grades, elements))
+            except GradeValidationError as e:
+                errors.append(f"{agent.name}: {e}")
+                parse_failures.append(agent.name)
+        for error in errors:
+            logger.warning(f"Parallel grading branch failed: {error}")
+
+        merged = json.dumps({element: grades[element] for element in EVALUATION_ELEMENTS if element in grades})
+        state_delta = {"course_grades": merged}
+        if errors:
+            state_delta["course_grader_errors"] = errors
+        if parse_failures:
+            state_delta[PARSE_FAILURES_KEY] = parse_failures
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=parent_branch,
+            content=types.Content(role='model', parts=[types.Part(text=merged)]),
+            actions=EventActions(state_delta=state_delta),
+        )
+
+
+def build_parallel_grader(width: int = 5, branch_timeout: float = 120.0, model=MODEL_NAME) -> ParallelGraderAgent:
+    """Builds a grader that fans out over ``width`` groups of evaluation elements."""
+    groups = split_elements(width)
+    branches = [
+        structured_llm_agent(
+            model=model,
+            name=f'course_grader_group_{i}',
+            description=f"Evaluates course content against: {', '.join(elements)}.",
+            instruction=grader_instruction(elements),
+            output_schema=grades_schema(elements),
+            output_key=f"course_grades_group_{i}"
+        )
+        for i, elements in enumerate(groups, start=1)
+    ]
+    return ParallelGraderAgent(
+        name='course_grader',
+        description="Evaluates course content against ABYA University rubric elements in parallel groups.",
+        sub_agents=branches,
+        groups=groups,
+        branch_timeout=branch_timeout,
+    )
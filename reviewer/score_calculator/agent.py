@@ -1,67 +1,183 @@
-from google.adk.agents import LlmAgent
-from ..utils.weights import RUBRIC_WEIGHTS
-from ..utils.weights import PASS_MARK
+import json
+import os
+from typing import AsyncGenerator, Optional
 
-# Score Calculation and Final Evaluation Agent
-# Takes the grades and category, calculates weighted score and determines pass/fail
-score_calculator_agent = LlmAgent(
-    model='gemini-2.0-flash',
-    name='score_calculator',
-    description="Calculates final weighted score and provides comprehensive evaluation results.",
-    instruction=f"""You are a score calculation specialist for the ABYA University course evaluation system.
-
-**Course Category:** {{course_category}}
-**Individual Grades (JSON):** {{course_grades}}
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai import types
+from pydantic import ValidationError
 
-**Rubric Weights by Category:**
+from ..utils.scoring import (
+    GradeValidationError,
+    calculate_score,
+    default_feedback,
+    parse_grades,
+    resolve_category,
+    strip_fences,
+)
+from ..utils.metrics import PARSE_FAILURES_KEY
+from ..utils.prompts import CategoryInstruction
+from ..utils.schemas import CourseEvaluation, CourseFeedback
+from ..utils.structured_output import structured_llm_agent
+from ..utils.weights import MODEL_NAME, PASS_MARK, RUBRIC_WEIGHTS
 
-**Blockchain Technology and Development:**
-{', '.join([f'{k}: {v}%' for k, v in RUBRIC_WEIGHTS['Blockchain Technology and Development'].items()])}
 
-**Web3 Development and Design:**
-{', '.join([f'{k}: {v}%' for k, v in RUBRIC_WEIGHTS['Web3 Development and Design'].items()])}
+def _render_summary_prompt(category: str) -> str:
+    """Renders the fixed part of the summary prompt for one category."""
+    weights = RUBRIC_WEIGHTS.get(category)
+    weight_lines = (
+        "\n".join(f"- {element}: {weight}%" for element, weight in weights.items())
+        if weights else "- Not available"
+    )
+    return f"""You are a course quality reviewer for the ABYA University course evaluation system.
 
-**Blockchain Applications and Business:**
-{', '.join([f'{k}: {v}%' for k, v in RUBRIC_WEIGHTS['Blockchain Applications and Business'].items()])}
+The course content provided by the course provider has already been graded and scored.
+The scores at the end of this prompt are final and must not be recalculated or changed.
 
-**Web3 Ecosystem and Operations:**
-{', '.join([f'{k}: {v}%' for k, v in RUBRIC_WEIGHTS['Web3 Ecosystem and Operations'].items()])}
+**Course Category:** {category}
 
-**Emerging Technologies and Intersections:**
-{', '.join([f'{k}: {v}%' for k, v in RUBRIC_WEIGHTS['Emerging Technologies and Intersections'].items()])}
+**Element Weights:**
+{weight_lines}
 
 **Your Task:**
-1. Parse the individual grades JSON from the previous agent
-2. Identify the correct weights based on the course category
-3. Calculate the final weighted score using the formula: sum(grade × weight/100) for each element
-4. Determine pass/fail status (Pass Mark: {PASS_MARK}%)
-5. Generate a comprehensive evaluation summary for the course content provided by the course provider
-
-**Calculation Example:**
-If Learner Agency = 85 and weight = 10%, then contribution = 85 × 0.10 = 8.5 points
-Sum all such contributions for the final score.
+Write feedback for the course provider based on the evaluation below.
 
 **Output Format:**
-Provide a comprehensive JSON response with the following structure:
+Provide a JSON object with exactly these keys:
 
 {{
-    "final_score": [calculated weighted score as number],
-    "passed": [true if score >= {PASS_MARK}, false otherwise],
-    "individual_scores": [the parsed grades object],
-    "category": "[course category]",
-    "category_weights": [object with weights for this category],
-    "pass_mark": {PASS_MARK},
-    "calculation_breakdown": [array of objects showing each element's contribution],
     "summary": "[2-3 sentence evaluation summary highlighting the course's strengths and areas for improvement from the course provider's perspective]",
     "recommendation": "[brief recommendation for the course provider on how to improve the course content and delivery]"
 }}
 
-**Important:** 
-- Ensure all calculations are accurate
-- Verify that individual scores are properly weighted
-- Frame the summary and recommendations from the perspective of evaluating course content provided by course providers
+**Important:**
 - Focus on course design, content quality, and instructional effectiveness
 - Output ONLY the JSON object with no additional text or formatting
-""",
-output_key="course_evaluation"
+"""
+
+
+# The fixed part of the summary prompt, pre-rendered per category; only the
+# scores are written per request, after it, so the prefix stays identical
+# across courses in the same category
+_summary_prompt = CategoryInstruction(_render_summary_prompt)
+
+
+def _score_summary_instruction(context) -> str:
+    """Builds the summary prompt from the score the calculator stored under ``course_score``."""
+    # Read back rather than recomputed, so the prompt states the calculator's own pass mark
+    evaluation = context.state["course_score"]
+    scores = "\n".join(
+        f"- {item['element']}: {item['grade']} ({item['contribution']} weighted points)"
+        for item in evaluation["calculation_breakdown"]
+    )
+    outcome = "passed" if evaluation["passed"] else "did not pass"
+    return f"""{_summary_prompt.for_category(evaluation['category'])}
+**Evaluation:**
+Final score {evaluation['final_score']} against a pass mark of {evaluation['pass_mark']}; the course {outcome}.
+{scores}
+"""
+
+
+# Summary Agent
+# Only writes the prose feedback; all arithmetic is done in Python beforehand
+score_summary_agent = structured_llm_agent(
+    model=MODEL_NAME,
+    name='score_summarizer',
+    description="Writes the evaluation summary and recommendation for an already calculated score.",
+    instruction=_score_summary_instruction,
+    output_schema=CourseFeedback,
+    output_key="course_summary"
+)
+
+
+class ScoreCalculatorAgent(BaseAgent):
+    """Calculates the weighted final score deterministically.
+
+    Reads ``course_category`` and ``course_grades`` from session state, applies
+    the category weights from RUBRIC_WEIGHTS and stores the result under
+    ``course_evaluation``. When a summary agent is configured, it is only asked
+    to write the prose summary and recommendation, from the score stored
+    under ``course_score`` beforehand.
+    """
+
+    summary_agent: Optional[BaseAgent] = None
+    pass_mark: float = PASS_MARK
+
+    def __init__(self, summary_agent: Optional[BaseAgent] = None, **kwargs):
+        sub_agents = [summary_agent] if summary_agent else []
+        super().__init__(summary_agent=summary_agent, sub_agents=sub_agents, **kwargs)
+
+    def _evaluation_event(self, ctx: InvocationContext, evaluation: dict, parse_failures=None) -> Event:
+        state_delta = {"course_evaluation": evaluation}
+        if parse_failures:
+            state_delta[PARSE_FAILURES_KEY] = parse_failures
+        return Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(role='model', parts=[types.Part(text=json.dumps(evaluation))]),
+            actions=EventActions(state_delta=state_delta),
+        )
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        state = ctx.session.state
+        # Failures are attributed to the stage whose output could not be parsed;
+        # output that is missing altogether was already reported by its stage
+        stage, key = 'course_categorizer', 'course_category'
+        try:
+            category = resolve_category(state.get(key))
+            stage, key = 'course_grader', 'course_grades'
+            grades = parse_grades(state.get(key))
+        except GradeValidationError as e:
+            failed = [stage] if state.get(key) is not None else []
+            error = str(e)
+            if stage == 'course_grader' and state.get(key) is None and state.get('course_grader_errors'):
+                # The grader gave up; its last error says why
+                error = f"{error}: {state['course_grader_errors'][-1]}"
+            yield self._evaluation_event(ctx, {"error": error}, parse_failures=failed)
+            return
+
+        evaluation = calculate_score(category, grades, self.pass_mark)
+        feedback = default_feedback(evaluation)
+        parse_failures = []
+
+        if self.summary_agent:
+            yield Event(
+                invocation_id=ctx.invocation_id,
+                author=self.name,
+                branch=ctx.branch,
+                actions=EventActions(state_delta={"course_score": dict(evaluation)}),
+            )
+            async for event in self.summary_agent.run_async(ctx):
+                yield event
+            summary = ctx.session.state.get("course_summary")
+            try:
+                if isinstance(summary, str):
+                    summary = json.loads(strip_fences(summary))
+                feedback.update(CourseFeedback.model_validate(summary).model_dump())
+            except ValueError:
+                # Keep the rule-based feedback if the model output is unusable
+                if summary is not None:
+                    parse_failures.append(self.summary_agent.name)
+
+        evaluation.update(feedback)
+        try:
+            CourseEvaluation.model_validate(evaluation)
+        except ValidationError as e:
+            evaluation = {"error": f"Evaluation does not match its schema: {e}"}
+        yield self._evaluation_event(ctx, evaluation, parse_failures)
+
+
+# Score Calculation and Final Evaluation Agent
+# Takes the grades and category, calculates weighted score and determines pass/fail.
+# Set REVIEWER_LLM_SUMMARY=false to skip the model call and use rule-based feedback.
+score_calculator_agent = ScoreCalculatorAgent(
+    name='score_calculator',
+    description="Calculates final weighted score and provides comprehensive evaluation results.",
+    summary_agent=(
+        score_summary_agent
+        if os.getenv("REVIEWER_LLM_SUMMARY", "true").lower() not in ("0", "false", "no")
+        else None
+    ),
 )
@@ -0,0 +1,130 @@
+import atexit
+import gzip
+import json
+import os
+import threading
+import zlib
+from typing import Optional
+
+
+class CassetteMissError(LookupError):
+    """Raised when a replayed model call has no recording to answer it."""
+
+
+class Cassette:
+    """Recorded model calls, indexed by a hash of the request.
+
+    Each entry is one call: ``key``, the SHA-256 of the full request;
+    ``stage``, a hash of the request without the conversation (the prompt,
+    or the output schema when there is one), so it names the pipeline stage
+    the call came from; the responses the model yielded; and the seconds
+    the call took. Entries are kept as gzip-compressed JSON lines and
+    appended as they are recorded, so an interrupted recording keeps what
+    it had. The first recording of a request wins.
+
+    ``get`` answers a request with its exact recording. With ``fallback``,
+    a request that was never recorded (new course content, say) gets one
+    of its stage's recordings, picked by the request hash, so replays stay
+    deterministic. Record from one process at a time.
+    """
+
+    def __init__(self, path: str, fallback: bool = True):
+        self.path = path
+        self.fallback = fallback
+        self._entries = {}
+        self._stages = {}
+        self._file = None
+        self._lock = threading.Lock()
+        self._counters = {"exact": 0, "fallback": 0, "misses": 0, "recorded": 0}
+        if os.path.exists(path):
+            self._load()
+
+    def _load(self):
+        try:
+            with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        self._index(json.loads(line))
+        except (EOFError, zlib.error):
+            # A recording that was not closed cleanly ends mid-stream; keep the complete lines
+            pass
+
+    def _index(self, entry: dict) -> bool:
+        if entry["key"] in self._entries:
+            return False
+        self._entries[entry["key"]] = entry
+        self._stages.setdefault(entry["stage"], []).append(entry)
+        return True
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str, stage: str) -> tuple:
+        """Returns (entry, 'exact' or 'fallback'); raises CassetteMissError when nothing matches."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._counters["exact"] += 1
+                return entry, "exact"
+            recordings = self._stages.get(stage) if self.fallback else None
+            if recordings:
+                self._counters["fallback"] += 1
+                return recordings[int(key[:8], 16) % len(recordings)], "fallback"
+            self._counters["misses"] += 1
+        raise CassetteMissError(f"No recorded model call for request {key[:12]} in {self.path}")
+
+    def record(self, key: str, stage: str, responses: list, seconds: float, model: Optional[str] = None) -> None:
+        """Adds a call to the cassette and appends it to the file, unless the request is already recorded."""
+        entry = {"key": key, "stage": stage, "model": model, "seconds": round(seconds, 4), "responses": responses}
+        with self._lock:
+            if not self._index(entry):
+                return
+            if self._file is None:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                self._file = gzip.open(self.path, 'at', encoding='utf-8')
+            self._file.write(json.dumps(entry, separators=(',', ':')) + "\n")
+            # A sync flush keeps every recorded line readable if the process dies
+            self._file.flush()
+            self._counters["recorded"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._counters, entries=len(self._entries), stages=len(self._stages))
+        replayed = stats["exact"] + stats["fallback"] + stats["misses"]
+        stats["exact_rate"] = round(stats["exact"] / replayed, 4) if replayed else 0.0
+        return stats
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+_cassettes = {}
+_cassettes_lock = threading.Lock()
+
+
+def get_cassette(path: str) -> Cassette:
+    """Returns the process-wide cassette for a file, loading it on first use.
+
+    REVIEWER_CASSETTE_FALLBACK=false makes replays fail on requests that
+    were not recorded instead of answering from the same stage.
+    """
+    with _cassettes_lock:
+        cassette = _cassettes.get(path)
+        if cassette is None:
+            cassette = Cassette(
+                path,
+                fallback=os.getenv('REVIEWER_CASSETTE_FALLBACK', 'true').lower() not in ('0', 'false', 'no'),
+            )
+            atexit.register(cassette.close)
+            _cassettes[path] = cassette
+        return cassette
+
+
+def cassette_stats() -> dict:
+    """Returns the stats of every cassette opened in this process, by path."""
+    with _cassettes_lock:
+        cassettes = list(_cassettes.values())
+    return {cassette.path: cassette.stats() for cassette in cassettes}
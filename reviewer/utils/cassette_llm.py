@@ -0,0 +1,103 @@
+import asyncio
+import hashlib
+import json
+import time
+from typing import AsyncGenerator, Optional
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+
+from .cassette import get_cassette
+
+
+def _digest(payload) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def _schema_name(llm_request: LlmRequest) -> Optional[str]:
+    schema = llm_request.config.response_schema if llm_request.config else None
+    if schema is None:
+        return None
+    return getattr(schema, '__name__', None) or getattr(schema, 'title', None) or repr(schema)
+
+
+def _system_instruction(llm_request: LlmRequest) -> str:
+    return str(llm_request.config.system_instruction or '') if llm_request.config else ''
+
+
+def request_key(llm_request: LlmRequest) -> str:
+    """Hashes what determines the model's answer: prompt, output schema and conversation.
+
+    The model name is left out, so a cassette recorded against one model
+    replays under another; keep one cassette per model.
+    """
+    return _digest({
+        'system': _system_instruction(llm_request),
+        'schema': _schema_name(llm_request),
+        'contents': [
+            [content.role, [part.text or '' for part in (content.parts or [])]]
+            for content in llm_request.contents
+        ],
+    })
+
+
+def stage_key(llm_request: LlmRequest) -> str:
+    """Hashes what identifies the pipeline stage: the output schema, or the prompt when there is none."""
+    schema = _schema_name(llm_request)
+    return _digest({'schema': schema} if schema else {'system': _system_instruction(llm_request)})
+
+
+class CassetteLlm(BaseLlm):
+    """Records ``llm``'s calls to a cassette file, or replays them without it.
+
+    With ``llm`` set, every call goes to it and its responses are recorded
+    under the request's hash. Without it, calls are answered from the
+    cassette after ``latency`` seconds (the recorded duration when None),
+    so no request leaves the process. Only the cassette's path is stored,
+    so agents stay picklable.
+    """
+
+    path: str
+    llm: Optional[BaseLlm] = None
+    latency: Optional[float] = None
+
+    @property
+    def cassette(self):
+        return get_cassette(self.path)
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        key, stage = request_key(llm_request), stage_key(llm_request)
+        if self.llm is None:
+            entry, _ = self.cassette.get(key, stage)
+            await asyncio.sleep(entry["seconds"] if self.latency is None else self.latency)
+            for response in entry["responses"]:
+                yield LlmResponse.model_validate(response)
+            return
+
+        start = time.perf_counter()
+        responses = []
+        async for response in self.llm.generate_content_async(llm_request, stream):
+            responses.append(response.model_dump(mode='json', exclude_none=True))
+            yield response
+        self.cassette.record(key, stage, responses, time.perf_counter() - start, model=self.llm.model)
+
+
+def use_cassette(agent: BaseAgent, path: str, record: bool = False, latency: Optional[float] = None) -> BaseAgent:
+    """Records (``record``) or replays the model calls of every LlmAgent in the tree.
+
+    Apply it before rate_limit, so replayed calls still go through the limiter.
+    """
+    if isinstance(agent, LlmAgent) and not isinstance(agent.model, CassetteLlm):
+        if record:
+            llm = agent.canonical_model
+            agent.model = CassetteLlm(model=llm.model, path=path, llm=llm, latency=latency)
+        else:
+            model = agent.model if isinstance(agent.model, str) else agent.model.model
+            agent.model = CassetteLlm(model=model, path=path, latency=latency)
+    for sub_agent in agent.sub_agents:
+        use_cassette(sub_agent, path, record, latency)
+    return agent
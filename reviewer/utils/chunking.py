@@ -0,0 +1,107 @@
+import hashlib
+import re
+
+# Lines that start a new module/section: markdown headings, "Module 3: ...",
+# "Week 2 - ...", numbered headings such as "4.2 Assessment"
+_HEADING = re.compile(
+    r"^\s*(#{1,6}\s+\S"
+    r"|(module|unit|week|section|chapter|lesson|part)\s+[\w.]+\b"
+    r"|\d+(\.\d+)*[.)]?\s+[A-Z])",
+    re.IGNORECASE,
+)
+
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)."""
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def split_sections(content: str) -> list:
+    """Splits course content at module/section headings, keeping the headings."""
+    sections, current = [], []
+    for line in content.splitlines(keepends=True):
+        if _HEADING.match(line) and any(l.strip() for l in current):
+            sections.append(''.join(current))
+            current = []
+        current.append(line)
+    if any(l.strip() for l in current):
+        sections.append(''.join(current))
+    return sections
+
+
+def _split_oversized(section: str, max_chars: int) -> list:
+    """Splits a section that alone exceeds the budget at paragraphs, then at max_chars."""
+    pieces, current = [], ''
+    for paragraph in re.split(r'(?<=\n\n)', section):
+        while len(paragraph) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ''
+            pieces.append(paragraph[:max_chars])
+            paragraph = paragraph[max_chars:]
+        if current and len(current) + len(paragraph) > max_chars:
+            pieces.append(current)
+            current = ''
+        current += paragraph
+    if current.strip():
+        pieces.append(current)
+    return pieces
+
+
+def _title(text: str, index: int) -> str:
+    for line in text.splitlines():
+        if line.strip():
+            title = line.strip().lstrip('#').strip()
+            return title[:80] if _HEADING.match(line) else f"Part {index}"
+    return f"Part {index}"
+
+
+def chunk_content(content: str, max_tokens: int) -> list:
+    """Packs consecutive sections into chunks of at most ``max_tokens`` tokens.
+
+    Returns a list of (title, text) pairs in document order.
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    chunks, current = [], ''
+    for section in split_sections(content):
+        for piece in _split_oversized(section, max_chars) if len(section) > max_chars else [section]:
+            if current and len(current) + len(piece) > max_chars:
+                chunks.append(current)
+                current = ''
+            current += piece
+    if current.strip():
+        chunks.append(current)
+    return [(_title(text, i), text) for i, text in enumerate(chunks, start=1)]
+
+
+def _boundary_hash(text: str) -> int:
+    normalized = re.sub(r'\s+', ' ', text).strip()
+    return int.from_bytes(hashlib.blake2b(normalized.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def chunk_content_stable(content: str, max_tokens: int, group_sections: int = 4) -> list:
+    """Packs sections into chunks whose boundaries depend on the sections themselves.
+
+    Like chunk_content, but a chunk also ends after any section whose hash
+    is divisible by ``group_sections`` (about one in ``group_sections``).
+    An edit to one section therefore changes only the chunk that holds it
+    (and at most its neighbour), instead of shifting every later boundary,
+    so evidence cached for the other chunks stays valid across revisions.
+    Returns a list of (title, text) pairs in document order.
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    chunks, current = [], ''
+    for section in split_sections(content):
+        for piece in _split_oversized(section, max_chars) if len(section) > max_chars else [section]:
+            if current and len(current) + len(piece) > max_chars:
+                chunks.append(current)
+                current = ''
+            current += piece
+            if _boundary_hash(piece) % group_sections == 0:
+                chunks.append(current)
+                current = ''
+    if current.strip():
+        chunks.append(current)
+    return [(_title(text, i), text) for i, text in enumerate(chunks, start=1)]
@@ -0,0 +1,33 @@
+import hashlib
+import json
+import re
+import unicodedata
+from typing import Optional
+
+from .weights import MODEL_NAME, PASS_MARK, RUBRIC_WEIGHTS
+
+
+def normalize_content(content: str) -> str:
+    """Normalizes course content so whitespace-only edits compare equal."""
+    content = unicodedata.normalize('NFC', content)
+    return re.sub(r'\s+', ' ', content).strip()
+
+
+def content_hash(content: str) -> str:
+    """Returns the SHA-256 hex digest of the normalized course content."""
+    return hashlib.sha256(normalize_content(content).encode('utf-8')).hexdigest()
+
+
+def rubric_version(model: str = MODEL_NAME, mode: Optional[str] = None) -> str:
+    """Returns a short digest identifying the rubric weights, pass mark, model
+    and, when one was requested, the evaluation mode."""
+    rubric = {"weights": RUBRIC_WEIGHTS, "pass_mark": PASS_MARK, "model": model}
+    if mode:
+        rubric["mode"] = mode
+    payload = json.dumps(rubric, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def evaluation_key(content: str, model: str = MODEL_NAME, mode: Optional[str] = None) -> str:
+    """Returns the key identifying an evaluation of this content under the current rubric."""
+    return f"{rubric_version(model, mode)}-{content_hash(content)}"
@@ -0,0 +1,102 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+from .chunking import estimate_tokens
+
+if TYPE_CHECKING:
+    from google.adk.agents import BaseAgent
+
+# Event state_delta keys carrying per-call metrics. The temp: prefix keeps them
+# out of session state while they still reach whoever consumes the events.
+LLM_METRICS_KEY = "temp:llm_metrics"
+PARSE_FAILURES_KEY = "temp:parse_failures"
+
+_MAX_IN_FLIGHT = 1024
+
+_in_flight = OrderedDict()
+_lock = threading.Lock()
+
+
+def _request_tokens(llm_request) -> int:
+    instruction = str(llm_request.config.system_instruction or '') if llm_request.config else ''
+    contents = ''.join(
+        part.text or ''
+        for content in llm_request.contents
+        for part in (content.parts or [])
+    )
+    return estimate_tokens(instruction + contents)
+
+
+def _before_model(callback_context, llm_request):
+    key = (callback_context.invocation_id, callback_context.agent_name)
+    with _lock:
+        _in_flight[key] = [time.perf_counter(), None, _request_tokens(llm_request)]
+        # Calls that raised never reach the after callback; forget the oldest
+        while len(_in_flight) > _MAX_IN_FLIGHT:
+            _in_flight.popitem(last=False)
+
+
+def _after_model(callback_context, llm_response):
+    key = (callback_context.invocation_id, callback_context.agent_name)
+    now = time.perf_counter()
+    with _lock:
+        entry = _in_flight.get(key)
+        if entry is None:
+            return
+        if entry[1] is None:
+            entry[1] = now - entry[0]  # time to first token
+        if llm_response.partial:
+            return
+        del _in_flight[key]
+    started, ttft, input_tokens = entry
+
+    usage = getattr(llm_response, 'usage_metadata', None)
+    if usage is not None and usage.prompt_token_count is not None:
+        input_tokens, output_tokens, estimated = usage.prompt_token_count, usage.candidates_token_count or 0, False
+    else:
+        text = ''.join(part.text or '' for part in (llm_response.content.parts or [])) if llm_response.content else ''
+        output_tokens, estimated = estimate_tokens(text), True
+
+    callback_context.state[LLM_METRICS_KEY] = {
+        "agent": callback_context.agent_name,
+        "seconds": round(now - started, 6),
+        "ttft_seconds": round(ttft, 6),
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "estimated_tokens": estimated,
+    }
+
+
+def _chain(first, second):
+    """Runs ``first`` and then ``second`` unless ``first`` returned a replacement."""
+    if first is None or second is None:
+        return first or second
+
+    def callback(callback_context, **kwargs):
+        result = first(callback_context=callback_context, **kwargs)
+        return result if result is not None else second(callback_context=callback_context, **kwargs)
+    callback.records_metrics = True
+    return callback
+
+
+def instrument(agent: "BaseAgent") -> "BaseAgent":
+    """Records latency, time to first token and token counts for every LLM call in the tree.
+
+    Each model response event carries the measurements under
+    LLM_METRICS_KEY in its state_delta. Existing before-model callbacks run
+    first, so the timer starts right before the model call and counts any
+    contents they set.
+    """
+    # Imported here so readers of the metric keys (the web server) do not load ADK
+    from google.adk.agents import LlmAgent
+
+    if isinstance(agent, LlmAgent) and not (
+        agent.after_model_callback is _after_model or getattr(agent.after_model_callback, 'records_metrics', False)
+    ):
+        agent.before_model_callback = _chain(agent.before_model_callback, _before_model)
+        agent.after_model_callback = _chain(_after_model, agent.after_model_callback)
+    for sub_agent in agent.sub_agents:
+        instrument(sub_agent)
+    return agent
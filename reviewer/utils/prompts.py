@@ -0,0 +1,33 @@
+from typing import Callable
+
+from .scoring import GradeValidationError, resolve_category
+
+
+class CategoryInstruction:
+    """ADK instruction provider that renders a prompt once per course category.
+
+    ``render(category=...)`` builds the full instruction for one category,
+    with the category and anything specific to it written in rather than
+    templated from session state. Calls resolve ``course_category`` onto
+    COURSE_CLUSTERS and return the cached rendering, so a request costs a
+    dict lookup and the model only sees what applies to its course. A
+    category that cannot be resolved is rendered as written, uncached.
+    """
+
+    def __init__(self, render: Callable[..., str]):
+        self.render = render
+        self._rendered = {}
+
+    def for_category(self, raw_category) -> str:
+        try:
+            category = resolve_category(raw_category)
+        except GradeValidationError:
+            return self.render(category=str(raw_category or '').strip())
+        prompt = self._rendered.get(category)
+        if prompt is None:
+            # Rendering twice under a race is harmless; setdefault keeps one copy
+            prompt = self._rendered.setdefault(category, self.render(category=category))
+        return prompt
+
+    def __call__(self, context) -> str:
+        return self.for_category(context.state.get("course_category"))
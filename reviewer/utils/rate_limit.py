@@ -0,0 +1,274 @@
+import asyncio
+import os
+import random
+import threading
+import time
+from typing import Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+# HTTP statuses that mean "slow down" rather than "this request is wrong"
+OVERLOAD_CODES = (429, 503)
+_OVERLOAD_MARKERS = ("RESOURCE_EXHAUSTED", "UNAVAILABLE", "Too Many Requests", "quota")
+
+# How long to wait before re-checking when every concurrency slot is taken
+_POLL_SECONDS = 0.01
+
+
+def overload_code(error: BaseException) -> Optional[int]:
+    """Returns 429/503 when ``error`` is a quota or overload error, else None.
+
+    Understands google-genai and google-api-core exceptions (``code``),
+    HTTP client errors (``status_code`` or ``response.status_code``) and,
+    as a last resort, the status names Vertex AI puts in its messages.
+    """
+    for code in (
+        getattr(error, "code", None),
+        getattr(error, "status_code", None),
+        getattr(getattr(error, "response", None), "status_code", None),
+    ):
+        if isinstance(code, int):
+            return code if code in OVERLOAD_CODES else None
+    message = str(error)
+    if any(marker in message for marker in _OVERLOAD_MARKERS):
+        return 429
+    return None
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Returns the server's Retry-After hint in seconds, if the error carries one."""
+    value = getattr(error, "retry_after", None)
+    if value is None:
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+        try:
+            value = headers.get("retry-after") or headers.get("Retry-After")
+        except AttributeError:
+            value = None
+    try:
+        return max(float(value), 0.0) if value is not None else None
+    except (TypeError, ValueError):
+        return None  # HTTP-date form; fall back to exponential backoff
+
+
+class TokenBucket:
+    """Allows ``rate`` acquisitions per second with bursts of up to ``burst``.
+
+    Not thread-safe on its own; AdaptiveLimiter guards it with its lock.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(rate, 1.0)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+
+    def take(self, now: float) -> float:
+        """Takes a token and returns 0, or returns the seconds until one is available."""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class AdaptiveLimiter:
+    """Client-side rate limit and AIMD concurrency limit for one model or endpoint.
+
+    A call first waits for a token from the bucket (when ``rate`` is set),
+    then for one of ``limit`` concurrency slots. The limit starts at
+    ``initial_concurrency`` and doubles while calls succeed (slow start)
+    until the first overload. After that it grows by one slot per ``limit``
+    successes and halves on a 429/503, at most once per ``cooldown``
+    seconds, never leaving [``min_concurrency``, ``max_concurrency``]. A
+    Retry-After hint pauses every caller, not just the one that received
+    it. Use ``call``/``call_async`` to run a function with the limiter and
+    jittered exponential retry on overload.
+
+    Thread-safe. The async methods poll instead of blocking, so one
+    limiter can be shared by threads and by several event loops.
+    """
+
+    def __init__(self, name: str = "default", rate: float = 0.0, burst: Optional[float] = None,
+                 initial_concurrency: int = 4, min_concurrency: int = 1, max_concurrency: int = 64,
+                 max_retries: int = 5, base_delay: float = 0.5, max_delay: float = 30.0,
+                 cooldown: float = 1.0):
+        self.name = name
+        self.bucket = TokenBucket(rate, burst) if rate > 0 else None
+        self.min_concurrency = max(1, min_concurrency)
+        self.max_concurrency = max(self.min_concurrency, max_concurrency)
+        self.limit = float(min(max(initial_concurrency, self.min_concurrency), self.max_concurrency))
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.cooldown = cooldown
+        self._slow_start = True
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+        self._rng = random.Random()
+        self._stats = {"calls": 0, "succeeded": 0, "failed": 0, "overloaded": 0,
+                       "retries": 0, "gave_up": 0, "decreases": 0, "wait_seconds": 0.0}
+
+    def try_acquire(self) -> float:
+        """Takes a slot and returns 0, or returns how long to wait before trying again."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._paused_until:
+                return self._paused_until - now
+            if self._in_flight >= int(self.limit):
+                return _POLL_SECONDS
+            if self.bucket is not None:
+                wait = self.bucket.take(now)
+                if wait > 0:
+                    return wait
+            self._in_flight += 1
+            self._stats["calls"] += 1
+            return 0.0
+
+    def acquire(self) -> None:
+        waited = 0.0
+        while (wait := self.try_acquire()) > 0:
+            time.sleep(wait)
+            waited += wait
+        self._add_wait(waited)
+
+    async def acquire_async(self) -> None:
+        waited = 0.0
+        while (wait := self.try_acquire()) > 0:
+            await asyncio.sleep(wait)
+            waited += wait
+        self._add_wait(waited)
+
+    def release(self, succeeded: bool = True, overloaded: bool = False,
+                retry_after_seconds: Optional[float] = None) -> None:
+        """Returns a slot and adjusts the concurrency limit from the outcome."""
+        with self._lock:
+            self._in_flight -= 1
+            now = time.monotonic()
+            if overloaded:
+                self._stats["overloaded"] += 1
+                self._slow_start = False
+                if now - self._last_decrease >= self.cooldown:
+                    self.limit = max(self.min_concurrency, self.limit / 2)
+                    self._last_decrease = now
+                    self._stats["decreases"] += 1
+                if retry_after_seconds:
+                    self._paused_until = max(self._paused_until, now + retry_after_seconds)
+            elif succeeded:
+                self._stats["succeeded"] += 1
+                step = 1.0 if self._slow_start else 1.0 / self.limit
+                self.limit = min(self.max_concurrency, self.limit + step)
+            else:
+                self._stats["failed"] += 1
+
+    def backoff(self, attempt: int, retry_after_seconds: Optional[float] = None) -> float:
+        """Full-jitter exponential delay before retry number ``attempt`` (0-based)."""
+        with self._lock:
+            delay = self._rng.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        return max(delay, retry_after_seconds or 0.0)
+
+    def record_failure(self, error: BaseException, attempt: int) -> Optional[float]:
+        """Releases the slot of a failed call.
+
+        Returns the delay before retry number ``attempt``, or None when the
+        error is not retryable or the retries are used up.
+        """
+        code = overload_code(error)
+        hint = retry_after(error) if code else None
+        self.release(succeeded=False, overloaded=code is not None, retry_after_seconds=hint)
+        if code is None:
+            return None
+        if attempt >= self.max_retries:
+            with self._lock:
+                self._stats["gave_up"] += 1
+            return None
+        with self._lock:
+            self._stats["retries"] += 1
+        return self.backoff(attempt, hint)
+
+    def call(self, fn: Callable[[], T]) -> T:
+        """Runs ``fn`` under the limiter, retrying quota and overload errors."""
+        for attempt in range(self.max_retries + 1):
+            self.acquire()
+            try:
+                result = fn()
+            except Exception as e:
+                delay = self.record_failure(e, attempt)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                continue
+            self.release()
+            return result
+
+    async def call_async(self, fn: Callable[[], "asyncio.Future"]):
+        """Awaits ``fn()`` under the limiter, retrying quota and overload errors."""
+        for attempt in range(self.max_retries + 1):
+            await self.acquire_async()
+            try:
+                result = await fn()
+            except Exception as e:
+                delay = self.record_failure(e, attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            self.release()
+            return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update(
+                name=self.name,
+                limit=round(self.limit, 2),
+                in_flight=self._in_flight,
+                slow_start=self._slow_start,
+                rate=self.bucket.rate if self.bucket else None,
+                paused_seconds=round(max(self._paused_until - time.monotonic(), 0.0), 3),
+            )
+        stats["wait_seconds"] = round(stats["wait_seconds"], 3)
+        return stats
+
+    def _add_wait(self, seconds: float) -> None:
+        if seconds:
+            with self._lock:
+                self._stats["wait_seconds"] += seconds
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(name: str) -> AdaptiveLimiter:
+    """Returns the process-wide limiter for a model, configured from the environment on first use.
+
+    REVIEWER_MODEL_RPS (0 = no rate limit), REVIEWER_MODEL_BURST,
+    REVIEWER_MODEL_CONCURRENCY (initial), REVIEWER_MODEL_MIN_CONCURRENCY,
+    REVIEWER_MODEL_MAX_CONCURRENCY and REVIEWER_MODEL_RETRIES apply to every
+    model limiter.
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            burst = os.getenv("REVIEWER_MODEL_BURST")
+            limiter = AdaptiveLimiter(
+                name=name,
+                rate=float(os.getenv("REVIEWER_MODEL_RPS", "0")),
+                burst=float(burst) if burst else None,
+                initial_concurrency=int(os.getenv("REVIEWER_MODEL_CONCURRENCY", "8")),
+                min_concurrency=int(os.getenv("REVIEWER_MODEL_MIN_CONCURRENCY", "1")),
+                max_concurrency=int(os.getenv("REVIEWER_MODEL_MAX_CONCURRENCY", "64")),
+                max_retries=int(os.getenv("REVIEWER_MODEL_RETRIES", "5")),
+            )
+            _limiters[name] = limiter
+        return limiter
+
+
+def limiter_stats() -> dict:
+    """Stats for every limiter created in this process, by name."""
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {limiter.name: limiter.stats() for limiter in limiters}
@@ -0,0 +1,63 @@
+import asyncio
+from typing import AsyncGenerator
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+
+from .rate_limit import get_limiter, overload_code
+
+
+class RateLimitedLlm(BaseLlm):
+    """Sends every call to ``llm`` through the process-wide limiter for its model.
+
+    Quota and overload errors raised before the first response is yielded
+    are retried with jittered exponential backoff, and the model's AIMD
+    concurrency limit adapts to them. Only the limiter's name is stored, so
+    agents stay picklable for Agent Engine deployment.
+    """
+
+    llm: BaseLlm
+
+    @property
+    def limiter(self):
+        return get_limiter(self.model)
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        limiter = self.limiter
+        for attempt in range(limiter.max_retries + 1):
+            await limiter.acquire_async()
+            yielded = False
+            try:
+                async for response in self.llm.generate_content_async(llm_request, stream):
+                    yielded = True
+                    yield response
+            except Exception as e:
+                if yielded:
+                    # A partly streamed response cannot be retried transparently
+                    limiter.release(succeeded=False, overloaded=overload_code(e) is not None)
+                    raise
+                delay = limiter.record_failure(e, attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                # Cancelled, or the caller stopped reading
+                limiter.release(succeeded=False)
+                raise
+            limiter.release()
+            return
+
+
+def rate_limit(agent: BaseAgent) -> BaseAgent:
+    """Routes the model calls of every LlmAgent in the tree through a per-model limiter."""
+    if isinstance(agent, LlmAgent) and not isinstance(agent.model, RateLimitedLlm):
+        llm = agent.canonical_model
+        agent.model = RateLimitedLlm(model=llm.model, llm=llm)
+    for sub_agent in agent.sub_agents:
+        rate_limit(sub_agent)
+    return agent
@@ -0,0 +1,114 @@
+from typing import Iterable, Optional
+
+import numpy as np
+
+from .weights import COURSE_CLUSTERS, EVALUATION_ELEMENTS, PASS_MARK, RUBRIC_WEIGHTS
+
+
+def weight_matrix(weights: dict = RUBRIC_WEIGHTS) -> np.ndarray:
+    """Returns the category x element weight matrix in COURSE_CLUSTERS/EVALUATION_ELEMENTS order."""
+    return np.array(
+        [[weights[category][element] for element in EVALUATION_ELEMENTS] for category in COURSE_CLUSTERS],
+        dtype=np.float64,
+    )
+
+
+class GradeTable:
+    """Stored evaluations as arrays, ready to be re-scored in bulk.
+
+    ``grades`` is an N x element matrix, ``categories`` the row index of
+    each course's category in COURSE_CLUSTERS, and ``scores``/``passed``
+    the stored outcome each course is compared against.
+    """
+
+    def __init__(self, ids: list, categories: np.ndarray, grades: np.ndarray,
+                 scores: np.ndarray, passed: np.ndarray):
+        self.ids = ids
+        self.categories = categories
+        self.grades = grades
+        self.scores = scores
+        self.passed = passed
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def from_evaluations(cls, records: Iterable[tuple]) -> "GradeTable":
+        """Builds a table from (id, evaluation) pairs, where each evaluation
+        is the score calculator's output. Evaluations without a category or
+        a full set of grades are skipped."""
+        category_index = {category: i for i, category in enumerate(COURSE_CLUSTERS)}
+        ids, categories, grades, scores, passed = [], [], [], [], []
+        for record_id, evaluation in records:
+            individual = evaluation.get("individual_scores") or {}
+            if evaluation.get("category") not in category_index or any(e not in individual for e in EVALUATION_ELEMENTS):
+                continue
+            ids.append(record_id)
+            categories.append(category_index[evaluation["category"]])
+            grades.append([individual[e] for e in EVALUATION_ELEMENTS])
+            scores.append(evaluation.get("final_score", np.nan))
+            passed.append(bool(evaluation.get("passed", False)))
+        return cls(
+            ids,
+            np.array(categories, dtype=np.intp),
+            np.array(grades, dtype=np.float64).reshape(len(ids), len(EVALUATION_ELEMENTS)),
+            np.array(scores, dtype=np.float64),
+            np.array(passed, dtype=bool),
+        )
+
+
+def rescore(table: GradeTable, weights: dict = RUBRIC_WEIGHTS, pass_mark: float = PASS_MARK) -> tuple:
+    """Re-scores every row of the table under new weights and pass mark.
+
+    Returns (scores, passed) arrays, computed the same way as
+    calculate_score: the grade x weight sum divided by 100, rounded to two
+    decimals.
+    """
+    # (N x E) @ (E x C) scores every course under every category; keep each row's own
+    all_categories = table.grades @ weight_matrix(weights).T
+    raw = np.take_along_axis(all_categories, table.categories[:, None], axis=1)[:, 0]
+    scores = np.round(raw / 100, 2)
+    return scores, scores >= pass_mark
+
+
+def rescore_report(table: GradeTable, weights: dict = RUBRIC_WEIGHTS, pass_mark: float = PASS_MARK,
+                   max_listed: Optional[int] = 100) -> dict:
+    """Re-scores the table and summarizes what changed against the stored results."""
+    scores, passed = rescore(table, weights, pass_mark)
+    deltas = scores - table.scores
+    newly_failed = table.passed & ~passed
+    newly_passed = ~table.passed & passed
+
+    def listed(mask):
+        rows = np.flatnonzero(mask)[:max_listed]
+        return [
+            {"id": table.ids[i], "category": COURSE_CLUSTERS[table.categories[i]],
+             "old_score": float(table.scores[i]), "new_score": float(scores[i])}
+            for i in rows
+        ]
+
+    by_category = {}
+    for i, category in enumerate(COURSE_CLUSTERS):
+        rows = table.categories == i
+        if rows.any():
+            by_category[category] = {
+                "courses": int(rows.sum()),
+                "mean_delta": round(float(np.nanmean(deltas[rows])), 2),
+                "passed_before": int(table.passed[rows].sum()),
+                "passed_after": int(passed[rows].sum()),
+            }
+
+    changed = np.abs(deltas) >= 0.005
+    return {
+        "courses": len(table),
+        "pass_mark": pass_mark,
+        "changed_scores": int(changed.sum()),
+        "mean_delta": round(float(np.nanmean(deltas)), 2) if len(table) else 0.0,
+        "max_increase": round(float(np.nanmax(deltas)), 2) if len(table) else 0.0,
+        "max_decrease": round(float(np.nanmin(deltas)), 2) if len(table) else 0.0,
+        "newly_failed": int(newly_failed.sum()),
+        "newly_passed": int(newly_passed.sum()),
+        "by_category": by_category,
+        "newly_failed_courses": listed(newly_failed),
+        "newly_passed_courses": listed(newly_passed),
+    }
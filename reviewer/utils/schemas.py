@@ -0,0 +1,61 @@
+from functools import lru_cache
+from typing import Annotated, Dict, List, Literal
+
+from pydantic import BaseModel, Field, create_model
+
+from .weights import COURSE_CLUSTERS, EVALUATION_ELEMENTS
+
+Grade = Annotated[int, Field(ge=0, le=100)]
+
+
+@lru_cache(maxsize=None)
+def _grades_schema(elements: tuple) -> type[BaseModel]:
+    name = "CourseGrades" if elements == tuple(EVALUATION_ELEMENTS) else f"CourseGrades{len(elements)}"
+    # Field names are the element names themselves, so validated output dumps
+    # back to the {element: score} mapping the rest of the pipeline reads
+    return create_model(name, **{element: (Grade, ...) for element in elements})
+
+
+def grades_schema(elements=EVALUATION_ELEMENTS) -> type[BaseModel]:
+    """Returns the output schema for grading ``elements``: one 0-100 integer per element."""
+    return _grades_schema(tuple(elements))
+
+
+CourseGrades = grades_schema()
+
+
+class CourseFeedback(BaseModel):
+    """Prose feedback written by the summary agent."""
+
+    summary: str = Field(min_length=1)
+    recommendation: str = Field(min_length=1)
+
+
+class ElementContribution(BaseModel):
+    element: Literal[tuple(EVALUATION_ELEMENTS)]
+    grade: float
+    weight: float
+    contribution: float
+
+
+class CourseEvaluation(BaseModel):
+    """The score calculator's result, stored under ``course_evaluation``."""
+
+    final_score: float
+    passed: bool
+    individual_scores: Dict[str, float]
+    category: Literal[tuple(COURSE_CLUSTERS)]
+    category_weights: Dict[str, float]
+    pass_mark: float
+    calculation_breakdown: List[ElementContribution] = Field(
+        min_length=len(EVALUATION_ELEMENTS), max_length=len(EVALUATION_ELEMENTS)
+    )
+    summary: str
+    recommendation: str
+
+
+class CourseCategoryAndGrades(BaseModel):
+    """Output of the fused mode's single call: the category and all 10 grades."""
+
+    category: Literal[tuple(COURSE_CLUSTERS)]
+    grades: CourseGrades
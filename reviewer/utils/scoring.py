@@ -0,0 +1,124 @@
+import json
+import re
+
+from .weights import COURSE_CLUSTERS, EVALUATION_ELEMENTS, PASS_MARK, RUBRIC_WEIGHTS
+
+
+class GradeValidationError(ValueError):
+    """Raised when grader output cannot be scored against the rubric."""
+
+
+def strip_fences(text: str) -> str:
+    """Removes markdown code fences the model sometimes wraps JSON in."""
+    text = re.sub(r'^\s*```(?:json)?\s*', '', text)
+    return re.sub(r'\s*```\s*$', '', text)
+
+
+def resolve_category(raw_category) -> str:
+    """Maps the categorizer output onto one of COURSE_CLUSTERS."""
+    if not isinstance(raw_category, str):
+        raise GradeValidationError(f"Course category must be a string, got {type(raw_category).__name__}")
+
+    cleaned = raw_category.strip().strip('*"\'`.').strip()
+    for cluster in COURSE_CLUSTERS:
+        if cleaned.lower() == cluster.lower():
+            return cluster
+
+    # The model occasionally adds a label such as "Category: ..."
+    matches = [cluster for cluster in COURSE_CLUSTERS if cluster.lower() in cleaned.lower()]
+    if len(matches) == 1:
+        return matches[0]
+
+    raise GradeValidationError(f"Unknown course category: {raw_category!r}")
+
+
+def parse_grades(raw_grades, elements=EVALUATION_ELEMENTS) -> dict:
+    """Parses grader output into a validated {element: score} mapping.
+
+    Accepts either the raw JSON text produced by the grader (optionally
+    wrapped in markdown fences) or an already decoded dict. Pass
+    ``elements`` to validate output that covers only part of the rubric.
+    """
+    if isinstance(raw_grades, str):
+        try:
+            raw_grades = json.loads(strip_fences(raw_grades))
+        except json.JSONDecodeError as e:
+            raise GradeValidationError(f"Course grades are not valid JSON: {e}") from e
+
+    if not isinstance(raw_grades, dict):
+        raise GradeValidationError("Course grades must be a JSON object")
+
+    by_name = {str(key).strip().lower(): value for key, value in raw_grades.items()}
+    unknown = set(by_name) - {element.lower() for element in elements}
+    if unknown:
+        raise GradeValidationError(f"Unknown evaluation elements: {', '.join(sorted(unknown))}")
+
+    grades = {}
+    for element in elements:
+        if element.lower() not in by_name:
+            raise GradeValidationError(f"Missing grade for '{element}'")
+        value = by_name[element.lower()]
+        if isinstance(value, str):
+            try:
+                value = float(value.strip().rstrip('%'))
+            except ValueError:
+                raise GradeValidationError(f"Grade for '{element}' is not a number: {value!r}") from None
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise GradeValidationError(f"Grade for '{element}' is not a number: {value!r}")
+        if not 0 <= value <= 100:
+            raise GradeValidationError(f"Grade for '{element}' is out of range (0-100): {value}")
+        grades[element] = int(value) if float(value).is_integer() else value
+
+    return grades
+
+
+def calculate_score(category: str, grades: dict, pass_mark: float = PASS_MARK) -> dict:
+    """Calculates the weighted final score for a set of validated grades.
+
+    Returns the same structure the score calculator agent has always
+    produced, minus the prose summary and recommendation.
+    """
+    weights = RUBRIC_WEIGHTS[category]
+
+    breakdown = []
+    for element in EVALUATION_ELEMENTS:
+        breakdown.append({
+            "element": element,
+            "grade": grades[element],
+            "weight": weights[element],
+            "contribution": round(grades[element] * weights[element] / 100, 2),
+        })
+
+    # Sum in grade x weight units so the result does not accumulate float error
+    final_score = round(sum(grades[e] * weights[e] for e in EVALUATION_ELEMENTS) / 100, 2)
+
+    return {
+        "final_score": final_score,
+        "passed": final_score >= pass_mark,
+        "individual_scores": dict(grades),
+        "category": category,
+        "category_weights": dict(weights),
+        "pass_mark": pass_mark,
+        "calculation_breakdown": breakdown,
+    }
+
+
+def default_feedback(evaluation: dict) -> dict:
+    """Builds a rule-based summary and recommendation for an evaluation."""
+    breakdown = evaluation["calculation_breakdown"]
+    strongest = max(breakdown, key=lambda item: item["grade"])
+    # Weakest by lost weighted points, so high-weight gaps come first
+    gaps = sorted(breakdown, key=lambda item: (100 - item["grade"]) * item["weight"], reverse=True)[:2]
+
+    outcome = "meets" if evaluation["passed"] else "does not meet"
+    summary = (
+        f"The course scored {evaluation['final_score']} and {outcome} the pass mark of "
+        f"{evaluation['pass_mark']} for {evaluation['category']}. "
+        f"Its strongest element is {strongest['element']} ({strongest['grade']}), while "
+        f"{gaps[0]['element']} ({gaps[0]['grade']}) costs the most weighted points."
+    )
+    recommendation = (
+        f"Prioritise improving {gaps[0]['element']} and {gaps[1]['element']}, which together "
+        f"carry {gaps[0]['weight'] + gaps[1]['weight']}% of the weight for this category."
+    )
+    return {"summary": summary, "recommendation": recommendation}
@@ -0,0 +1,70 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from .fingerprint import content_hash
+
+
+class SectionEvidenceCache:
+    """LRU of per-section rubric evidence, keyed by the section's exact text.
+
+    Entries live in a ``scope`` (the evidence prompt, model and course
+    category they were extracted under) and are keyed by the normalized
+    content hash of the section. Evidence is only ever reused for the same
+    normalized text: even a one-sentence edit can change what a section
+    evidences, so a changed section is always extracted again. Thread-safe.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # (scope, hash) -> evidence
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def get(self, scope: str, text: str) -> Optional[dict]:
+        """Returns the cached evidence for the section, or None when it is new or changed."""
+        key = (scope, content_hash(text))
+        with self._lock:
+            evidence = self._entries.get(key)
+            if evidence is None:
+                self._counters['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters['hits'] += 1
+            return evidence
+
+    def set(self, scope: str, text: str, evidence: dict) -> None:
+        key = (scope, content_hash(text))
+        with self._lock:
+            self._entries[key] = evidence
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters['evictions'] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._counters)
+            stats['entries'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        return stats
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_section_cache() -> SectionEvidenceCache:
+    """Returns the process-wide section evidence cache, configured from the environment on first use.
+
+    REVIEWER_SECTION_CACHE_ENTRIES bounds its size.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SectionEvidenceCache(
+                max_entries=int(os.getenv('REVIEWER_SECTION_CACHE_ENTRIES', '4096')),
+            )
+        return _cache
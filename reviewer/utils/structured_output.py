@@ -0,0 +1,104 @@
+import logging
+import os
+from typing import AsyncGenerator, Optional
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.adk.models.llm_request import LlmRequest
+from google.genai import types
+from pydantic import ValidationError
+
+from .metrics import PARSE_FAILURES_KEY
+
+logger = logging.getLogger(__name__)
+
+# Attempts per stage when the model output does not match its schema
+MAX_ATTEMPTS = 1 + int(os.getenv('REVIEWER_OUTPUT_RETRIES', '1'))
+
+
+def _retry_hint(error: str, then=None):
+    """Returns a before_model_callback that tells the model why its last answer was rejected,
+    after running ``then`` (the agent's own callback, if any)."""
+    def callback(callback_context: CallbackContext, llm_request: LlmRequest):
+        if then is not None:
+            result = then(callback_context=callback_context, llm_request=llm_request)
+            if result is not None:
+                return result
+        llm_request.contents.append(types.Content(role='user', parts=[types.Part(text=(
+            f"Your previous response was rejected because it did not match the required JSON schema:\n{error}\n"
+            "Respond again with only a JSON object that matches the schema."
+        ))]))
+    return callback
+
+
+class StructuredOutputAgent(BaseAgent):
+    """Runs an LlmAgent with an ``output_schema`` and retries it when the output is invalid.
+
+    ADK asks the model for JSON matching ``agent.output_schema`` and
+    validates the response before saving it under ``agent.output_key``. A
+    response that fails validation is dropped and the stage is re-run, up to
+    ``max_attempts`` times, with the validation error added to the prompt.
+    Only this stage is repeated, not the pipeline. If every attempt fails,
+    nothing is saved under the output key and the stage is reported in the
+    parse-failure metric.
+    """
+
+    agent: LlmAgent
+    max_attempts: int = MAX_ATTEMPTS
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('sub_agents', [kwargs['agent']])
+        super().__init__(**kwargs)
+
+    @property
+    def output_key(self) -> Optional[str]:
+        return self.agent.output_key
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        agent = self.agent
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                # The invalid response is rejected before its event is yielded,
+                # so a failed attempt leaves nothing behind in the session
+                async for event in agent.run_async(ctx):
+                    yield event
+                return
+            except ValidationError as e:
+                error = str(e)
+                logger.warning(f"{self.agent.name} output did not match its schema (attempt {attempt}): {error}")
+                agent = self.agent.model_copy(update={
+                    'before_model_callback': _retry_hint(error, self.agent.before_model_callback),
+                })
+
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(state_delta={PARSE_FAILURES_KEY: [self.agent.name]}),
+        )
+
+
+def with_retry(agent: LlmAgent, max_attempts: int = MAX_ATTEMPTS) -> StructuredOutputAgent:
+    """Wraps an agent that has an ``output_schema`` in a bounded per-stage retry."""
+    if agent.output_schema is None:
+        raise ValueError(f"{agent.name} has no output_schema to validate against")
+    return StructuredOutputAgent(
+        name=f'{agent.name}_structured',
+        description=agent.description,
+        agent=agent,
+        max_attempts=max_attempts,
+    )
+
+
+def structured_llm_agent(max_attempts: int = MAX_ATTEMPTS, **kwargs) -> StructuredOutputAgent:
+    """Builds an LlmAgent from ``kwargs``, which must include an ``output_schema``, and wraps it with with_retry.
+
+    An agent that answers with structured output cannot hand off to
+    another agent, so agent transfer is disallowed in both directions.
+    """
+    return with_retry(
+        LlmAgent(disallow_transfer_to_parent=True, disallow_transfer_to_peers=True, **kwargs),
+        max_attempts,
+    )
@@ -35,4 +35,9 @@ RUBRIC_WEIGHTS = {
 
 COURSE_CLUSTERS = list(RUBRIC_WEIGHTS.keys())
 EVALUATION_ELEMENTS = list(RUBRIC_WEIGHTS["Blockchain Technology and Development"].keys())
-PASS_MARK = 80  # Default, can be overridden
\ No newline at end of file
+PASS_MARK = 80  # Default, can be overridden
+MODEL_NAME = "gemini-2.0-flash"  # Model used by every LLM stage
+# Categorize then grade in two model calls, or in one fused call; a session's
+# "evaluation_mode" state value picks one per request
+EVALUATION_MODES = ("staged", "fused")
+EVALUATION_MODE_KEY = "evaluation_mode"
@@ -0,0 +1,21 @@
+import os
+import sys
+import time
+
+import pytest
+
+# The web UI's modules (server, jobs, cache, ...) are imported as top-level modules, as server.py does
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'web-ui'))
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def wait_for():
+    """Polls a condition until it holds, failing the test after a timeout"""
+    return _wait_for
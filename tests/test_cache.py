@@ -0,0 +1,69 @@
+import os
+import time
+
+from cache import EvaluationCache
+
+RESULT = {'final_score': 81.5, 'passed': True}
+
+
+def test_entries_expire_after_ttl(tmp_path):
+    cache = EvaluationCache(directory=str(tmp_path), ttl=0.1)
+    cache.set('key', RESULT)
+    assert cache.get('key') == RESULT
+
+    time.sleep(0.15)
+
+    assert cache.get('key') is None
+    assert not os.path.exists(tmp_path / 'key.json')
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = EvaluationCache(max_entries=2)
+    cache.set('a', RESULT)
+    cache.set('b', RESULT)
+    cache.get('a')
+    cache.set('c', RESULT)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == cache.get('c') == RESULT
+    assert cache.stats()['evictions'] == 1
+
+
+def test_disk_tier_evicts_oldest_files_over_budget(tmp_path):
+    # 53 bytes per file; four fit in the budget, a fifth does not
+    cache = EvaluationCache(directory=str(tmp_path), max_disk_bytes=250)
+    for i, key in enumerate(['a', 'b', 'c', 'd']):
+        cache.set(key, {'final_score': i, 'padding': 'x' * 20})
+        # Distinct mtimes, so eviction order does not depend on timer resolution
+        os.utime(tmp_path / f'{key}.json', (time.time(), time.time() - 100 + i))
+
+    cache.set('e', {'final_score': 4, 'padding': 'x' * 20})
+
+    # Trimmed to 90% of the budget, oldest first
+    assert sorted(os.listdir(tmp_path)) == ['b.json', 'c.json', 'd.json', 'e.json']
+    assert cache.stats()['disk_bytes'] == 4 * 53
+
+
+def test_disk_hit_after_memory_miss(tmp_path):
+    cache = EvaluationCache(max_entries=1, directory=str(tmp_path))
+    cache.set('a', RESULT)
+    cache.set('b', RESULT)  # pushes 'a' out of memory
+
+    assert cache.get('a') == RESULT
+    stats = cache.stats()
+    assert (stats['disk_hits'], stats['memory_hits']) == (1, 0)
+    # Promoted back into memory
+    assert cache.get('a') == RESULT
+    assert cache.stats()['memory_hits'] == 1
+
+
+def test_promoted_entry_keeps_its_remaining_lifetime(tmp_path):
+    EvaluationCache(directory=str(tmp_path), ttl=0.3).set('key', RESULT)
+    time.sleep(0.2)
+    # A fresh process: nothing in memory, the file has 0.1s left
+    cache = EvaluationCache(directory=str(tmp_path), ttl=0.3)
+    assert cache.get('key') == RESULT
+
+    time.sleep(0.15)
+
+    assert cache.get('key') is None
@@ -0,0 +1,87 @@
+import threading
+
+import pytest
+
+from jobs import JobCancelledError, JobQueue, QueueFullError
+
+
+def test_full_queue_rejects_new_jobs():
+    jobs = JobQueue(lambda job: None, workers=0, max_queue=2)
+    jobs.submit({'n': 1})
+    jobs.submit({'n': 2})
+
+    with pytest.raises(QueueFullError):
+        jobs.submit({'n': 3})
+    assert jobs.stats()['queue_depth'] == 2
+
+
+def test_cancelling_a_queued_job_frees_its_place():
+    jobs = JobQueue(lambda job: None, workers=0, max_queue=1)
+    job = jobs.submit({'n': 1})
+
+    assert jobs.cancel(job.id)
+    assert job.status == 'cancelled'
+    assert jobs.submit({'n': 2}).status == 'queued'
+
+
+def test_cancelled_queued_job_is_skipped_by_the_workers(wait_for):
+    release = threading.Event()
+    ran = []
+
+    def work(job):
+        release.wait(5)
+        ran.append(job.payload['n'])
+
+    jobs = JobQueue(work, workers=1, max_queue=2)
+    first = jobs.submit({'n': 1})
+    wait_for(lambda: first.status == 'running')
+    second = jobs.submit({'n': 2})
+    jobs.cancel(second.id)
+    release.set()
+
+    assert jobs.drain(timeout=5)
+    assert ran == [1]
+    assert (first.status, second.status) == ('succeeded', 'cancelled')
+
+
+def test_cancelling_a_running_job_stops_it(wait_for):
+    def work(job):
+        if job.cancel_event.wait(5):
+            raise JobCancelledError()
+        return 'done'
+
+    jobs = JobQueue(work, workers=1)
+    job = jobs.submit({})
+    wait_for(lambda: job.status == 'running')
+
+    assert jobs.cancel(job.id)
+    wait_for(lambda: job.finished)
+    assert job.status == 'cancelled'
+    assert not jobs.cancel(job.id)
+
+
+def test_drain_waits_for_running_jobs_and_refuses_new_ones(wait_for):
+    release = threading.Event()
+    jobs = JobQueue(lambda job: release.wait(5) and 'done', workers=1)
+    job = jobs.submit({})
+    wait_for(lambda: job.status == 'running')
+
+    assert not jobs.drain(timeout=0.05)
+    assert jobs.draining
+    with pytest.raises(QueueFullError):
+        jobs.submit({})
+
+    release.set()
+    assert jobs.drain(timeout=5)
+    assert (job.status, job.result) == ('succeeded', 'done')
+
+
+def test_failed_job_records_its_error():
+    def work(job):
+        raise RuntimeError('workflow failed')
+
+    jobs = JobQueue(work, workers=1)
+    job = jobs.submit({})
+
+    assert jobs.drain(timeout=5)
+    assert (job.status, job.error) == ('failed', 'workflow failed')
@@ -0,0 +1,21 @@
+from reviewer.course_categorizer.local import LocalCategorizer
+
+
+def test_off_topic_text_has_no_confidence():
+    classifier = LocalCategorizer.from_keywords()
+
+    _, confidence = classifier.predict("Cooking pasta. Good design of kitchens.")
+
+    assert confidence == 0.0
+
+
+def test_on_topic_course_takes_the_fast_path():
+    classifier = LocalCategorizer.from_keywords()
+
+    category, confidence = classifier.predict(
+        "Write Solidity smart contracts for the EVM, test them with Hardhat and tune gas optimization "
+        "before deploying to Ethereum."
+    )
+
+    assert category == "Blockchain Technology and Development"
+    assert confidence >= 0.5
@@ -0,0 +1,69 @@
+import asyncio
+
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from benchmarks.fake_model import FakeGemini, run_agent
+from reviewer.course_grader.map_reduce import build_map_reduce_grader
+from reviewer.score_calculator.agent import ScoreCalculatorAgent
+from reviewer.utils.metrics import LLM_METRICS_KEY, instrument
+
+COURSE = "\n\n".join(
+    f"Module {m}: Smart contracts\n\n"
+    + " ".join(f"Lesson {m}.{i} covers writing and testing contract {i} in Solidity." for i in range(40))
+    for m in range(1, 5)
+)
+
+
+def test_course_is_not_graded_when_every_chunk_fails():
+    model = FakeGemini(base_latency=0.0, output_token_latency=0.0, failure_rate=1.0)
+    agent = build_map_reduce_grader(chunk_tokens=400, model=model)
+
+    state = asyncio.run(run_agent(agent, COURSE, state={
+        "course_category": "Blockchain Technology and Development",
+        "course_grades": {"Learning Objectives": 90},
+    }))
+
+    assert state["course_grader_chunks"] > 1
+    assert state.get("course_grades") is None
+    assert len(state["course_grader_errors"]) == state["course_grader_chunks"] + 1
+    assert "the course was not graded" in state["course_grader_errors"][-1]
+    # Only the evidence extractors were called, never the reduce grader
+    assert model.calls == state["course_grader_chunks"]
+
+
+def test_score_calculator_reports_the_ungraded_course():
+    state = asyncio.run(run_agent(ScoreCalculatorAgent(name="score_calculator"), "", state={
+        "course_category": "Blockchain Technology and Development",
+        "course_grades": None,
+        "course_grader_errors": ["Only 0 of 4 sections could be read; the course was not graded"],
+    }))
+
+    assert "the course was not graded" in state["course_evaluation"]["error"]
+
+
+def test_evidence_call_metrics_reach_the_event_stream():
+    model = FakeGemini(base_latency=0.0, output_token_latency=0.0)
+    agent = instrument(build_map_reduce_grader(chunk_tokens=400, model=model))
+    runner = InMemoryRunner(agent, app_name='test')
+    session = runner.session_service.create_session(app_name='test', user_id='test', state={
+        "course_category": "Blockchain Technology and Development",
+    })
+
+    async def collect():
+        message = types.Content(role='user', parts=[types.Part(text=COURSE)])
+        return [event async for event in runner.run_async(user_id='test', session_id=session.id, new_message=message)]
+
+    metrics = [
+        event.actions.state_delta[LLM_METRICS_KEY]
+        for event in asyncio.run(collect())
+        if LLM_METRICS_KEY in event.actions.state_delta
+    ]
+    evidence = [m for m in metrics if m["agent"].startswith("course_evidence_")]
+    chunks = runner.session_service.get_session(
+        app_name='test', user_id='test', session_id=session.id
+    ).state["course_grader_chunks"]
+
+    assert len(evidence) == chunks > 1
+    assert sum(m["input_tokens"] for m in evidence) == model.input_tokens["evidence"]
+    assert [m["agent"] for m in metrics if not m["agent"].startswith("course_evidence_")] == ["course_grader_reduce"]
@@ -0,0 +1,37 @@
+import asyncio
+import json
+
+from benchmarks.fake_model import FakeGemini, run_agent
+from reviewer.course_grader.parallel import build_parallel_grader
+from reviewer.utils.weights import EVALUATION_ELEMENTS
+
+
+def test_branch_without_output_does_not_reuse_an_earlier_runs_grades():
+    # Every grading response misses a key, so every branch exhausts its retries
+    model = FakeGemini(base_latency=0.0, output_token_latency=0.0, malformed_rate=1.0)
+    agent = build_parallel_grader(width=2, model=model)
+    stale = {element: 99 for element in EVALUATION_ELEMENTS}
+
+    state = asyncio.run(run_agent(agent, "A course on Solidity.", state={
+        "course_category": "Blockchain Technology and Development",
+        "course_grades_group_1": json.dumps(stale),
+        "course_grades_group_2": json.dumps(stale),
+    }))
+
+    assert json.loads(state["course_grades"]) == {}
+    assert state["course_grader_errors"] == [
+        "course_grader_group_1_structured: no valid output",
+        "course_grader_group_2_structured: no valid output",
+    ]
+
+
+def test_branch_outputs_are_merged():
+    model = FakeGemini(base_latency=0.0, output_token_latency=0.0)
+    agent = build_parallel_grader(width=2, model=model)
+
+    state = asyncio.run(run_agent(agent, "A course on Solidity.", state={
+        "course_category": "Blockchain Technology and Development",
+    }))
+
+    assert list(json.loads(state["course_grades"])) == list(EVALUATION_ELEMENTS)
+    assert "course_grader_errors" not in state
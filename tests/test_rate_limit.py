@@ -0,0 +1,99 @@
+import asyncio
+import time
+
+import pytest
+
+from reviewer.utils.rate_limit import AdaptiveLimiter, overload_code, retry_after
+
+
+class QuotaError(Exception):
+    code = 429
+
+    def __init__(self, retry_after=None):
+        super().__init__('429 RESOURCE_EXHAUSTED')
+        self.retry_after = retry_after
+
+
+def test_limit_halves_on_429():
+    limiter = AdaptiveLimiter(initial_concurrency=8, cooldown=0.0)
+    limiter.acquire()
+
+    limiter.release(succeeded=False, overloaded=True)
+
+    stats = limiter.stats()
+    assert (stats['limit'], stats['decreases'], stats['slow_start']) == (4, 1, False)
+
+
+def test_limit_decreases_once_per_cooldown():
+    limiter = AdaptiveLimiter(initial_concurrency=8, cooldown=60.0)
+    for _ in range(3):
+        limiter.acquire()
+    for _ in range(3):
+        limiter.release(succeeded=False, overloaded=True)
+
+    assert limiter.stats()['limit'] == 4
+
+
+def test_limit_grows_on_success_up_to_max():
+    limiter = AdaptiveLimiter(initial_concurrency=2, max_concurrency=3)
+    for _ in range(5):
+        limiter.acquire()
+        limiter.release()
+
+    assert limiter.stats()['limit'] == 3
+
+
+def test_retry_after_pauses_every_caller():
+    limiter = AdaptiveLimiter(initial_concurrency=4)
+    limiter.acquire()
+
+    assert limiter.record_failure(QuotaError(retry_after=0.5), attempt=0) >= 0.5
+    assert limiter.try_acquire() > 0.4
+
+
+def test_call_retries_quota_errors_and_honours_retry_after():
+    limiter = AdaptiveLimiter(base_delay=0.0, cooldown=0.0)
+    attempts = []
+
+    def fn():
+        attempts.append(time.monotonic())
+        if len(attempts) == 1:
+            raise QuotaError(retry_after=0.2)
+        return 'ok'
+
+    assert limiter.call(fn) == 'ok'
+    assert attempts[1] - attempts[0] >= 0.2
+    assert limiter.stats()['retries'] == 1
+
+
+def test_call_gives_up_after_max_retries():
+    limiter = AdaptiveLimiter(max_retries=2, base_delay=0.0)
+
+    def fn():
+        raise QuotaError()
+
+    with pytest.raises(QuotaError):
+        limiter.call(fn)
+    stats = limiter.stats()
+    assert (stats['retries'], stats['gave_up'], stats['in_flight']) == (2, 1, 0)
+
+
+def test_other_errors_are_not_retried():
+    limiter = AdaptiveLimiter()
+    calls = []
+
+    async def fn():
+        calls.append(1)
+        raise ValueError('bad request')
+
+    with pytest.raises(ValueError):
+        asyncio.run(limiter.call_async(fn))
+    assert calls == [1]
+    assert limiter.stats()['failed'] == 1
+
+
+def test_overload_detection():
+    assert overload_code(QuotaError()) == 429
+    assert overload_code(RuntimeError('503 UNAVAILABLE')) == 429
+    assert overload_code(ValueError('invalid argument')) is None
+    assert retry_after(QuotaError(retry_after='2')) == 2.0
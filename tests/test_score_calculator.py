@@ -0,0 +1,33 @@
+import asyncio
+import json
+
+from google.adk.agents import LlmAgent
+
+from benchmarks.fake_model import FakeGemini, run_agent
+from reviewer.score_calculator.agent import ScoreCalculatorAgent, _score_summary_instruction
+from reviewer.utils.weights import EVALUATION_ELEMENTS
+
+
+def test_summary_prompt_uses_the_calculators_pass_mark():
+    prompts = []
+
+    def capture(callback_context, llm_request):
+        prompts.append(str(llm_request.config.system_instruction))
+
+    summary_agent = LlmAgent(
+        model=FakeGemini(base_latency=0.0, output_token_latency=0.0),
+        name='score_summarizer',
+        instruction=_score_summary_instruction,
+        before_model_callback=capture,
+        output_key='course_summary',
+    )
+    agent = ScoreCalculatorAgent(name='score_calculator', summary_agent=summary_agent, pass_mark=95.0)
+
+    state = asyncio.run(run_agent(agent, '', state={
+        'course_category': 'Blockchain Technology and Development',
+        'course_grades': json.dumps({element: 80 for element in EVALUATION_ELEMENTS}),
+    }))
+
+    assert state['course_evaluation']['pass_mark'] == 95.0
+    assert not state['course_evaluation']['passed']
+    assert 'against a pass mark of 95.0; the course did not pass' in prompts[0]
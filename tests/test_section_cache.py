@@ -0,0 +1,34 @@
+from reviewer.utils.section_cache import SectionEvidenceCache
+
+SECTION = "Module 1: Solidity\n\n" + " ".join(
+    f"In lesson {i} learners write, test and deploy contract number {i} in the weekly lab." for i in range(200)
+)
+
+
+def test_unchanged_section_reuses_evidence():
+    cache = SectionEvidenceCache()
+    cache.set("scope", SECTION, {"Learning Objectives": ["Deploy a contract."]})
+
+    assert cache.get("scope", SECTION + "\n") == {"Learning Objectives": ["Deploy a contract."]}
+    assert cache.stats()["hits"] == 1
+
+
+def test_edited_section_is_extracted_again():
+    cache = SectionEvidenceCache()
+    cache.set("scope", SECTION, {"Learning Objectives": ["Deploy a contract."]})
+
+    assert cache.get("scope", SECTION + " A new capstone project replaces the final exam.") is None
+    assert cache.get("other scope", SECTION) is None
+    assert cache.stats()["misses"] == 2
+
+
+def test_least_recently_used_section_is_evicted():
+    cache = SectionEvidenceCache(max_entries=2)
+    for name in ("a", "b"):
+        cache.set("scope", name, {"Assessment": [name]})
+    cache.get("scope", "a")
+    cache.set("scope", "c", {"Assessment": ["c"]})
+
+    assert cache.get("scope", "b") is None
+    assert cache.get("scope", "a") == {"Assessment": ["a"]}
+    assert cache.stats()["evictions"] == 1
@@ -0,0 +1,110 @@
+import itertools
+import threading
+import time
+
+import pytest
+
+from deployment.session_pool import SessionPool
+
+
+class FakeClient:
+    def __init__(self, failing=False):
+        self.failing = failing
+        self.create_calls = 0
+        self.deleted = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def create_session(self, user_id, state=None):
+        with self._lock:
+            self.create_calls += 1
+            if self.failing:
+                raise RuntimeError('503 UNAVAILABLE')
+            return {'id': f's{next(self._ids)}'}
+
+    def delete_session(self, user_id, session_id):
+        with self._lock:
+            self.deleted.append(session_id)
+
+
+@pytest.fixture
+def pools():
+    """Builds SessionPools and closes them after the test"""
+    created = []
+
+    def build(*args, **kwargs):
+        created.append(SessionPool(*args, **kwargs))
+        return created[-1]
+
+    yield build
+    for pool in created:
+        pool.close()
+
+
+def test_session_is_retired_after_max_uses(pools, wait_for):
+    client = FakeClient()
+    pool = pools(client, 'user', size=1, max_uses=2)
+    assert pool.wait_until_ready(timeout=5)
+
+    with pool.session() as first:
+        pass
+    with pool.session() as second:
+        pass
+    with pool.session() as third:
+        pass
+
+    assert first == second != third
+    wait_for(lambda: first in client.deleted)
+    assert pool.stats()['retired'] >= 1
+
+
+def test_session_is_retired_after_max_age(pools, wait_for):
+    client = FakeClient()
+    pool = pools(client, 'user', size=1, max_uses=10, max_age=0.2)
+    assert pool.wait_until_ready(timeout=5)
+    with pool.session() as first:
+        pass
+
+    time.sleep(0.25)
+    with pool.session() as second:
+        pass
+
+    assert second != first
+    wait_for(lambda: first in client.deleted)
+
+
+def test_unhealthy_session_is_retired(pools, wait_for):
+    client = FakeClient()
+    pool = pools(client, 'user', size=1, max_uses=10)
+    assert pool.wait_until_ready(timeout=5)
+
+    with pytest.raises(RuntimeError):
+        with pool.session() as broken:
+            raise RuntimeError('stream failed')
+
+    wait_for(lambda: broken in client.deleted)
+    assert broken not in pool.session_ids()
+
+
+def test_failed_refill_backs_off(pools, wait_for):
+    client = FakeClient(failing=True)
+    pool = pools(client, 'user', size=2)
+    wait_for(lambda: pool.stats()['create_errors'] >= 1)
+
+    # The first failures push the next attempt a second out instead of retrying at once
+    time.sleep(0.3)
+    assert client.create_calls <= 2
+    client.failing = False
+
+    assert pool.wait_until_ready(timeout=5)
+    assert pool.stats()['idle'] == 2
+
+
+def test_empty_pool_creates_a_session_inline(pools):
+    client = FakeClient()
+    pool = pools(client, 'user', size=0)
+
+    with pool.session() as session_id:
+        assert session_id in pool.session_ids()
+
+    assert pool.stats()['misses'] == 1
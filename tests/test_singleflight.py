@@ -0,0 +1,100 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from singleflight import SingleFlight
+
+
+def test_leader_result_goes_to_every_waiter(wait_for):
+    flights = SingleFlight(poll_interval=0.01)
+    release = threading.Event()
+    calls = []
+
+    def fn(cancel, publish):
+        calls.append(1)
+        release.wait(5)
+        return {'final_score': 80}
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [executor.submit(flights.do, 'course', fn) for _ in range(3)]
+        wait_for(lambda: flights.stats()['waiters'] == 3)
+        release.set()
+        results = [future.result(5) for future in futures]
+
+    assert len(calls) == 1
+    assert [result for result, _ in results] == [{'final_score': 80}] * 3
+    assert sorted(shared for _, shared in results) == [False, True, True]
+    assert flights.stats()['in_flight'] == 0
+
+
+def test_leader_error_goes_to_every_waiter(wait_for):
+    flights = SingleFlight(poll_interval=0.01)
+    release = threading.Event()
+
+    def fn(cancel, publish):
+        release.wait(5)
+        raise RuntimeError('workflow failed')
+
+    def call():
+        try:
+            flights.do('course', fn)
+        except RuntimeError as e:
+            return str(e)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [executor.submit(call) for _ in range(2)]
+        wait_for(lambda: flights.stats()['waiters'] == 2)
+        release.set()
+        assert [future.result(5) for future in futures] == ['workflow failed'] * 2
+    assert flights.stats()['errors'] == 1
+
+
+def test_late_joiner_gets_earlier_updates_replayed(wait_for):
+    flights = SingleFlight(poll_interval=0.01)
+    categorized, release = threading.Event(), threading.Event()
+    seen = []
+
+    def fn(cancel, publish):
+        publish({'stage': 'categorized'})
+        categorized.set()
+        release.wait(5)
+        publish({'stage': 'graded'})
+        return 'result'
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(flights.do, 'course', fn)
+        categorized.wait(5)
+        joiner = executor.submit(flights.do, 'course', fn, None, seen.append)
+        wait_for(lambda: flights.stats()['waiters'] == 2)
+        release.set()
+        assert leader.result(5) == ('result', False)
+        assert joiner.result(5) == ('result', True)
+
+    assert seen == [{'stage': 'categorized'}, {'stage': 'graded'}]
+
+
+def test_call_is_cancelled_only_after_every_waiter_cancels(wait_for):
+    flights = SingleFlight(poll_interval=0.01)
+    first, second = threading.Event(), threading.Event()
+    started = threading.Event()
+    cancelled = []
+
+    def fn(cancel, publish):
+        started.set()
+        wait_for(cancel.is_set)
+        cancelled.append(True)
+        return None
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(flights.do, 'course', fn, first)
+        started.wait(5)
+        waiter = executor.submit(flights.do, 'course', fn, second)
+        wait_for(lambda: flights.stats()['waiters'] == 2)
+
+        second.set()
+        # The waiter stops waiting, but the leader's call keeps running
+        assert waiter.result(5) == (None, True)
+        assert not leader.done() and not cancelled
+
+        first.set()
+        assert leader.result(5) == (None, False)
+    assert cancelled == [True]
@@ -0,0 +1,79 @@
+import threading
+import time
+
+import pytest
+
+from store import EvaluationStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = EvaluationStore(str(tmp_path / 'reviewer.db'), batch_size=4, flush_interval=0.01)
+    yield store
+    store.close()
+
+
+def _result(score):
+    return {'category': 'Web3 Development and Design', 'final_score': score, 'passed': score >= 70}
+
+
+def test_pagination_is_stable_across_a_batch_flush(store):
+    session_id = store.create_session()['id']
+    for score in range(10):
+        store.record_evaluation(session_id, f'hash{score}', 'v1', _result(score))
+    assert store.flush(timeout=5)
+
+    first_page, cursor = store.list_evaluations(limit=4)
+    # A later batch lands between page requests
+    for score in range(10, 15):
+        store.record_evaluation(session_id, f'hash{score}', 'v1', _result(score))
+    assert store.flush(timeout=5)
+
+    pages = [first_page]
+    while cursor is not None:
+        page, cursor = store.list_evaluations(limit=4, before=cursor)
+        pages.append(page)
+
+    scores = [evaluation['final_score'] for page in pages for evaluation in page]
+    assert scores == [float(score) for score in range(9, -1, -1)]
+    assert store.list_evaluations(limit=1)[0][0]['final_score'] == 14
+
+
+def test_session_pages(store):
+    ids = [store.create_session()['id'] for _ in range(5)]
+
+    first, cursor = store.list_sessions(limit=3)
+    second, end = store.list_sessions(limit=3, before=cursor)
+
+    assert [s['id'] for s in first + second] == ids[::-1]
+    assert end is None
+
+
+def test_writes_from_two_threads(store):
+    sessions = [store.create_session()['id'] for _ in range(2)]
+
+    def write(session_id):
+        for score in range(25):
+            store.record_evaluation(session_id, f'{session_id}-{score}', 'v1', _result(score))
+
+    threads = [threading.Thread(target=write, args=(session_id,)) for session_id in sessions]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert store.flush(timeout=5)
+
+    assert store.stats()['evaluations'] == 50
+    for session_id in sessions:
+        assert store.get_session(session_id)['evaluations'] == 25
+        assert len(store.list_evaluations(limit=100, session_id=session_id)[0]) == 25
+
+
+def test_idle_and_excess_sessions_expire(store):
+    for _ in range(3):
+        store.create_session()
+
+    assert store.expire_sessions(max_sessions=2) == 1
+    time.sleep(0.05)
+    assert store.expire_sessions(idle_ttl=0.01) == 2
+    assert store.count_sessions() == 0
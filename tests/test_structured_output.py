@@ -0,0 +1,109 @@
+import asyncio
+import importlib
+import json
+from typing import AsyncGenerator
+
+import pytest
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from reviewer.utils import structured_output
+from reviewer.utils.metrics import PARSE_FAILURES_KEY
+from reviewer.utils.schemas import CourseFeedback
+
+VALID = json.dumps({"summary": "Clear modules.", "recommendation": "Add exercises."})
+INVALID = json.dumps({"summary": "Clear modules."})
+
+
+class ScriptedLlm(BaseLlm):
+    """Answers with the given responses in order and keeps every request"""
+
+    model: str = 'scripted'
+    responses: list = []
+    requests: list = []
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        self.requests.append(llm_request)
+        text = self.responses[min(len(self.requests), len(self.responses)) - 1]
+        yield LlmResponse(content=types.Content(role='model', parts=[types.Part(text=text)]))
+
+
+def _run(agent):
+    runner = InMemoryRunner(agent, app_name='test')
+    session = runner.session_service.create_session(app_name='test', user_id='test')
+
+    async def collect():
+        message = types.Content(role='user', parts=[types.Part(text='A course on Solidity.')])
+        return [event async for event in runner.run_async(user_id='test', session_id=session.id, new_message=message)]
+
+    events = asyncio.run(collect())
+    state = runner.session_service.get_session(app_name='test', user_id='test', session_id=session.id).state
+    return events, state
+
+
+def _summarizer(model, **kwargs):
+    return structured_output.structured_llm_agent(
+        model=model,
+        name='score_summarizer',
+        instruction='Write feedback for the course.',
+        output_schema=CourseFeedback,
+        output_key='course_summary',
+        **kwargs,
+    )
+
+
+def test_invalid_output_is_retried_with_the_validation_error():
+    model = ScriptedLlm(responses=[INVALID, VALID])
+
+    events, state = _run(_summarizer(model, max_attempts=2))
+
+    assert len(model.requests) == 2
+    hint = model.requests[1].contents[-1].parts[0].text
+    assert hint.startswith('Your previous response was rejected') and 'recommendation' in hint
+    assert state['course_summary'] == json.loads(VALID)
+    assert not any(PARSE_FAILURES_KEY in event.actions.state_delta for event in events)
+
+
+def test_gives_up_after_max_attempts():
+    model = ScriptedLlm(responses=[INVALID])
+
+    events, state = _run(_summarizer(model, max_attempts=3))
+
+    assert len(model.requests) == 3
+    assert 'course_summary' not in state
+    failures = [event.actions.state_delta[PARSE_FAILURES_KEY] for event in events
+                if PARSE_FAILURES_KEY in event.actions.state_delta]
+    assert failures == [['score_summarizer']]
+
+
+@pytest.fixture
+def output_retries(monkeypatch):
+    """Reloads structured_output with REVIEWER_OUTPUT_RETRIES set, and restores it afterwards"""
+    def set_retries(value):
+        monkeypatch.setenv('REVIEWER_OUTPUT_RETRIES', value)
+        return importlib.reload(structured_output)
+
+    yield set_retries
+    monkeypatch.undo()
+    importlib.reload(structured_output)
+
+
+def test_attempts_default_to_reviewer_output_retries(output_retries):
+    module = output_retries('0')
+    model = ScriptedLlm(responses=[INVALID, VALID])
+
+    _, state = _run(_summarizer(model))
+
+    assert module.MAX_ATTEMPTS == 1
+    assert len(model.requests) == 1
+    assert 'course_summary' not in state
+
+
+def test_agent_without_output_schema_is_rejected():
+    with pytest.raises(ValueError):
+        structured_output.structured_llm_agent(model=ScriptedLlm(), name='plain', instruction='Hi.')
@@ -0,0 +1,91 @@
+import os
+import tempfile
+
+import pytest
+
+_data_dir = tempfile.mkdtemp()
+os.environ.update(
+    COURSE_REVIEWER_FAKE_ENGINE='true',
+    COURSE_REVIEWER_DB=os.path.join(_data_dir, 'reviewer.db'),
+    COURSE_REVIEWER_CACHE_DIR=os.path.join(_data_dir, 'cache'),
+    COURSE_REVIEWER_SESSION_POOL_SIZE='0',
+    COURSE_REVIEWER_SESSION_SWEEP_INTERVAL='0',
+)
+
+import server  # noqa: E402
+from jobs import JobQueue  # noqa: E402
+from deployment.client import get_client  # noqa: E402
+from deployment.fake_engine import FakeAgentEngine  # noqa: E402
+
+
+@pytest.fixture
+def client():
+    return server.app.test_client()
+
+
+def _finished_job(client):
+    session_id = client.post('/api/create-session').get_json()['session_id']
+    # Distinct content per job, so the stages run instead of the evaluation cache answering
+    content = f'A course on Solidity, session {session_id}.'
+    job_id = client.post('/api/jobs', json={'session_id': session_id, 'content': content}).get_json()['job_id']
+    # Reading the stream once waits for the job to finish
+    client.get(f'/api/jobs/{job_id}/events').get_data()
+    return job_id
+
+
+@pytest.mark.parametrize('last_event_id', ['not-a-number', '', '-7'])
+def test_invalid_last_event_id_replays_the_stream(client, last_event_id):
+    job_id = _finished_job(client)
+
+    response = client.get(f'/api/jobs/{job_id}/events', headers={'Last-Event-ID': last_event_id})
+    body = response.get_data(as_text=True)
+
+    assert response.status_code == 200
+    assert body.startswith('id: 0\n')
+    assert 'event: done' in body
+
+
+def test_last_event_id_resumes_after_that_event(client):
+    job_id = _finished_job(client)
+
+    body = client.get(f'/api/jobs/{job_id}/events', headers={'Last-Event-ID': '0'}).get_data(as_text=True)
+
+    assert not body.startswith('id: 0\n')
+    assert 'event: done' in body
+
+
+@pytest.mark.parametrize('path', ['/.data/reviewer.db', '/.cache/key.json', '/server.py', '/README.md'])
+def test_only_ui_assets_are_served(client, path):
+    assert client.get(path).status_code == 404
+    assert client.get('/script.js').status_code == 200
+
+
+class _BadEventEngine(FakeAgentEngine):
+    def stream_query(self, user_id, session_id, message):
+        events = super().stream_query(user_id, session_id, message)
+        yield next(events)
+        yield {'author': 'course_grader', 'actions': {'state_delta': ['not', 'a', 'dict']}}
+        yield from events
+
+
+def test_malformed_event_does_not_discard_the_evaluation(caplog):
+    get_client('bad-events', engine=_BadEventEngine())
+
+    evaluation = server.call_course_reviewer_workflow('bad-events', None, 'A course on Solidity.')
+
+    assert evaluation is not None
+    assert 'final_score' in evaluation
+    assert 'Malformed workflow output: Workflow event state_delta must be a dict' in caplog.text
+
+
+def test_full_job_queue_answers_429(client, monkeypatch):
+    # No workers, so submitted jobs stay queued
+    monkeypatch.setattr(server, 'job_queue', JobQueue(server.run_evaluation_job, workers=0, max_queue=1))
+    session_id = client.post('/api/create-session').get_json()['session_id']
+
+    accepted = client.post('/api/jobs', json={'session_id': session_id, 'content': 'A course.'})
+    rejected = client.post('/api/jobs', json={'session_id': session_id, 'content': 'Another course.'})
+
+    assert accepted.status_code == 202
+    assert rejected.status_code == 429
+    assert rejected.headers['Retry-After'] == '5'
@@ -0,0 +1,164 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class EvaluationCache:
+    """Two-tier cache of evaluation results keyed by content and rubric version.
+
+    The memory tier is an LRU bounded by entry count. The optional disk tier
+    stores one JSON file per key under ``directory`` and is bounded by total
+    size, evicting the least recently written files first. Entries in both
+    tiers expire after ``ttl`` seconds.
+    """
+
+    def __init__(self, max_entries=256, directory=None, max_disk_bytes=100 * 1024 * 1024, ttl=7 * 24 * 3600):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self.ttl = ttl
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {
+            'hits': 0,
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'disk_evictions': 0,
+        }
+        self._disk_bytes = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._evict_disk()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        """Return the cached result for key, or None"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self._counters['hits'] += 1
+                    self._counters['memory_hits'] += 1
+                    return value
+                del self._memory[key]
+
+        value, expires_at = self._read_disk(key, now)
+        with self._lock:
+            if value is None:
+                self._counters['misses'] += 1
+                return None
+            self._counters['hits'] += 1
+            self._counters['disk_hits'] += 1
+            # Keep the file's expiry, so promotion does not extend the entry's life
+            self._remember(key, value, expires_at)
+        return value
+
+    def set(self, key, value):
+        """Store a result in both tiers"""
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now + self.ttl)
+        self._write_disk(key, value)
+
+    def stats(self):
+        """Return hit/miss counters and current occupancy"""
+        with self._lock:
+            stats = dict(self._counters)
+            stats['memory_entries'] = len(self._memory)
+            stats['disk_bytes'] = self._disk_bytes
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        return stats
+
+    def _remember(self, key, value, expires_at):
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._counters['evictions'] += 1
+
+    def _read_disk(self, key, now):
+        """Return (value, expires_at) for a file on disk, or (None, None)"""
+        if not self.directory:
+            return None, None
+        path = self._path(key)
+        try:
+            expires_at = os.path.getmtime(path) + self.ttl
+            if expires_at <= now:
+                os.remove(path)
+                return None, None
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f), expires_at
+        except FileNotFoundError:
+            return None, None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable cache entry {key}: {str(e)}")
+            return None, None
+
+    def _write_disk(self, key, value):
+        if not self.directory:
+            return
+        try:
+            path = self._path(key)
+            old_size = os.path.getsize(path) if os.path.exists(path) else 0
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(value, f)
+            new_size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, path)
+            with self._lock:
+                self._disk_bytes += new_size - old_size
+                over_budget = self._disk_bytes > self.max_disk_bytes
+            # Only rescan the directory once the running total exceeds the budget
+            if over_budget:
+                self._evict_disk()
+        except OSError as e:
+            logger.warning(f"Could not write cache entry {key}: {str(e)}")
+
+    def _evict_disk(self):
+        """Drop expired files, then the oldest ones until under max_disk_bytes"""
+        entries = []
+        total = 0
+        now = time.time()
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.endswith('.json'):
+                    continue
+                stat = entry.stat()
+                if stat.st_mtime + self.ttl <= now:
+                    self._remove(entry.path)
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+
+        # Trim to 90% of the budget so the next few writes do not rescan
+        if total > self.max_disk_bytes:
+            for _, size, path in sorted(entries):
+                if total <= self.max_disk_bytes * 0.9:
+                    break
+                self._remove(path)
+                total -= size
+
+        with self._lock:
+            self._disk_bytes = total
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+            with self._lock:
+                self._counters['disk_evictions'] += 1
+        except FileNotFoundError:
+            pass
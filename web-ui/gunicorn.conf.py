@@ -0,0 +1,76 @@
+"""Production server configuration: gunicorn -c gunicorn.conf.py (from web-ui/)
+
+Every setting comes from the environment, so the same file serves local
+runs, containers and Cloud Run (which sets PORT).
+"""
+import logging
+import multiprocessing
+import os
+import signal
+import time
+
+wsgi_app = 'server:app'
+bind = os.getenv('COURSE_REVIEWER_BIND', f"0.0.0.0:{os.getenv('PORT', '5000')}")
+
+# Evaluations spend their time waiting on Agent Engine, so concurrency comes
+# from threads; extra processes only add CPU headroom. A synchronous
+# /api/analyze request holds a thread for the whole evaluation, so keep
+# workers * threads above the peak number of them, or quick requests queue
+# behind them (long evaluations are better sent to /api/jobs). Jobs, the
+# evaluation cache's memory tier and in-flight coalescing are per process, so
+# with more than one worker the /api/jobs endpoints need sticky routing.
+workers = int(os.getenv('COURSE_REVIEWER_WORKERS', '1'))
+threads = int(os.getenv('COURSE_REVIEWER_THREADS', '64'))
+worker_class = 'gthread'
+# Long enough for a full evaluation on a synchronous /api/analyze request
+timeout = int(os.getenv('COURSE_REVIEWER_WORKER_TIMEOUT', '300'))
+# How long a stopping worker may take to finish requests and drain jobs
+graceful_timeout = int(os.getenv('COURSE_REVIEWER_DRAIN_TIMEOUT', '120'))
+keepalive = int(os.getenv('COURSE_REVIEWER_KEEPALIVE', '5'))
+# Recycle workers now and then to bound memory growth (0 disables)
+max_requests = int(os.getenv('COURSE_REVIEWER_MAX_REQUESTS', '0'))
+max_requests_jitter = max_requests // 10
+
+# The app is loaded in each worker, not in the master: the session pool,
+# job workers and store writer are threads, which do not survive fork()
+preload_app = False
+
+accesslog = os.getenv('COURSE_REVIEWER_ACCESS_LOG') or None
+loglevel = os.getenv('COURSE_REVIEWER_LOG_LEVEL', 'info')
+
+
+def on_starting(server):
+    cpus = multiprocessing.cpu_count()
+    if workers > 1:
+        server.log.warning(f"{workers} workers: route /api/jobs/<id> requests to the worker that created the job")
+    if workers > 2 * cpus:
+        server.log.warning(f"{workers} workers on {cpus} CPUs; prefer more COURSE_REVIEWER_THREADS")
+
+
+def post_worker_init(worker):
+    """Warm up each worker's Agent Engine client and session pool before it accepts requests"""
+    import server as app_module
+    logging.getLogger().setLevel(loglevel.upper())
+    app_module.warm_up()
+
+    # Refuse new jobs (and fail health checks) as soon as the worker is asked
+    # to stop, while gunicorn finishes the requests already in progress
+    handle_exit = worker.handle_exit
+    worker.drain_started = None
+
+    def on_sigterm(sig, frame):
+        if worker.drain_started is None:
+            worker.drain_started = time.monotonic()
+            app_module.job_queue.close()
+        handle_exit(sig, frame)
+
+    signal.signal(signal.SIGTERM, on_sigterm)
+
+
+def worker_exit(server, worker):
+    """Requests have finished by now; let queued and running evaluation jobs finish too"""
+    import server as app_module
+    # The master kills the worker graceful_timeout after asking it to stop
+    started = getattr(worker, 'drain_started', None)
+    elapsed = time.monotonic() - started if started is not None else 0.0
+    app_module.shutdown(timeout=max(graceful_timeout - elapsed - 5, 1))
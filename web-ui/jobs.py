@@ -0,0 +1,200 @@
+import logging
+import queue
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue is at capacity
+
+    Only jobs still waiting to run count against it; a job cancelled while
+    queued frees its place at once
+    """
+
+
+class JobCancelledError(Exception):
+    """Raised by a job's work function when it notices it was cancelled"""
+
+
+class Job:
+    """A single queued evaluation and its outcome"""
+
+    def __init__(self, payload):
+        self.id = uuid.uuid4().hex
+        self.payload = payload
+        self.status = 'queued'
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.cancel_event = threading.Event()
+        self.events = []
+        self._changed = threading.Condition()
+
+    @property
+    def finished(self):
+        return self.status in ('succeeded', 'failed', 'cancelled')
+
+    def publish(self, event):
+        """Record a progress event and wake up anyone streaming this job"""
+        with self._changed:
+            self.events.append(event)
+            self._changed.notify_all()
+
+    def notify(self):
+        with self._changed:
+            self._changed.notify_all()
+
+    def wait_for_events(self, start, timeout=None):
+        """Return (events after index start, finished), waiting up to timeout for news"""
+        with self._changed:
+            self._changed.wait_for(lambda: len(self.events) > start or self.finished, timeout)
+            return self.events[start:], self.finished
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'status': self.status,
+            'result': self.result,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+        }
+
+
+class JobQueue:
+    """Bounded queue of evaluation jobs served by a fixed pool of worker threads.
+
+    ``work(job)`` runs on a worker thread and returns the job result. It
+    should check ``job.cancel_event`` between steps and raise
+    JobCancelledError to stop early. Finished jobs are kept for
+    ``result_ttl`` seconds so clients can collect them.
+    """
+
+    def __init__(self, work, workers=4, max_queue=32, result_ttl=3600):
+        self.work = work
+        self.max_queue = max_queue
+        self.result_ttl = result_ttl
+        # Unbounded: capacity is enforced on the jobs still waiting, so
+        # cancelled ones do not hold a place until a worker pops them
+        self._queue = queue.Queue()
+        self._waiting = 0
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        self._workers = [
+            threading.Thread(target=self._worker, name=f'job-worker-{i}', daemon=True)
+            for i in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, payload):
+        """Queue a job, raising QueueFullError when there is no room or the queue is draining"""
+        self._prune()
+        job = Job(payload)
+        with self._lock:
+            if self._closed:
+                raise QueueFullError("Job queue is shutting down")
+            if self._waiting >= self.max_queue:
+                raise QueueFullError(f"Job queue is full ({self.max_queue} waiting)")
+            self._waiting += 1
+            self._jobs[job.id] = job
+        self._queue.put(job)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """Cancel a queued or running job; returns False if it already finished"""
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return False
+        job.cancel_event.set()
+        with self._lock:
+            if job.status == 'queued':
+                job.status = 'cancelled'
+                job.finished_at = time.time()
+                self._waiting -= 1
+        job.notify()
+        return True
+
+    def close(self):
+        """Stop accepting jobs; queued and running ones still finish"""
+        with self._lock:
+            self._closed = True
+
+    def drain(self, timeout=None):
+        """Stop accepting jobs and wait for queued and running ones to finish
+
+        Returns False if some were still unfinished after timeout seconds.
+        """
+        self.close()
+        deadline = None if timeout is None else time.time() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    @property
+    def draining(self):
+        with self._lock:
+            return self._closed
+
+    def stats(self):
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+            waiting = self._waiting
+        return {
+            'workers': len(self._workers),
+            'draining': self.draining,
+            'queue_depth': waiting,
+            'max_queue': self.max_queue,
+            'running': statuses.count('running'),
+            'tracked_jobs': len(statuses),
+        }
+
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+            try:
+                with self._lock:
+                    if job.status != 'queued':
+                        continue
+                    self._waiting -= 1
+                    job.status = 'running'
+                    job.started_at = time.time()
+                try:
+                    result = self.work(job)
+                    status, error = 'succeeded', None
+                except JobCancelledError:
+                    result, status, error = None, 'cancelled', None
+                except Exception as e:
+                    logger.error(f"Job {job.id} failed: {str(e)}")
+                    result, status, error = None, 'failed', str(e)
+                with self._lock:
+                    job.result = result
+                    job.error = error
+                    job.status = status
+                    job.finished_at = time.time()
+                job.notify()
+            finally:
+                self._queue.task_done()
+
+    def _prune(self):
+        cutoff = time.time() - self.result_ttl
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items()
+                       if job.finished and job.finished_at < cutoff]
+            for job_id in expired:
+                del self._jobs[job_id]
@@ -139,11 +139,8 @@ async function handleAnalyze() {
             throw new Error(sessionData.error || 'Failed to create session');
         }
         
-        // Simulate the analysis steps for UI feedback
-        const analysisPromise = simulateAnalysisSteps();
-        
-        // Call the actual Course Reviewer API
-        const analysisResponse = await fetch('/api/analyze', {
+        // Queue the analysis; the server answers immediately with a job ID
+        const jobResponse = await fetch('/api/jobs', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
@@ -154,18 +151,23 @@ async function handleAnalyze() {
             })
         });
         
-        // Wait for both analysis and UI simulation to complete
-        await analysisPromise;
+        if (jobResponse.status === 429) {
+            throw new Error('The server is busy, please try again in a few seconds');
+        }
         
-        if (!analysisResponse.ok) {
-            throw new Error(`Analysis failed: ${analysisResponse.status}`);
+        const jobData = await jobResponse.json();
+        if (!jobResponse.ok || !jobData.success) {
+            throw new Error(jobData.error || `Analysis failed: ${jobResponse.status}`);
         }
         
-        const analysisData = await analysisResponse.json();
-        if (!analysisData.success) {
-            throw new Error(analysisData.error || 'Analysis failed');
+        const job = await followJob(jobData.job_id);
+        
+        if (job.status !== 'succeeded') {
+            throw new Error(job.error || `Analysis ${job.status}`);
         }
         
+        const analysisData = job.result;
+        
         // Show results
         displayResults(analysisData.results);
         
@@ -176,6 +178,67 @@ async function handleAnalyze() {
     }
 }
 
+function followJob(jobId) {
+    // Stream stage updates from the server until the job finishes
+    return new Promise((resolve, reject) => {
+        const events = new EventSource(`/api/jobs/${jobId}/events`);
+        
+        events.addEventListener('stage', (e) => handleStageUpdate(JSON.parse(e.data)));
+        
+        events.addEventListener('done', (e) => {
+            events.close();
+            resolve(JSON.parse(e.data));
+        });
+        
+        events.onerror = () => {
+            // EventSource reconnects on its own unless the server refused the stream
+            if (events.readyState === EventSource.CLOSED) {
+                reject(new Error('Lost connection to the analysis server'));
+            }
+        };
+    });
+}
+
+function completeStep(stepId, detail) {
+    const step = document.getElementById(stepId);
+    step.classList.remove('active');
+    step.classList.add('done');
+    if (detail) {
+        step.querySelector('.step-detail').textContent = detail;
+    }
+}
+
+function handleStageUpdate(update) {
+    if (update.stage === 'categorized') {
+        completeStep('step1', update.category);
+        document.getElementById('step2').classList.add('active');
+        document.getElementById('courseCategory').textContent = update.category;
+    } else if (update.stage === 'graded') {
+        const scores = update.grades ? Object.values(update.grades) : [];
+        const average = scores.length ? scores.reduce((a, b) => a + b, 0) / scores.length : null;
+        completeStep('step2', average === null ? '' : `Average ${average.toFixed(0)}/100`);
+        document.getElementById('step3').classList.add('active');
+        if (update.grades) {
+            displayPartialResults(update.grades);
+        }
+    } else if (update.stage === 'calculated') {
+        completeStep('step3');
+    }
+}
+
+function displayPartialResults(grades) {
+    // Show the grades while the final score and feedback are still being written
+    resultsSection.style.display = 'block';
+    document.getElementById('statusBadge').className = 'status-badge';
+    document.getElementById('statusText').textContent = 'Calculating';
+    document.getElementById('finalScore').textContent = '--';
+    document.getElementById('passStatus').textContent = 'PENDING';
+    document.getElementById('passStatus').className = 'value';
+    document.getElementById('summaryText').textContent = 'Loading feedback...';
+    document.getElementById('recommendationText').textContent = 'Loading recommendations...';
+    displayIndividualScores(grades, {});
+}
+
 function readFileContent(file) {
     return new Promise((resolve, reject) => {
         const reader = new FileReader();
@@ -185,23 +248,6 @@ function readFileContent(file) {
     });
 }
 
-async function simulateAnalysisSteps() {
-    const steps = ['step1', 'step2', 'step3'];
-    
-    for (let i = 0; i < steps.length; i++) {
-        // Activate current step
-        document.getElementById(steps[i]).classList.add('active');
-        
-        // Wait for demonstration
-        await new Promise(resolve => setTimeout(resolve, 2000));
-        
-        // Deactivate current step (except the last one)
-        if (i < steps.length - 1) {
-            document.getElementById(steps[i]).classList.remove('active');
-        }
-    }
-}
-
 function showLoadingScreen() {
     uploadSection.style.display = 'none';
     resultsSection.style.display = 'none';
@@ -209,8 +255,10 @@ function showLoadingScreen() {
     
     // Reset progress steps
     document.querySelectorAll('.step').forEach(step => {
-        step.classList.remove('active');
+        step.classList.remove('active', 'done');
+        step.querySelector('.step-detail').textContent = '';
     });
+    document.getElementById('step1').classList.add('active');
 }
 
 function hideLoadingScreen() {
@@ -257,7 +305,7 @@ function displayIndividualScores(scores, weights) {
     scoresGrid.innerHTML = '';
     
     Object.entries(scores).forEach(([element, score]) => {
-        const weight = weights[element] || 0;
+        const weight = weights[element];
         const scoreBar = createScoreBar(element, score, weight);
         scoresGrid.appendChild(scoreBar);
     });
@@ -276,7 +324,7 @@ function createScoreBar(title, score, weight) {
             <div class="score-bar-fill" style="width: ${score}%"></div>
         </div>
         <div style="font-size: 0.8rem; color: #718096; margin-top: 0.3rem;">
-            Weight: ${weight}%
+            ${weight === undefined ? '&nbsp;' : `Weight: ${weight}%`}
         </div>
     `;
     
@@ -1,13 +1,30 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, abort, request, jsonify, send_from_directory, stream_with_context
 from flask_cors import CORS
 import os
+import sys
 import tempfile
 import json
+from contextlib import contextmanager
 from dotenv import load_dotenv
 import logging
-import subprocess
-import re
-import ast
+import time
+
+# Make the project packages (deployment, reviewer) importable from web-ui/
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from cache import EvaluationCache
+from jobs import JobCancelledError, JobQueue, QueueFullError
+from metrics import MetricsRegistry
+from sessions import SessionManager
+from singleflight import SingleFlight
+from store import EvaluationStore
+from deployment.client import get_client
+from deployment.events import WorkflowEvent, WorkflowEventError, WorkflowEventParser
+from deployment.session_pool import SessionPool
+from deployment.session_sweeper import SessionSweeper
+from reviewer.utils.fingerprint import evaluation_key
+from reviewer.utils.metrics import LLM_METRICS_KEY, PARSE_FAILURES_KEY
+from reviewer.utils.weights import EVALUATION_MODE_KEY, EVALUATION_MODES
 
 # Load environment variables
 load_dotenv()
@@ -19,31 +36,116 @@ CORS(app)
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Store active sessions (in production, use a proper database)
-active_sessions = {}
+# Local state (database, cache) lives in the repo root's .data/, outside the
+# directory static files are served from
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '.data'))
+
+RESOURCE_ID = os.getenv('COURSE_REVIEWER_RESOURCE_ID', 'projects/319361346283/locations/us-central1/reasoningEngines/856273267432882176')
+WORKFLOW_USER_ID = os.getenv('COURSE_REVIEWER_USER_ID', 'test_user')
+
+
+def create_engine_client():
+    """Create the shared Agent Engine client used by every request"""
+    engine = None
+    if os.getenv('COURSE_REVIEWER_FAKE_ENGINE', '').lower() in ('1', 'true', 'yes'):
+        from deployment.fake_engine import FakeAgentEngine
+        engine = FakeAgentEngine(
+            latency=float(os.getenv('COURSE_REVIEWER_FAKE_LATENCY', '0')),
+            session_latency=float(os.getenv('COURSE_REVIEWER_FAKE_SESSION_LATENCY', '0')),
+        )
+        logger.info("Using local fake Agent Engine")
+    elif os.getenv('COURSE_REVIEWER_LOCAL_ENGINE', '').lower() in ('1', 'true', 'yes'):
+        from deployment.local_engine import LocalAgentEngine
+        engine = LocalAgentEngine()
+        logger.info("Using the in-process agent pipeline")
+    return get_client(RESOURCE_ID, engine=engine)
+
+
+engine_client = create_engine_client()
+
+# Pre-created remote sessions, so requests skip the create_session round-trip
+session_pool_size = int(os.getenv('COURSE_REVIEWER_SESSION_POOL_SIZE', '4'))
+session_pool = SessionPool(
+    engine_client,
+    WORKFLOW_USER_ID,
+    size=session_pool_size,
+    max_uses=int(os.getenv('COURSE_REVIEWER_SESSION_MAX_USES', '1')),
+    max_age=float(os.getenv('COURSE_REVIEWER_SESSION_MAX_AGE', '1800')),
+) if session_pool_size > 0 else None
+
+evaluation_cache = EvaluationCache(
+    max_entries=int(os.getenv('COURSE_REVIEWER_CACHE_MAX_ENTRIES', '256')),
+    directory=os.getenv('COURSE_REVIEWER_CACHE_DIR', os.path.join(DATA_DIR, 'cache')) or None,
+    max_disk_bytes=int(os.getenv('COURSE_REVIEWER_CACHE_MAX_BYTES', str(100 * 1024 * 1024))),
+    ttl=int(os.getenv('COURSE_REVIEWER_CACHE_TTL', str(7 * 24 * 3600))),
+)
+
+# Sessions and evaluation results, shared by every server process using the same file
+evaluation_store = EvaluationStore(
+    os.getenv('COURSE_REVIEWER_DB', os.path.join(DATA_DIR, 'reviewer.db')),
+    batch_size=int(os.getenv('COURSE_REVIEWER_DB_BATCH_SIZE', '64')),
+    flush_interval=float(os.getenv('COURSE_REVIEWER_DB_FLUSH_INTERVAL', '0.5')),
+)
+
+# Web sessions expire after an idle TTL and past a maximum count; remote
+# sessions not reused by the pool are deleted after their evaluation, and a
+# periodic sweep deletes any left behind (crashed workers, earlier runs)
+session_manager = SessionManager(
+    evaluation_store,
+    sweeper=SessionSweeper(
+        engine_client,
+        WORKFLOW_USER_ID,
+        max_idle=float(os.getenv('COURSE_REVIEWER_REMOTE_SESSION_MAX_IDLE', '3600')),
+        max_sessions=int(os.getenv('COURSE_REVIEWER_REMOTE_SESSION_MAX', '0')),
+        keep=session_pool.session_ids if session_pool is not None else None,
+    ),
+    idle_ttl=float(os.getenv('COURSE_REVIEWER_SESSION_TTL', str(24 * 3600))),
+    max_sessions=int(os.getenv('COURSE_REVIEWER_MAX_SESSIONS', '10000')),
+    interval=float(os.getenv('COURSE_REVIEWER_SESSION_SWEEP_INTERVAL', '300')),
+)
+
+# Identical evaluations already running, so concurrent duplicates share one workflow call
+inflight_evaluations = SingleFlight()
+
+# Prometheus metrics, scraped from /api/metrics
+metrics = MetricsRegistry()
+evaluation_seconds = metrics.histogram(
+    'reviewer_evaluation_seconds', 'End-to-end evaluation latency', ['outcome'])
+stage_seconds = metrics.histogram(
+    'reviewer_stage_seconds', 'Time from the previous workflow event to each event, by authoring agent', ['agent'])
+llm_seconds = metrics.histogram(
+    'reviewer_llm_seconds', 'Model call latency reported by the pipeline', ['agent'])
+llm_ttft_seconds = metrics.histogram(
+    'reviewer_llm_ttft_seconds', 'Model time to first token reported by the pipeline', ['agent'])
+llm_input_tokens = metrics.counter(
+    'reviewer_llm_input_tokens_total', 'Model input tokens (estimated when the model reports no usage)', ['agent'])
+llm_output_tokens = metrics.counter(
+    'reviewer_llm_output_tokens_total', 'Model output tokens (estimated when the model reports no usage)', ['agent'])
+parse_failures = metrics.counter(
+    'reviewer_parse_failures_total', 'Stage outputs that could not be parsed', ['agent'])
+coalesced_evaluations = metrics.counter(
+    'reviewer_coalesced_evaluations_total', 'Evaluations that attached to an identical in-flight workflow call')
 
 @app.route('/')
 def index():
     """Serve the main HTML file"""
     return send_from_directory('.', 'index.html')
 
+# Only the UI's own assets; anything else under web-ui/ stays private
+STATIC_FILES = frozenset(['index.html', 'script.js', 'styles.css'])
+
 @app.route('/<path:filename>')
 def serve_static(filename):
     """Serve static files (CSS, JS, etc.)"""
+    if filename not in STATIC_FILES:
+        abort(404)
     return send_from_directory('.', filename)
 
 @app.route('/api/create-session', methods=['POST'])
 def create_session():
     """Create a new evaluation session"""
     try:
-        # For demo purposes, we'll use a simple session ID
-        session_id = f"demo_session_{len(active_sessions) + 1}"
-        
-        active_sessions[session_id] = {
-            'id': session_id,
-            'status': 'active',
-            'created_at': str(os.times())
-        }
+        session_id = session_manager.create()['id']
         
         logger.info(f"Created session: {session_id}")
         
@@ -66,6 +168,7 @@ def analyze_course():
         data = request.get_json()
         session_id = data.get('session_id')
         course_content = data.get('content')
+        mode = data.get('mode')
         
         if not session_id or not course_content:
             return jsonify({
@@ -73,17 +176,21 @@ def analyze_course():
                 'error': 'Missing session_id or content'
             }), 400
         
-        if session_id not in active_sessions:
+        if mode is not None and mode not in EVALUATION_MODES:
             return jsonify({
                 'success': False,
-                'error': 'Invalid session_id'
+                'error': f"Invalid mode, use one of: {', '.join(EVALUATION_MODES)}"
             }), 400
         
-        logger.info(f"Analyzing content for session: {session_id}")
+        if session_manager.get(session_id) is None:
+            return jsonify({
+                'success': False,
+                'error': 'Invalid or expired session_id'
+            }), 400
         
-        resource_id = os.getenv('COURSE_REVIEWER_RESOURCE_ID', 'projects/319361346283/locations/us-central1/reasoningEngines/856273267432882176')
+        logger.info(f"Analyzing content for session: {session_id}")
         
-        results = call_course_reviewer_workflow(resource_id, session_id, course_content)
+        results, cached = evaluate_course_content(session_id, course_content, mode=mode)
         
         if results is None:
             return jsonify({
@@ -93,7 +200,8 @@ def analyze_course():
         
         return jsonify({
             'success': True,
-            'results': results
+            'results': results,
+            'cached': cached
         })
         
     except Exception as e:
@@ -103,110 +211,405 @@ def analyze_course():
             'error': str(e)
         }), 500
 
-def call_course_reviewer_workflow(resource_id, session_id, course_content):
+def evaluate_course_content(session_id, course_content, cancel_event=None, on_stage=None, mode=None):
+    """Return (results, cached) for the content, running the workflow on a cache miss
+    
+    mode picks the pipeline's evaluation mode (staged or fused) for this
+    request; None leaves it to the deployment's default
+    """
+    cache_key = evaluation_key(course_content, mode=mode)
+    version, digest = cache_key.split('-', 1)
+    started = time.perf_counter()
+    cached_results = evaluation_cache.get(cache_key)
+    if cached_results is not None:
+        logger.info(f"Serving cached evaluation for session: {session_id}")
+        evaluation_store.record_evaluation(session_id, digest, version, cached_results, cached=True)
+        evaluation_seconds.observe(time.perf_counter() - started, outcome='cached')
+        return cached_results, True
+    
+    def run(shared_cancel_event, publish):
+        results = call_course_reviewer_workflow(RESOURCE_ID, session_id, course_content, shared_cancel_event, publish, mode)
+        if results is not None:
+            evaluation_cache.set(cache_key, results)
+        return results
+    
+    # Identical content under the same rubric that is already being evaluated
+    # is waited for instead of sent to the workflow again
+    results, shared = inflight_evaluations.do(cache_key, run, cancel_event, on_stage)
+    if shared:
+        logger.info(f"Joined in-flight evaluation for session: {session_id}")
+        coalesced_evaluations.inc()
+    if results is not None:
+        evaluation_store.record_evaluation(session_id, digest, version, results)
+    if cancel_event is not None and cancel_event.is_set():
+        outcome = 'cancelled'
+    elif results is None:
+        outcome = 'failed'
+    else:
+        outcome = 'coalesced' if shared else 'succeeded'
+    evaluation_seconds.observe(time.perf_counter() - started, outcome=outcome)
+    return results, False
+
+def record_event_metrics(event, seconds):
+    """Record stage latency and any LLM or parse-failure metrics carried by a workflow event"""
+    stage_seconds.observe(seconds, agent=event.author or 'unknown')
+    state_delta = event.state_delta
+    llm = state_delta.get(LLM_METRICS_KEY)
+    if isinstance(llm, dict):
+        agent = llm.get('agent', 'unknown')
+        llm_seconds.observe(llm.get('seconds', 0.0), agent=agent)
+        llm_ttft_seconds.observe(llm.get('ttft_seconds', 0.0), agent=agent)
+        llm_input_tokens.inc(llm.get('input_tokens', 0), agent=agent)
+        llm_output_tokens.inc(llm.get('output_tokens', 0), agent=agent)
+    for agent in state_delta.get(PARSE_FAILURES_KEY) or []:
+        parse_failures.inc(agent=agent)
+
+@contextmanager
+def workflow_session(client, mode=None):
+    """Yield a remote session ID, taken from the session pool when there is one
+
+    Sessions created here are used once and deleted afterwards
+    """
+    if mode is None and session_pool is not None and client is engine_client:
+        with session_pool.session() as session_id:
+            yield session_id
+        return
+    
+    if mode is not None:
+        # The pool's sessions use the deployment's default mode; the mode is
+        # session state, so a request that picks one gets its own session
+        logger.info(f"Creating {mode} mode session for workflow...")
+        session_id = client.create_session(user_id=WORKFLOW_USER_ID, state={EVALUATION_MODE_KEY: mode}).get('id')
+    else:
+        logger.info("Creating session for workflow...")
+        session_id = client.create_session(user_id=WORKFLOW_USER_ID).get('id')
+    try:
+        yield session_id
+    finally:
+        if session_id:
+            discard_remote_session(client, session_id)
+
+def discard_remote_session(client, session_id):
+    """Delete a remote session that will not be used again"""
+    if client is engine_client:
+        session_manager.retire_remote(session_id)
+        return
+    try:
+        client.delete_session(user_id=WORKFLOW_USER_ID, session_id=session_id)
+    except Exception as e:
+        logger.warning(f"Could not delete session {session_id}: {str(e)}")
+
+def call_course_reviewer_workflow(resource_id, session_id, course_content, cancel_event=None, on_stage=None, mode=None):
     """
     Call the actual Course Reviewer Workflow deployed on Google Cloud.
     """
     try:
-        python_path = os.path.join('..', '.venv', 'Scripts', 'python.exe')
-        
-        create_session_command = [
-            python_path, '-m', 'deployment.remote', 
-            '--create_session',
-            f'--resource_id={resource_id}'
-        ]
-        
-        logger.info("Creating session for workflow...")
-        session_result = subprocess.run(create_session_command, capture_output=True, text=True, cwd='..')
-        
-        if session_result.returncode != 0:
-            logger.error(f"Failed to create session: {session_result.stderr}")
-            return None
-        
-        session_id_match = re.search(r'Session ID: (\d+)', session_result.stdout)
-        
-        if not session_id_match:
-            logger.error("Could not extract session ID from output")
-            return None
-        
-        actual_session_id = session_id_match.group(1)
-        logger.info(f"Created session with ID: {actual_session_id}")
-        
-        analyze_command = [
-            python_path, '-m', 'deployment.remote',
-            '--send',
-            f'--resource_id={resource_id}',
-            f'--session_id={actual_session_id}',
-        ]
-        
-        logger.info("Sending course content for analysis via stdin...")
-        result = subprocess.run(
-            analyze_command, 
-            capture_output=True, 
-            encoding='utf-8', 
-            cwd='..',
-            input=course_content
-        )
-        
-        if result.returncode != 0:
-            logger.error(f"Workflow execution failed: {result.stderr}")
-            return None
-        
-        output = result.stdout
-        logger.info(f"Workflow output received: {len(output)} characters")
-        
-        lines = output.strip().split('\n')
-        score_calculator_output_str = None
-        for line in lines:
-            if "'author': 'score_calculator'" in line:
-                score_calculator_output_str = line.strip()
-                break
+        client = engine_client if resource_id == engine_client.resource_id else get_client(resource_id)
+
+        parser = WorkflowEventParser()
+        with workflow_session(client, mode) as actual_session_id:
+            if not actual_session_id:
+                logger.error("Could not extract session ID from created session")
+                return None
+            
+            logger.info(f"Sending course content for analysis in session: {actual_session_id}")
+            events = client.stream_query(
+                user_id=WORKFLOW_USER_ID,
+                session_id=actual_session_id,
+                message=course_content,
+            )
+            try:
+                last_event_at = time.perf_counter()
+                for raw_event in events:
+                    now = time.perf_counter()
+                    try:
+                        event = WorkflowEvent.from_dict(raw_event)
+                    except WorkflowEventError as e:
+                        # Collected with the parser's own errors; the rest of the stream is still read
+                        parser.errors.append(str(e))
+                        last_event_at = now
+                        continue
+                    record_event_metrics(event, now - last_event_at)
+                    last_event_at = now
+                    if cancel_event is not None and cancel_event.is_set():
+                        logger.info("Workflow cancelled, no longer reading events")
+                        return None
+                    update = parser.feed(event)
+                    if on_stage is not None and update is not None:
+                        on_stage(update)
+                    if parser.done:
+                        break
+            finally:
+                events.close()
         
-        if not score_calculator_output_str:
+        for error in parser.errors:
+            logger.warning(f"Malformed workflow output: {error}")
+        if not parser.done:
             logger.warning("Could not find output from score_calculator agent.")
             return None
 
         try:
-            event_dict = ast.literal_eval(score_calculator_output_str)
-            json_str = event_dict['content']['parts'][0]['text']
-            
-            # Clean up markdown formatting
-            json_str = re.sub(r'^```json\s*', '', json_str, flags=re.MULTILINE)
-            json_str = re.sub(r'\s*```$', '', json_str, flags=re.MULTILINE)
-            
-            evaluation_result = json.loads(json_str)
-            
-            if 'final_score' in evaluation_result:
-                logger.info(f"Successfully parsed evaluation result: {evaluation_result['final_score']}")
-                return evaluation_result
-            else:
-                logger.warning("Parsed JSON does not contain 'final_score'.")
-                return None
-
-        except (ValueError, SyntaxError, KeyError, IndexError) as e:
-            logger.error(f"Failed to parse workflow output: {e}")
+            evaluation_result = parser.result()
+        except ValueError as e:
+            logger.warning(f"Workflow did not produce a score: {e}")
             return None
+        logger.info(f"Successfully parsed evaluation result: {evaluation_result['final_score']}")
+        return evaluation_result
 
     except Exception as e:
         logger.error(f"Error calling workflow: {str(e)}")
         return None
 
+def run_evaluation_job(job):
+    """Worker-thread entry point for queued evaluation jobs"""
+    results, cached = evaluate_course_content(
+        job.payload['session_id'], job.payload['content'], job.cancel_event, job.publish, job.payload.get('mode')
+    )
+    if job.cancel_event.is_set():
+        raise JobCancelledError()
+    if results is None:
+        raise RuntimeError('Failed to analyze course content using the deployed workflow')
+    return {'results': results, 'cached': cached}
+
+job_queue = JobQueue(
+    run_evaluation_job,
+    workers=int(os.getenv('COURSE_REVIEWER_JOB_WORKERS', '4')),
+    max_queue=int(os.getenv('COURSE_REVIEWER_JOB_QUEUE_SIZE', '32')),
+    result_ttl=int(os.getenv('COURSE_REVIEWER_JOB_TTL', '3600')),
+)
+
+@app.route('/api/jobs', methods=['POST'])
+def create_job():
+    """Queue course content for analysis and return a job ID immediately"""
+    data = request.get_json(silent=True) or {}
+    session_id = data.get('session_id')
+    course_content = data.get('content')
+    mode = data.get('mode')
+    
+    if not session_id or not course_content:
+        return jsonify({
+            'success': False,
+            'error': 'Missing session_id or content'
+        }), 400
+    
+    if mode is not None and mode not in EVALUATION_MODES:
+        return jsonify({
+            'success': False,
+            'error': f"Invalid mode, use one of: {', '.join(EVALUATION_MODES)}"
+        }), 400
+    
+    if session_manager.get(session_id) is None:
+        return jsonify({
+            'success': False,
+            'error': 'Invalid or expired session_id'
+        }), 400
+    
+    try:
+        job = job_queue.submit({'session_id': session_id, 'content': course_content, 'mode': mode})
+    except QueueFullError as e:
+        logger.warning(str(e))
+        response = jsonify({
+            'success': False,
+            'error': 'Server is busy, please retry shortly'
+        })
+        response.headers['Retry-After'] = '5'
+        return response, 429
+    
+    logger.info(f"Queued job {job.id} for session: {session_id}")
+    return jsonify({
+        'success': True,
+        'job_id': job.id,
+        'status': job.status
+    }), 202
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Return the status and, once finished, the result of a job"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': 'Unknown job_id'
+        }), 404
+    
+    return jsonify({
+        'success': True,
+        'job': job.to_dict()
+    })
+
+@app.route('/api/jobs/<job_id>/events', methods=['GET'])
+def stream_job_events(job_id):
+    """Stream a job's stage updates as server-sent events, ending with its result"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': 'Unknown job_id'
+        }), 404
+    
+    # EventSource resends the last id it saw when it reconnects; anything
+    # else in the header replays the stream from the start
+    try:
+        start = max(int(request.headers.get('Last-Event-ID', -1)), -1) + 1
+    except ValueError:
+        start = 0
+    
+    def generate():
+        position = start
+        while True:
+            events, finished = job.wait_for_events(position, timeout=15)
+            for event in events:
+                yield f"id: {position}\nevent: stage\ndata: {json.dumps(event)}\n\n"
+                position += 1
+            if finished and not events:
+                yield f"event: done\ndata: {json.dumps(job.to_dict())}\n\n"
+                return
+            if not events:
+                yield ": keep-alive\n\n"
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """Cancel a queued or running job"""
+    if job_queue.get(job_id) is None:
+        return jsonify({
+            'success': False,
+            'error': 'Unknown job_id'
+        }), 404
+    
+    cancelled = job_queue.cancel(job_id)
+    return jsonify({
+        'success': cancelled,
+        'job': job_queue.get(job_id).to_dict()
+    }), 200 if cancelled else 409
+
+@app.route('/api/jobs', methods=['GET'])
+def job_stats():
+    """Job queue depth and worker utilisation"""
+    return jsonify({
+        'success': True,
+        'jobs': job_queue.stats()
+    })
+
+def page_args():
+    """Read limit and before (cursor) query parameters"""
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 200)
+    return limit, request.args.get('before', type=int)
+
 @app.route('/api/sessions', methods=['GET'])
 def list_sessions():
-    """List all active sessions"""
+    """List sessions, newest first, one page at a time"""
+    limit, before = page_args()
+    sessions, next_cursor = evaluation_store.list_sessions(limit=limit, before=before)
+    return jsonify({
+        'success': True,
+        'sessions': sessions,
+        'next_cursor': next_cursor
+    })
+
+@app.route('/api/evaluations', methods=['GET'])
+def list_evaluations():
+    """List stored evaluations, newest first, filtered by session, category, content hash or score"""
+    limit, before = page_args()
+    evaluations, next_cursor = evaluation_store.list_evaluations(
+        limit=limit,
+        before=before,
+        session_id=request.args.get('session_id'),
+        category=request.args.get('category'),
+        content_hash=request.args.get('content_hash'),
+        min_score=request.args.get('min_score', type=float),
+        max_score=request.args.get('max_score', type=float),
+    )
+    return jsonify({
+        'success': True,
+        'evaluations': evaluations,
+        'next_cursor': next_cursor
+    })
+
+@app.route('/api/session-pool', methods=['GET'])
+def session_pool_stats():
+    """Pre-created session pool occupancy and hit rate, and web and remote session lifecycle counters"""
+    return jsonify({
+        'success': True,
+        'session_pool': session_pool.stats() if session_pool is not None else None,
+        'sessions': session_manager.stats()
+    })
+
+@app.route('/api/cache', methods=['GET'])
+def cache_stats():
+    """Evaluation cache hit/miss counters and in-flight request coalescing"""
     return jsonify({
         'success': True,
-        'sessions': list(active_sessions.values())
+        'cache': evaluation_cache.stats(),
+        'coalescing': inflight_evaluations.stats()
     })
 
+metrics.gauge('reviewer_job_queue_depth', 'Jobs waiting for a worker',
+              lambda: job_queue.stats()['queue_depth'])
+metrics.gauge('reviewer_jobs_running', 'Jobs currently being evaluated',
+              lambda: job_queue.stats()['running'])
+metrics.gauge('reviewer_evaluations_in_flight', 'Distinct evaluations currently running',
+              lambda: inflight_evaluations.stats()['in_flight'])
+metrics.gauge('reviewer_session_pool_idle', 'Pre-created sessions ready to use',
+              lambda: session_pool.stats()['idle'] if session_pool is not None else 0)
+metrics.gauge('reviewer_session_pool_in_use', 'Pooled sessions handed out to running evaluations',
+              lambda: session_pool.stats()['in_use'] if session_pool is not None else 0)
+metrics.gauge('reviewer_web_sessions', 'Web sessions stored',
+              evaluation_store.count_sessions)
+metrics.gauge('reviewer_remote_sessions', 'Remote sessions left after the last sweep',
+              lambda: session_manager.sweeper.stats()['remote_sessions'] or 0)
+metrics.gauge('reviewer_remote_session_deletes_pending', 'Remote sessions waiting to be deleted',
+              lambda: session_manager.sweeper.stats()['pending_deletes'])
+metrics.gauge('reviewer_evaluation_cache_entries', 'Evaluations held in the in-memory cache',
+              lambda: evaluation_cache.stats()['memory_entries'])
+metrics.gauge('reviewer_jobs_retained', 'Queued, running and finished jobs held in memory',
+              lambda: job_queue.stats()['tracked_jobs'])
+
+@app.route('/api/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Stage latency, token and parse-failure metrics in the Prometheus text format"""
+    return Response(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
-    """Health check endpoint"""
+    """Health check endpoint; 503 while the process drains so load balancers stop routing to it"""
+    if job_queue.draining:
+        return jsonify({
+            'status': 'draining',
+            'service': 'Course Reviewer Web UI'
+        }), 503
     return jsonify({
         'status': 'healthy',
         'service': 'Course Reviewer Web UI'
     })
 
+def warm_up(timeout=30):
+    """Resolve the Agent Engine client and fill the session pool before taking traffic"""
+    started = time.perf_counter()
+    try:
+        engine_client.warm_up()
+    except Exception as e:
+        logger.warning(f"Could not warm up Agent Engine client: {str(e)}")
+    if session_pool is not None and not session_pool.wait_until_ready(timeout=timeout):
+        logger.warning(f"Session pool not full after {timeout}s, serving anyway")
+    logger.info(f"Warmed up in {time.perf_counter() - started:.2f}s")
+
+def shutdown(timeout=60):
+    """Drain in-flight evaluations, then release remote sessions and flush stored results"""
+    logger.info(f"Draining jobs (up to {timeout}s)...")
+    if not job_queue.drain(timeout=timeout):
+        logger.warning(f"{job_queue.stats()['running']} jobs still running after {timeout}s")
+    if session_pool is not None:
+        session_pool.close()
+    session_manager.close()
+    evaluation_store.flush(timeout=10)
+    evaluation_store.close()
+
 if __name__ == '__main__':
     current_dir = os.path.basename(os.getcwd())
     if current_dir != 'web-ui':
@@ -214,8 +617,12 @@ if __name__ == '__main__':
         print("cd web-ui && python server.py")
         exit(1)
     
-    print("Starting Course Reviewer Web UI Server...")
-    print("Access the application at: http://localhost:5000")
+    port = int(os.getenv('PORT', '5000'))
+    print("Starting Course Reviewer Web UI development server...")
+    print(f"Access the application at: http://localhost:{port}")
+    print("For production, run: gunicorn -c gunicorn.conf.py")
     print("Press Ctrl+C to stop the server")
     
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    warm_up()
+    
+    app.run(debug=True, host='0.0.0.0', port=port)
\ No newline at end of file
@@ -0,0 +1,103 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class SessionManager:
+    """Bounds the lifetime of web sessions and of the remote sessions behind them
+
+    Web sessions live in the EvaluationStore. One idle for ``idle_ttl``
+    seconds is no longer accepted, and a background thread deletes it every
+    ``interval`` seconds, along with the least recently used ones past
+    ``max_sessions``. The same thread runs the remote ``sweeper`` (a
+    deployment.session_sweeper.SessionSweeper), which also deletes the
+    sessions the server hands it with ``retire_remote``. Set either limit
+    to 0 to disable it
+    """
+
+    def __init__(self, store, sweeper=None, idle_ttl=24 * 3600, max_sessions=10000, interval=300):
+        self.store = store
+        self.sweeper = sweeper
+        self.idle_ttl = idle_ttl
+        self.max_sessions = max_sessions
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._counters = {'created': 0, 'expired': 0, 'rejected': 0, 'sweeps': 0, 'sweep_errors': 0}
+        self._stop = threading.Event()
+        self._thread = None
+        if interval > 0:
+            self._thread = threading.Thread(target=self._sweep_loop, name='session-sweeper', daemon=True)
+            self._thread.start()
+
+    def create(self):
+        """Create a web session and return it as a dict"""
+        session = self.store.create_session()
+        with self._lock:
+            self._counters['created'] += 1
+        return session
+
+    def get(self, session_id):
+        """Return a web session, or None if it does not exist or has been idle too long"""
+        session = self.store.get_session(session_id)
+        if session is None:
+            return None
+        if self.idle_ttl and time.time() - (session['last_used_at'] or session['created_at']) >= self.idle_ttl:
+            with self._lock:
+                self._counters['rejected'] += 1
+            return None
+        return session
+
+    def retire_remote(self, session_id):
+        """Delete a remote session in the background once it is no longer needed"""
+        if self.sweeper is not None:
+            self.sweeper.retire(session_id)
+
+    def sweep(self):
+        """Expire idle and excess web sessions, then sweep stale remote sessions"""
+        result = {'expired': 0, 'remote': None}
+        try:
+            result['expired'] = self.store.expire_sessions(idle_ttl=self.idle_ttl, max_sessions=self.max_sessions)
+        except Exception as e:
+            with self._lock:
+                self._counters['sweep_errors'] += 1
+            logger.warning(f"Could not expire web sessions: {str(e)}")
+        if self.sweeper is not None:
+            result['remote'] = self.sweeper.sweep()
+        with self._lock:
+            self._counters['sweeps'] += 1
+            self._counters['expired'] += result['expired']
+        if result['expired']:
+            logger.info(f"Expired {result['expired']} web sessions")
+        return result
+
+    def stats(self):
+        """Return lifecycle counters, stored web sessions and the remote sweeper's stats"""
+        with self._lock:
+            stats = dict(self._counters)
+        stats.update(
+            web_sessions=self.store.count_sessions(),
+            idle_ttl=self.idle_ttl,
+            max_sessions=self.max_sessions,
+            remote=self.sweeper.stats() if self.sweeper is not None else None,
+        )
+        return stats
+
+    def close(self, timeout=10):
+        """Stop sweeping and finish the remote deletes already queued"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+        if self.sweeper is not None:
+            self.sweeper.close()
+
+    def _sweep_loop(self):
+        # Sweep at start-up too, for sessions left behind by a previous process
+        while True:
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.warning(f"Session sweep failed: {str(e)}")
+            if self._stop.wait(self.interval):
+                return
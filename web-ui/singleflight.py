@@ -0,0 +1,115 @@
+import threading
+
+
+class _Flight:
+    """One in-flight call and the requests waiting on it"""
+
+    __slots__ = ('done', 'result', 'error', 'waiters', 'cancel_events', 'listeners', 'updates')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+        self.cancel_events = []
+        self.listeners = []
+        self.updates = []
+
+
+class _AllCancelled:
+    """Cancel signal for a shared call: set only once every waiter has cancelled"""
+
+    def __init__(self, flight):
+        self._flight = flight
+
+    def is_set(self):
+        events = list(self._flight.cancel_events)
+        return bool(events) and all(event is not None and event.is_set() for event in events)
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one execution.
+
+    The first caller for a key runs the function; callers that arrive while
+    it is running wait for it and get the same result, or the same
+    exception. Updates the function publishes are passed to every waiter,
+    and replayed to late joiners. The shared call sees a cancel signal only
+    when all of its waiters have cancelled. Keys are forgotten as soon as
+    the call finishes, so this never serves stale results; caching is left
+    to the caller.
+    """
+
+    def __init__(self, poll_interval=0.1):
+        self.poll_interval = poll_interval
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._counters = {'calls': 0, 'coalesced': 0, 'errors': 0}
+
+    def do(self, key, fn, cancel_event=None, on_update=None):
+        """Return (result, shared) for fn(cancel, publish), running it only if no call for key is in flight
+
+        A waiter whose own cancel_event is set stops waiting and gets
+        (None, True); the shared call keeps running for the others.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self._counters['calls'] += 1
+            else:
+                self._counters['coalesced'] += 1
+            flight.waiters += 1
+            flight.cancel_events.append(cancel_event)
+            if on_update is not None:
+                flight.listeners.append(on_update)
+            replay = list(flight.updates) if on_update is not None else []
+
+        for update in replay:
+            on_update(update)
+
+        if leader:
+            return self._run(key, flight, fn), False
+        return self._wait(flight, cancel_event), True
+
+    def _run(self, key, flight, fn):
+        def publish(update):
+            with self._lock:
+                flight.updates.append(update)
+                listeners = list(flight.listeners)
+            for listener in listeners:
+                listener(update)
+
+        try:
+            flight.result = fn(_AllCancelled(flight), publish)
+        except BaseException as e:
+            flight.error = e
+            with self._lock:
+                self._counters['errors'] += 1
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result
+
+    def _wait(self, flight, cancel_event):
+        if cancel_event is None:
+            flight.done.wait()
+        else:
+            while not flight.done.wait(self.poll_interval):
+                if cancel_event.is_set():
+                    return None
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    def stats(self):
+        """Return call counters and the number of keys in flight"""
+        with self._lock:
+            stats = dict(self._counters)
+            stats['in_flight'] = len(self._flights)
+            stats['waiters'] = sum(flight.waiters for flight in self._flights.values())
+        requests = stats['calls'] + stats['coalesced']
+        stats['coalesced_rate'] = round(stats['coalesced'] / requests, 4) if requests else 0.0
+        return stats
@@ -0,0 +1,261 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT UNIQUE,
+    status TEXT NOT NULL DEFAULT 'active',
+    created_at REAL NOT NULL,
+    last_used_at REAL,
+    evaluations INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS evaluations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT,
+    content_hash TEXT NOT NULL,
+    rubric_version TEXT,
+    category TEXT,
+    final_score REAL,
+    passed INTEGER,
+    cached INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    result TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_created_at ON sessions (created_at);
+CREATE INDEX IF NOT EXISTS idx_sessions_last_active ON sessions (COALESCE(last_used_at, created_at));
+CREATE INDEX IF NOT EXISTS idx_evaluations_content_hash ON evaluations (content_hash);
+CREATE INDEX IF NOT EXISTS idx_evaluations_category ON evaluations (category, final_score);
+CREATE INDEX IF NOT EXISTS idx_evaluations_final_score ON evaluations (final_score);
+CREATE INDEX IF NOT EXISTS idx_evaluations_created_at ON evaluations (created_at);
+CREATE INDEX IF NOT EXISTS idx_evaluations_session ON evaluations (session_id, id);
+"""
+
+_STOP = object()
+
+
+class EvaluationStore:
+    """SQLite-backed store for web sessions and evaluation results.
+
+    The database runs in WAL mode, so several server processes can share
+    one file: readers never block the writer and each other. Sessions are
+    written immediately so a new session ID is valid in every process as
+    soon as it is returned. Evaluation results are queued and written by a
+    background thread in batches of up to ``batch_size`` rows per
+    transaction; ``flush()`` waits for the queue to drain.
+    """
+
+    def __init__(self, path, batch_size=64, flush_interval=0.5, max_pending=10000):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+        self._pending = queue.Queue(maxsize=max_pending)
+        self._writer = threading.Thread(target=self._write_loop, name='store-writer', daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    # Sessions
+
+    def create_session(self):
+        """Create a session and return it as a dict
+
+        IDs are random, so they never collide across processes, database
+        files or a reset database, and cannot be guessed from one another
+        """
+        now = time.time()
+        session_id = f"session_{uuid.uuid4().hex}"
+        conn = self._connect()
+        with conn:
+            conn.execute('INSERT INTO sessions (id, created_at) VALUES (?, ?)', (session_id, now))
+        return {'id': session_id, 'status': 'active', 'created_at': now, 'last_used_at': None, 'evaluations': 0}
+
+    def get_session(self, session_id):
+        row = self._connect().execute(
+            'SELECT seq, id, status, created_at, last_used_at, evaluations FROM sessions WHERE id = ?',
+            (session_id,)
+        ).fetchone()
+        return _session_dict(row) if row else None
+
+    def list_sessions(self, limit=50, before=None):
+        """Return (sessions, next_cursor), newest first; pass next_cursor as before for the next page"""
+        sql = 'SELECT seq, id, status, created_at, last_used_at, evaluations FROM sessions'
+        params = []
+        if before is not None:
+            sql += ' WHERE seq < ?'
+            params.append(before)
+        sql += ' ORDER BY seq DESC LIMIT ?'
+        params.append(limit + 1)
+        rows = self._connect().execute(sql, params).fetchall()
+        next_cursor = rows[limit - 1]['seq'] if len(rows) > limit else None
+        return [_session_dict(row) for row in rows[:limit]], next_cursor
+
+    def expire_sessions(self, idle_ttl=None, max_sessions=None):
+        """Delete sessions idle for idle_ttl seconds, then the least recently used past max_sessions
+
+        A session's last activity is its last evaluation, or its creation.
+        Stored evaluations are kept. Returns how many sessions were deleted
+        """
+        conn = self._connect()
+        expired = 0
+        with conn:
+            if idle_ttl:
+                expired += conn.execute(
+                    'DELETE FROM sessions WHERE COALESCE(last_used_at, created_at) < ?', (time.time() - idle_ttl,)
+                ).rowcount
+            if max_sessions:
+                expired += conn.execute(
+                    'DELETE FROM sessions WHERE seq IN (SELECT seq FROM sessions '
+                    'ORDER BY COALESCE(last_used_at, created_at) DESC LIMIT -1 OFFSET ?)', (max_sessions,)
+                ).rowcount
+        return expired
+
+    def count_sessions(self):
+        return self._connect().execute('SELECT COUNT(*) FROM sessions').fetchone()[0]
+
+    # Evaluations
+
+    def record_evaluation(self, session_id, content_hash, rubric_version, result, cached=False):
+        """Queue an evaluation result for the next batched write"""
+        self._pending.put((session_id, content_hash, rubric_version, result, cached, time.time()))
+
+    def list_evaluations(self, limit=50, before=None, session_id=None, category=None,
+                         content_hash=None, min_score=None, max_score=None):
+        """Return (evaluations, next_cursor), newest first, filtered on the indexed columns"""
+        clauses, params = [], []
+        for column, op, value in (
+            ('id', '<', before),
+            ('session_id', '=', session_id),
+            ('category', '=', category),
+            ('content_hash', '=', content_hash),
+            ('final_score', '>=', min_score),
+            ('final_score', '<=', max_score),
+        ):
+            if value is not None:
+                clauses.append(f'{column} {op} ?')
+                params.append(value)
+        sql = ('SELECT id, session_id, content_hash, rubric_version, category, final_score, passed, '
+               'cached, created_at, result FROM evaluations')
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        sql += ' ORDER BY id DESC LIMIT ?'
+        params.append(limit + 1)
+        rows = self._connect().execute(sql, params).fetchall()
+        next_cursor = rows[limit - 1]['id'] if len(rows) > limit else None
+        return [_evaluation_dict(row) for row in rows[:limit]], next_cursor
+
+    def flush(self, timeout=None):
+        """Wait until every queued evaluation has been written"""
+        deadline = None if timeout is None else time.time() + timeout
+        with self._pending.all_tasks_done:
+            while self._pending.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._pending.all_tasks_done.wait(remaining)
+        return True
+
+    def close(self):
+        if self._writer.is_alive():
+            self._pending.put(_STOP)
+            self._writer.join(timeout=10)
+
+    def stats(self):
+        conn = self._connect()
+        return {
+            'path': self.path,
+            'sessions': self.count_sessions(),
+            'evaluations': conn.execute('SELECT COUNT(*) FROM evaluations').fetchone()[0],
+            'pending_writes': self._pending.qsize(),
+        }
+
+    def _write_loop(self):
+        conn = self._connect()
+        stopping = False
+        while not stopping:
+            batch = [self._pending.get()]
+            # Collect whatever else arrives within flush_interval, up to batch_size
+            deadline = time.time() + self.flush_interval
+            while len(batch) < self.batch_size and batch[-1] is not _STOP:
+                try:
+                    batch.append(self._pending.get(timeout=max(deadline - time.time(), 0)))
+                except queue.Empty:
+                    break
+            if batch[-1] is _STOP:
+                stopping = True
+            rows = [item for item in batch if item is not _STOP]
+            try:
+                if rows:
+                    self._write_batch(conn, rows)
+            except sqlite3.Error as e:
+                logger.error(f"Could not write {len(rows)} evaluations: {str(e)}")
+            finally:
+                for _ in batch:
+                    self._pending.task_done()
+
+    def _write_batch(self, conn, rows):
+        with conn:
+            conn.executemany(
+                'INSERT INTO evaluations (session_id, content_hash, rubric_version, category, final_score, '
+                'passed, cached, created_at, result) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                [
+                    (session_id, content_hash, version, result.get('category'), result.get('final_score'),
+                     None if result.get('passed') is None else int(bool(result['passed'])),
+                     int(bool(cached)), created_at, json.dumps(result))
+                    for session_id, content_hash, version, result, cached, created_at in rows
+                ],
+            )
+            conn.executemany(
+                'UPDATE sessions SET evaluations = evaluations + 1, last_used_at = ? WHERE id = ?',
+                [(created_at, session_id) for session_id, _, _, _, _, created_at in rows],
+            )
+
+
+def _session_dict(row):
+    return {
+        'id': row['id'],
+        'status': row['status'],
+        'created_at': row['created_at'],
+        'last_used_at': row['last_used_at'],
+        'evaluations': row['evaluations'],
+    }
+
+
+def _evaluation_dict(row):
+    return {
+        'id': row['id'],
+        'session_id': row['session_id'],
+        'content_hash': row['content_hash'],
+        'rubric_version': row['rubric_version'],
+        'category': row['category'],
+        'final_score': row['final_score'],
+        'passed': None if row['passed'] is None else bool(row['passed']),
+        'cached': bool(row['cached']),
+        'created_at': row['created_at'],
+        'result': json.loads(row['result']),
+    }